@@ -1,7 +1,8 @@
 import json
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
-from app.extensions import redis_client as r
+from app.extensions import db, redis_client as r
+from app.database import pool_status
 
 api_bp = Blueprint('api', __name__)
 
@@ -12,6 +13,11 @@ def health():
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
+@api_bp.route('/health/db-pool')
+def db_pool_health():
+    # Checkout wait times and pool occupancy for this worker process
+    return jsonify(pool_status(db.engine))
+
 @api_bp.route('/update', methods=['POST'])
 @jwt_required()
 def update_dashboard():
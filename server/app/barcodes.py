@@ -0,0 +1,132 @@
+import hashlib
+import json
+import logging
+from sqlalchemy import func
+from app.cache import cache_get, cache_set
+from app.extensions import db
+from app.models import AllocatedBarcodesSnapshot
+from app.snapshots import snapshot_version
+
+logger = logging.getLogger(__name__)
+
+# Popup direction -> the column the branch is matched on and the counterpart hierarchy its
+# barcodes are grouped by: allocations go out to target branches, refills come in from sources.
+DIRECTIONS = {
+    'allocated': {
+        'branch': AllocatedBarcodesSnapshot.source_location,
+        'levels': [AllocatedBarcodesSnapshot.target_zone, AllocatedBarcodesSnapshot.target_state,
+                   AllocatedBarcodesSnapshot.target_location]
+    },
+    'refill': {
+        'branch': AllocatedBarcodesSnapshot.target_location,
+        'levels': [AllocatedBarcodesSnapshot.source_zone, AllocatedBarcodesSnapshot.source_state,
+                   AllocatedBarcodesSnapshot.source_location]
+    }
+}
+
+LEVELS = ['zone', 'state', 'location']
+
+# Leaf barcodes per lazy page under a location node
+LEAF_PAGE_SIZE = 100
+MAX_LEAF_PAGE_SIZE = 500
+
+# Rows per server-side cursor fetch when streaming a branch's barcodes
+STREAM_BATCH_SIZE = 2000
+
+# A batch's barcodes do not change once loaded; the TTL only bounds memory
+TREE_TTL = 6 * 3600
+
+def latest_batch_id():
+    return db.session.query(func.max(AllocatedBarcodesSnapshot.batch_id)).scalar()
+
+def resolve_batch_id(value):
+    """The requested ?batch_id=, or the newest batch when none is given. Raises ValueError when malformed."""
+    if value is None or value == '':
+        return latest_batch_id()
+    return int(value)
+
+def branch_barcodes(direction, location, batch_id):
+    """Query over the barcodes of one batch that location sends (allocated) or receives (refill)."""
+    spec = DIRECTIONS[direction]
+    return db.session.query(AllocatedBarcodesSnapshot).filter(
+        AllocatedBarcodesSnapshot.batch_id == batch_id, spec['branch'] == location)
+
+def _sort_key(path):
+    # Named values first, alphabetically; blanks ('Unknown ...') last
+    return [(value is None, value or '') for value in path]
+
+def build_weight_tree(direction, location, batch_id):
+    """
+    Zone / state / location subtotals of the branch's barcodes from one GROUP BY ROLLUP query.
+    Returns the grand total node: {'pieces', 'weight', 'children'}, each child a zone node
+    ({'level', 'name', 'pieces', 'weight', 'children'}) down to location nodes without children.
+    """
+    levels = DIRECTIONS[direction]['levels']
+    rows = branch_barcodes(direction, location, batch_id).with_entities(
+        *levels, *[func.grouping(c) for c in levels],
+        func.count(), func.coalesce(func.sum(AllocatedBarcodesSnapshot.barcode_weight), 0)
+    ).group_by(func.rollup(*levels)).all()
+
+    entries = []
+    for row in rows:
+        values, grouped = row[:len(levels)], row[len(levels):-2]
+        # ROLLUP groups a prefix of the levels; GROUPING(col) is 0 for each column in it
+        depth = sum(1 for g in grouped if g == 0)
+        entries.append((depth, tuple(values[:depth]), row[-2], round(float(row[-1]), 3)))
+    entries.sort(key=lambda e: (e[0], _sort_key(e[1])))
+
+    root = {'pieces': 0, 'weight': 0.0, 'children': []}
+    nodes = {(): root}
+    for depth, path, pieces, weight in entries:
+        if depth == 0:
+            root['pieces'], root['weight'] = pieces, weight
+            continue
+        node = {'level': LEVELS[depth - 1], 'name': path[-1], 'pieces': pieces, 'weight': weight}
+        if depth < len(LEVELS):
+            node['children'] = []
+        nodes[path[:-1]]['children'].append(node)
+        nodes[path] = node
+    return root
+
+def weight_tree(direction, location, batch_id):
+    """The branch's weight tree (see build_weight_tree), cached per direction, batch and location."""
+    table = AllocatedBarcodesSnapshot.__tablename__
+    digest = hashlib.sha1(location.encode()).hexdigest()
+    key = f"barcode_tree:{table}:{snapshot_version(AllocatedBarcodesSnapshot)}:{direction}:{batch_id}:{digest}"
+    cached = cache_get(key)
+    if cached is not None:
+        return json.loads(cached)
+    tree = build_weight_tree(direction, location, batch_id)
+    cache_set(key, json.dumps(tree), TREE_TTL)
+    return tree
+
+def leaf_query(direction, location, batch_id, path):
+    """
+    The barcodes under one location node of the tree, path being its (zone, state, location) names.
+    A None level matches the blanks, so each 'Unknown ...' node keeps only the barcodes under it.
+    """
+    query = branch_barcodes(direction, location, batch_id)
+    for column, name in zip(DIRECTIONS[direction]['levels'], path):
+        query = query.filter(column.is_(None) if name is None else column == name)
+    return query
+
+def stream_barcodes(direction, location, batch_id):
+    """
+    Every barcode of the branch as newline-delimited JSON, in tree order. Rows are read through
+    a server-side cursor STREAM_BATCH_SIZE at a time, so memory stays flat however large the branch.
+    """
+    levels = DIRECTIONS[direction]['levels']
+    query = branch_barcodes(direction, location, batch_id).with_entities(
+        AllocatedBarcodesSnapshot.barcode, AllocatedBarcodesSnapshot.collection,
+        AllocatedBarcodesSnapshot.section, AllocatedBarcodesSnapshot.barcode_weight, *levels
+    ).order_by(*levels, AllocatedBarcodesSnapshot.barcode).execution_options(yield_per=STREAM_BATCH_SIZE)
+
+    for row in query:
+        record = {
+            'barcode': str(row.barcode),
+            'collection': row.collection,
+            'section': row.section,
+            'barcode_weight': float(row.barcode_weight or 0)
+        }
+        record.update({level: row[4 + i] for i, level in enumerate(LEVELS)})
+        yield json.dumps(record, separators=(',', ':')) + '\n'
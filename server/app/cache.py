@@ -0,0 +1,242 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from functools import wraps
+from flask import Response, copy_current_request_context, g, make_response, request
+from sqlalchemy import inspect
+from sqlalchemy.engine import Row
+from app.extensions import redis_bytes_client, redis_client, socketio
+from app.snapshots import active_snapshot_date, read_current_snapshot, snapshot_version
+
+logger = logging.getLogger(__name__)
+
+# Cache helpers treat Redis as optional: any failure reads as a miss, so callers fall back
+# to the database instead of failing the request.
+
+def cache_get(key):
+    try:
+        return redis_client.get(key)
+    except Exception as e:
+        logger.warning(f"Cache read failed for {key}: {e}")
+        return None
+
+def cache_set(key, value, ttl):
+    try:
+        redis_client.setex(key, ttl, value)
+        return True
+    except Exception as e:
+        logger.warning(f"Cache write failed for {key}: {e}")
+        return False
+
+# Seconds a computed report is served as fresh; REPORT_CACHE_TTL_<REPORT> overrides per report.
+# Keys carry the table's load version, so these only bound memory, never staleness after a load.
+DAY = 86400
+REPORT_TTLS = {
+    'orderstatus': 2 * DAY,
+    'shortstatus': 2 * DAY,
+    'locationwiseorder': 2 * DAY,
+    'provisionstatus': 2 * DAY,
+    'branchweight': 2 * DAY
+}
+DEFAULT_REPORT_TTL = DAY
+
+# Past its TTL a report is still served for this long while a single request recomputes it
+REPORT_STALE_SECONDS = int(os.getenv('REPORT_CACHE_STALE_SECONDS', 600))
+
+# A cold computation holds the lock at most this long; identical requests wait up to LOCK_WAIT for it
+REPORT_LOCK_SECONDS = 60
+REPORT_LOCK_WAIT_SECONDS = 15
+REPORT_LOCK_POLL_SECONDS = 0.1
+
+# Args that do not change the result, and defaults that are dropped so ?page=1 and no page share a key
+IGNORED_ARGS = {'_'}
+DEFAULT_ARGS = {'page': '1', 'per_page': '50'}
+
+def report_ttl(report):
+    return int(os.getenv(f'REPORT_CACHE_TTL_{report.upper()}', REPORT_TTLS.get(report, DEFAULT_REPORT_TTL)))
+
+def _json_default(value):
+    # SUM over bigint comes back as an integral Decimal and is summed again in templates;
+    # fractional Decimals keep their printed scale (12.500) so cached and fresh renders match
+    if isinstance(value, Decimal):
+        return int(value) if value.as_tuple().exponent >= 0 else str(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+def row_dict(row):
+    """Plain dict of an ORM instance or a result Row; templates read dict keys like attributes."""
+    if isinstance(row, dict):
+        return row
+    if isinstance(row, Row):
+        return row._asdict()
+    return {attr.key: getattr(row, attr.key) for attr in inspect(row).mapper.column_attrs}
+
+def report_cache_key(report, model, snapshot_date, name, args=(), layer='report'):
+    params = sorted(
+        (k, v.strip()) for k, v in request.args.items(multi=True)
+        if v.strip() and k not in IGNORED_ARGS and DEFAULT_ARGS.get(k) != v.strip()
+    )
+    signature = json.dumps([name, list(args), params], default=_json_default)
+    digest = hashlib.sha1(signature.encode()).hexdigest()
+    # Namespaced by the table's load version, which every publish bumps and purges
+    table = model.__tablename__
+    version = snapshot_version(model)
+    return f"{layer}:{table}:{version}:{report}:{snapshot_date.isoformat() if snapshot_date else 'all'}:{digest}"
+
+def _store(key, ttl, value):
+    # Returns the value as a cache hit would, so a fresh render matches a cached one
+    raw = json.dumps({'fresh_until': time.time() + ttl, 'value': value}, default=_json_default)
+    cache_set(key, raw, ttl + REPORT_STALE_SECONDS)
+    return json.loads(raw)['value']
+
+def _load(key):
+    raw = cache_get(key)
+    return json.loads(raw) if raw else None
+
+def _lock(key):
+    try:
+        # Not thread-local: a stale refresh releases the lock from its background task
+        lock = redis_client.lock(f'{key}:lock', timeout=REPORT_LOCK_SECONDS, thread_local=False)
+        return lock if lock.acquire(blocking=False) else None
+    except Exception as e:
+        # Without Redis there is nothing to coalesce on; compute inline
+        logger.warning(f"Report cache lock unavailable for {key}: {e}")
+        return False
+
+def _unlock(lock):
+    if not lock:
+        return
+    try:
+        lock.release()
+    except Exception as e:
+        logger.warning(f"Could not release report cache lock {lock.name}: {e}")
+
+def _revalidate(key, ttl, lock, compute):
+    replica = g.get('read_replica')
+
+    @copy_current_request_context
+    def refresh():
+        g.read_replica = replica
+        try:
+            _store(key, ttl, compute())
+        except Exception as e:
+            logger.error(f"Background refresh of {key} failed: {e}")
+        finally:
+            _unlock(lock)
+
+    socketio.start_background_task(refresh)
+
+def report_cache(report, model):
+    """
+    Caches a report computation over model's table per snapshot and request.
+
+    The wrapped function takes the active snapshot_date first and must return JSON-safe data
+    (see row_dict). Its key covers the function (so every route rendering the same report
+    shares one entry), its arguments, the normalized query args, the snapshot date and the
+    table's load version, so a reload is never served from the previous load. Identical cold
+    requests coalesce on a Redis lock so one of them queries the database; after the report's
+    TTL the stale value keeps being served while a single background task recomputes it.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(snapshot_date, *args):
+            ttl = report_ttl(report)
+            key = report_cache_key(report, model, snapshot_date, fn.__name__, args)
+
+            def compute():
+                read_current_snapshot(model)
+                return fn(snapshot_date, *args)
+
+            cached = _load(key)
+            if cached is not None:
+                if cached['fresh_until'] <= time.time():
+                    lock = _lock(key)
+                    if lock:
+                        _revalidate(key, ttl, lock, compute)
+                return cached['value']
+
+            lock = _lock(key)
+            if lock is None:
+                # Another request is computing this report; wait for its result
+                deadline = time.monotonic() + REPORT_LOCK_WAIT_SECONDS
+                while time.monotonic() < deadline:
+                    time.sleep(REPORT_LOCK_POLL_SECONDS)
+                    cached = _load(key)
+                    if cached is not None:
+                        return cached['value']
+                logger.warning(f"Timed out waiting for {key}; computing it here")
+            try:
+                return _store(key, ttl, compute())
+            finally:
+                _unlock(lock)
+        return wrapper
+    return decorator
+
+# Rendered partials are kept gzipped; REPORT_FRAGMENT_CACHE=0 turns the layer off
+FRAGMENT_CACHE_ENABLED = os.getenv('REPORT_FRAGMENT_CACHE', '1') == '1'
+FRAGMENT_COMPRESS_LEVEL = 6
+
+def skip_fragment_cache():
+    """Keeps the current response (e.g. an inline error message) out of the fragment cache."""
+    g.skip_fragment_cache = True
+
+def _fragment_response(body, etag):
+    # Clients that accept gzip get the stored bytes as they are; others get them inflated
+    if 'gzip' in request.accept_encodings:
+        response = Response(body, mimetype='text/html')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(gzip.decompress(body), mimetype='text/html')
+    response.vary.add('Accept-Encoding')
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+def fragment_cache(report, model):
+    """
+    Caches the rendered HTML of a report partial over model's table, gzipped, under the
+    report's snapshot-versioned key for its TTL. A hit is one Redis read and is served with an
+    ETag, so a client that already holds this fragment gets a 304. Only plain 200 responses
+    are stored.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not FRAGMENT_CACHE_ENABLED:
+                return view(*args, **kwargs)
+            snapshot_date = active_snapshot_date(model) if hasattr(model, 'snapshot_date') else None
+            key = report_cache_key(report, model, snapshot_date, view.__name__, sorted(kwargs.items()), layer='fragment')
+            try:
+                etag, body = redis_bytes_client.hmget(key, 'etag', 'body')
+            except Exception as e:
+                logger.warning(f"Fragment cache read failed for {key}: {e}")
+                etag = body = None
+            if body is not None:
+                return _fragment_response(body, etag.decode())
+
+            read_current_snapshot(model)
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200 or response.mimetype != 'text/html' or g.get('skip_fragment_cache'):
+                return response
+            html = response.get_data()
+            etag = hashlib.sha1(html).hexdigest()
+            try:
+                pipe = redis_bytes_client.pipeline()
+                pipe.hset(key, mapping={'etag': etag, 'body': gzip.compress(html, FRAGMENT_COMPRESS_LEVEL)})
+                pipe.expire(key, report_ttl(report))
+                pipe.execute()
+            except Exception as e:
+                logger.warning(f"Fragment cache write failed for {key}: {e}")
+            response.set_etag(etag)
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
@@ -0,0 +1,95 @@
+from sqlalchemy import func, true
+from app.extensions import db
+from app.dashboard.pagination import (
+    CachedPagination, attach_cursors, cursor_for, keyset_pagination, seek_filter, seek_order
+)
+
+
+def avg_parts(avg_cols):
+    # Raw columns are averaged directly; (key, sum_col, count_col) tuples come from rollup tables
+    for c in avg_cols:
+        if isinstance(c, tuple):
+            yield c
+        else:
+            yield c.key, c, None
+
+def grouped_report(base_query, group_cols, sum_cols, avg_cols, order_by, page=1, per_page=50, row_count_col=None,
+                   cursor=None):
+    """
+    Computes filter-wide totals, the total group count and one page of grouped rows
+    in a single statement.
+
+    The filtered rows are grouped once into a CTE. Postgres materializes a CTE that is
+    referenced twice, so the totals and the page are both derived from that one scan
+    instead of re-reading the snapshot table for each figure. Averages are carried as
+    sum/count pairs so the grand average is weighted by rows, not by groups.
+
+    base_query may target a rollup table instead of raw rows: sums of sums stay exact,
+    avg_cols then take (key, sum_col, count_col) tuples and row_count_col the stored
+    row count.
+
+    With a decoded cursor the page is found by seeking past the cursor's group key rather
+    than by OFFSET; the group count still comes from the totals row.
+
+    Returns (totals, pagination) where totals is a dict keyed by column key plus
+    'total_groups' and 'total_rows'.
+    """
+    page = max(page, 1)
+    per_page = per_page if per_page > 0 else 50
+
+    avgs = list(avg_parts(avg_cols))
+    grouped = base_query.with_entities(
+        *group_cols,
+        *[func.sum(c).label(c.key) for c in sum_cols],
+        *[func.sum(s).label(f'{key}__sum') for key, s, n in avgs],
+        *[(func.count(s) if n is None else func.sum(n)).label(f'{key}__n') for key, s, n in avgs],
+        (func.count() if row_count_col is None else func.sum(row_count_col)).label('row_count')
+    ).group_by(*group_cols).cte('grouped')
+
+    totals = db.session.query(
+        func.count().label('total_groups'),
+        func.sum(grouped.c.row_count).label('total_rows'),
+        *[func.sum(grouped.c[c.key]).label(f'all_{c.key}') for c in sum_cols],
+        *[(func.sum(grouped.c[f'{key}__sum']) / func.nullif(func.sum(grouped.c[f'{key}__n']), 0)).label(f'all_{key}')
+          for key, s, n in avgs]
+    ).subquery('totals')
+
+    key_cols = [grouped.c[c.key] for c in order_by]
+    order_cols = seek_order(key_cols)
+    page_q = db.session.query(
+        *[grouped.c[c.key] for c in group_cols],
+        *[grouped.c[c.key] for c in sum_cols],
+        *[(grouped.c[f'{key}__sum'] / func.nullif(grouped.c[f'{key}__n'], 0)).label(key) for key, s, n in avgs],
+        func.row_number().over(order_by=order_cols).label('row_num')
+    )
+    cursor = cursor_for(cursor, key_cols)
+    if cursor is not None:
+        # Read one extra group to learn whether another page exists in the seek direction
+        page_q = page_q.filter(seek_filter(key_cols, cursor['k'], cursor['d'])) \
+            .order_by(*seek_order(key_cols, cursor['d'])).limit(per_page + 1).subquery('page')
+    else:
+        page_q = page_q.order_by(*order_cols).limit(per_page).offset((page - 1) * per_page).subquery('page')
+
+    # LEFT JOIN keeps the totals row even when the requested page is past the end
+    result = (db.session.query(*totals.c, *page_q.c)
+              .select_from(totals)
+              .outerjoin(page_q, true())
+              .order_by(page_q.c.row_num)
+              .all())
+
+    first = result[0]
+    totals_dict = {
+        'total_groups': first.total_groups or 0,
+        'total_rows': first.total_rows or 0
+    }
+    for key in [c.key for c in sum_cols] + [key for key, s, n in avgs]:
+        totals_dict[key] = getattr(first, f'all_{key}')
+
+    rows = [r for r in result if r.row_num is not None]
+    if cursor is None:
+        pagination = attach_cursors(CachedPagination(rows, page, per_page, totals_dict['total_groups']), order_by)
+    else:
+        has_more = len(rows) > per_page
+        rows = rows[:per_page] if cursor['d'] == 'next' else rows[-per_page:]
+        pagination = keyset_pagination(rows, has_more, cursor, per_page, totals_dict['total_groups'], order_by)
+    return totals_dict, pagination
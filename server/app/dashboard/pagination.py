@@ -0,0 +1,212 @@
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from flask import request
+from sqlalchemy import and_, false, or_, tuple_
+from app.extensions import db
+
+# Helper class to mimic Flask-SQLAlchemy Pagination for templates
+class CachedPagination:
+    def __init__(self, items, page, per_page, total):
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.total = total
+        self.has_prev = page > 1
+        self.has_next = (page * per_page) < total
+        self.prev_num = page - 1
+        self.next_num = page + 1
+        self.pages = (total + per_page - 1) // per_page if per_page else 0
+        self.prev_cursor = None
+        self.next_cursor = None
+
+class KeysetPagination(CachedPagination):
+    """Pagination for a page fetched by seeking past a cursor instead of OFFSET."""
+    def __init__(self, items, page, per_page, total, has_prev, has_next, prev_cursor=None, next_cursor=None):
+        super().__init__(items, page, per_page, total)
+        self.has_prev = has_prev
+        self.has_next = has_next
+        self.prev_cursor = prev_cursor
+        self.next_cursor = next_cursor
+
+def encode_cursor(page, keys, total, direction):
+    payload = json.dumps({'p': page, 'k': keys, 't': total, 'd': direction}, separators=(',', ':'), default=str)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def _count(value, minimum):
+    return isinstance(value, int) and not isinstance(value, bool) and value >= minimum
+
+def decode_cursor(token):
+    # Malformed or tampered cursors fall back to the first page
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if data['d'] not in ('next', 'prev') or not isinstance(data['k'], list):
+            return None
+        if not _count(data['p'], 1) or not _count(data.get('t', 0), 0):
+            return None
+        return data
+    except (ValueError, KeyError, TypeError):
+        return None
+
+def _nullable(col):
+    expr = getattr(col, 'expression', col)
+    return getattr(expr, 'nullable', True) is not False
+
+def _coerce_key(col, value):
+    # The cursor key as col's Python type; raises ValueError when it cannot be one
+    if value is None:
+        if not _nullable(col):
+            raise ValueError(f"{col.key} is not nullable")
+        return None
+    try:
+        python_type = col.type.python_type
+    except NotImplementedError:
+        python_type = None
+    if isinstance(value, (list, dict)) or isinstance(value, bool) != (python_type is bool):
+        raise ValueError(f"bad key for {col.key}")
+    if python_type is int:
+        if not isinstance(value, int):
+            raise ValueError(f"bad key for {col.key}")
+        return value
+    if python_type in (float, Decimal):
+        try:
+            return python_type(str(value))
+        except InvalidOperation:
+            raise ValueError(f"bad key for {col.key}")
+    if python_type in (date, datetime):
+        # Encoded with default=str
+        return python_type.fromisoformat(value) if isinstance(value, str) else python_type(value)
+    if python_type is str and not isinstance(value, str):
+        raise ValueError(f"bad key for {col.key}")
+    return value
+
+def cursor_for(cursor, cols):
+    """
+    The cursor with its keys coerced to the types of cols, or None when they do not fit: a
+    tampered key would otherwise reach the database as a bad parameter.
+    """
+    if cursor is None or len(cursor['k']) != len(cols):
+        return None
+    try:
+        keys = [_coerce_key(c, v) for c, v in zip(cols, cursor['k'])]
+    except (ValueError, TypeError):
+        return None
+    return dict(cursor, k=keys)
+
+def seek_order(cols, direction='next'):
+    # NULLs sort last, as in a plain ascending ORDER BY, so a plain index on cols serves the page order
+    if direction == 'next':
+        return [c.asc().nulls_last() for c in cols]
+    return [c.desc().nulls_first() for c in cols]
+
+def seek_filter(cols, keys, direction):
+    """
+    Rows after (or before) keys in seek_order. Non-nullable keys use one row-value comparison,
+    an index range; row values treat NULL as unknown, so nullable ones expand column by column.
+    """
+    if not any(_nullable(c) for c in cols):
+        return tuple_(*cols) > tuple_(*keys) if direction == 'next' else tuple_(*cols) < tuple_(*keys)
+    clauses = []
+    for i, (col, value) in enumerate(zip(cols, keys)):
+        if direction == 'next':
+            if value is None:
+                continue  # nothing sorts after NULL
+            step = or_(col > value, col.is_(None)) if _nullable(col) else col > value
+        else:
+            step = col.is_not(None) if value is None else col < value
+        prefix = [c.is_(None) if v is None else c == v for c, v in zip(cols[:i], keys[:i])]
+        clauses.append(and_(*prefix, step))
+    return or_(*clauses) if clauses else false()
+
+def row_keys(row, cols):
+    return [getattr(row, c.key) for c in cols]
+
+def attach_cursors(pagination, cols):
+    """Adds next/prev cursors built from the boundary rows of an OFFSET page."""
+    items = pagination.items
+    total = pagination.total
+    pagination.prev_cursor = None
+    pagination.next_cursor = None
+    if items and pagination.has_prev:
+        pagination.prev_cursor = encode_cursor(pagination.page - 1, row_keys(items[0], cols), total, 'prev')
+    if items and pagination.has_next:
+        pagination.next_cursor = encode_cursor(pagination.page + 1, row_keys(items[-1], cols), total, 'next')
+    return pagination
+
+def estimate_count(query):
+    """Planner row estimate for query; avoids the full COUNT(*) scan at the cost of accuracy."""
+    if db.engine.dialect.name != 'postgresql':
+        return query.order_by(None).count()
+    compiled = query.order_by(None).statement.compile(dialect=db.engine.dialect)
+    plan = db.session.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+def seek_page(query, cols, cursor, per_page):
+    """
+    Fetches the page after (or before) the cursor keys. Returns (items, has_more);
+    one extra row is read to learn whether another page exists in that direction.
+    """
+    query = query.filter(seek_filter(cols, cursor['k'], cursor['d'])).order_by(None).order_by(*seek_order(cols, cursor['d']))
+    items = query.limit(per_page + 1).all()
+    has_more = len(items) > per_page
+    items = items[:per_page]
+    if cursor['d'] == 'prev':
+        items.reverse()
+    return items, has_more
+
+def keyset_pagination(items, has_more, cursor, per_page, total, cols):
+    page = cursor['p']
+    if cursor['d'] == 'next':
+        has_prev, has_next = True, has_more
+    else:
+        has_prev, has_next = has_more and page > 1, True
+    # The cursor's total is only a hint; never show fewer than the rows already paged through
+    total = max(total, (page - 1) * per_page + len(items) + (1 if has_next else 0))
+    prev_cursor = encode_cursor(page - 1, row_keys(items[0], cols), total, 'prev') if items and has_prev else None
+    next_cursor = encode_cursor(page + 1, row_keys(items[-1], cols), total, 'next') if items and has_next else None
+    return KeysetPagination(items, page, per_page, total, has_prev, has_next, prev_cursor, next_cursor)
+
+def request_cursor():
+    token = request.args.get('cursor')
+    return decode_cursor(token) if token else None
+
+def paginate_query(query, cols, page, per_page):
+    """
+    Paginates query ordered by cols. With a ?cursor= from a previous page the next page is
+    fetched by seeking on the ORDER BY key, so deep pages cost the same as the first and no
+    COUNT runs; the total travels inside the cursor. Without a cursor it falls back to
+    LIMIT/OFFSET, counting exactly unless ?total=estimate asks for the planner estimate.
+    Either way the returned pagination carries cursors for its neighbouring pages.
+    """
+    per_page = per_page if per_page > 0 else 50
+    cursor = cursor_for(request_cursor(), cols)
+    if cursor is not None:
+        items, has_more = seek_page(query, cols, cursor, per_page)
+        return keyset_pagination(items, has_more, cursor, per_page, cursor.get('t') or 0, cols)
+
+    query = query.order_by(None).order_by(*seek_order(cols))
+    if request.args.get('total') == 'estimate':
+        page = max(page, 1)
+        items = query.limit(per_page).offset((page - 1) * per_page).all()
+        pagination = CachedPagination(items, page, per_page, estimate_count(query))
+        pagination.has_next = len(items) == per_page
+    else:
+        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    return attach_cursors(pagination, cols)
+
+def pagination_state(pagination):
+    # JSON-safe snapshot of a page's navigation, for report caches
+    return {
+        'page': pagination.page, 'per_page': pagination.per_page, 'total': pagination.total,
+        'has_prev': pagination.has_prev, 'has_next': pagination.has_next,
+        'prev_cursor': getattr(pagination, 'prev_cursor', None),
+        'next_cursor': getattr(pagination, 'next_cursor', None)
+    }
+
+def restore_pagination(items, state):
+    return KeysetPagination(items, state['page'], state['per_page'], state['total'], state['has_prev'],
+                            state['has_next'], state['prev_cursor'], state['next_cursor'])
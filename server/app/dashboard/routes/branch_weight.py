@@ -1,60 +1,151 @@
-from flask import render_template, request, jsonify
+from flask import Response, render_template, request, jsonify, stream_with_context
 from flask_jwt_extended import jwt_required
 from app.dashboard import dashboard_bp
-from app.models import Notification, LocationWiseStockSnapshot, AllocatedBarcodesSnapshot
+from app.database import read_replica
+from app.models import LocationWiseStockSnapshot, AllocatedBarcodesSnapshot
+from app.barcodes import (
+    DIRECTIONS, LEAF_PAGE_SIZE, MAX_LEAF_PAGE_SIZE, leaf_query, resolve_batch_id, stream_barcodes, weight_tree
+)
+from app.notification_counter import get_unread_count
+from app.snapshots import active_snapshot_date, has_snapshot_data
 from app.extensions import db
 from sqlalchemy import func
 from datetime import datetime
 import logging
 from decimal import Decimal
-import json
-from app.extensions import redis_client
+from app.cache import fragment_cache, report_cache, skip_fragment_cache
+from app.dashboard.pagination import paginate_query, pagination_state, restore_pagination
+from app.filter_catalog import catalog_response, facet_counts, narrow_locations
+from app.search import search_filter, suggestions
 
 logger = logging.getLogger(__name__)
 
-# Helper class to mimic Flask-SQLAlchemy Pagination for templates
-class CachedPagination:
-    def __init__(self, items, page, per_page, total):
-        self.items = items
-        self.page = page
-        self.per_page = per_page
-        self.total = total
-        self.has_prev = page > 1
-        self.has_next = (page * per_page) < total
-        self.prev_num = page - 1
-        self.next_num = page + 1
-        self.pages = (total + per_page - 1) // per_page if per_page else 0
-
-def generate_cache_key(prefix, snapshot_date=None, **kwargs):
-    """
-    Generates a unique cache key based on the prefix, snapshot date, and filter arguments.
-    The snapshot_date ensures data invalidation when new data is uploaded.
-    """
-    # Sort keys to ensure consistent order
-    sorted_kwargs = dict(sorted(kwargs.items()))
-    # Create a string representation of the arguments
-    args_str = ":".join(f"{k}={v}" for k, v in sorted_kwargs.items() if v)
-    
-    # Format date string for the key
-    date_str = snapshot_date.strftime("%Y%m%d%H%M%S") if snapshot_date else "latest"
-    
-    return f"{prefix}:{date_str}:{args_str}"
-
 def safe_float(val):
     try:
         return float(val or 0)
     except:
         return 0.0
 
+@report_cache('branchweight', LocationWiseStockSnapshot)
+def branch_weight_report(latest_date_query, page, per_page):
+    """KPIs and one page of drill rows for the main branch weight page."""
+    # Filters
+    search = request.args.get('search', '').strip()
+    zone = request.args.get('zone', '')
+    state = request.args.get('state', '')
+    location = request.args.get('location', '')
+    business_head = request.args.get('business_head', '')
+
+    def apply_filters(query):
+        if search:
+            query = query.filter(search_filter('branchweight', search))
+        if zone:
+            query = query.filter(LocationWiseStockSnapshot.zone == zone)
+        if state:
+            query = query.filter(LocationWiseStockSnapshot.state == state)
+        if location:
+            query = query.filter(LocationWiseStockSnapshot.location == location)
+        if business_head:
+            query = query.filter(LocationWiseStockSnapshot.business_head == business_head)
+        
+        if latest_date_query:
+            query = query.filter(LocationWiseStockSnapshot.snapshot_date == latest_date_query)
+        else:
+            query = query.filter(LocationWiseStockSnapshot.snapshot_date.is_(None))
+            
+        return query
+
+    # Global Stats
+    agg_cols = [
+        func.sum(LocationWiseStockSnapshot.provision_pieces).label('provision_pieces'),
+        func.sum(LocationWiseStockSnapshot.provision_weight).label('provision_weight'),
+        func.sum(LocationWiseStockSnapshot.stock_pieces).label('stock_pieces'),
+        func.sum(LocationWiseStockSnapshot.stock_weight).label('stock_weight'),
+        func.sum(LocationWiseStockSnapshot.short_pieces).label('short_pieces'),
+        func.sum(LocationWiseStockSnapshot.short_weight).label('short_weight'),
+        func.sum(LocationWiseStockSnapshot.max_weight_allocate_other_branches).label('max_allocate'),
+        func.sum(LocationWiseStockSnapshot.max_refill_qty_other_branches).label('max_refill')
+    ]
+    
+    agg_q = db.session.query(*agg_cols)
+    agg_q = apply_filters(agg_q)
+    aggs = agg_q.first()
+
+    if not aggs or aggs.provision_pieces is None:
+         stats = {
+            'provision_pieces': 0, 'provision_weight': 0.0,
+            'stock_pieces': 0, 'stock_weight': 0.0,
+            'short_pieces': 0, 'short_weight': 0.0,
+            'max_allocate': 0.0, 'max_refill': 0.0
+        }
+    else:
+        stats = {
+            'provision_pieces': int(aggs.provision_pieces or 0),
+            'provision_weight': safe_float(aggs.provision_weight),
+            'stock_pieces': int(aggs.stock_pieces or 0),
+            'stock_weight': safe_float(aggs.stock_weight),
+            'short_pieces': int(aggs.short_pieces or 0),
+            'short_weight': safe_float(aggs.short_weight),
+            'max_allocate': safe_float(aggs.max_allocate),
+            'max_refill': safe_float(aggs.max_refill)
+        }
+
+    footer_totals = stats
+    
+    # Drill-down level
+    if not zone:
+        group_cols = [LocationWiseStockSnapshot.zone]
+        level = 'zone'
+    elif zone and not state:
+        group_cols = [LocationWiseStockSnapshot.zone, LocationWiseStockSnapshot.state]
+        level = 'state'
+    else:
+        group_cols = [LocationWiseStockSnapshot.zone, LocationWiseStockSnapshot.state, LocationWiseStockSnapshot.location]
+        level = 'location'
+
+    main_q = db.session.query(*(group_cols + agg_cols))
+    main_q = apply_filters(main_q)
+    main_q = main_q.group_by(*group_cols)
+    
+    pagination = paginate_query(main_q, group_cols, page, per_page)
+    
+    processed_rows = []
+    for r in pagination.items:
+        row_dict = {
+            'zone': r[0] or 'Unknown',
+            'state': r[1] if level in ['state', 'location'] else '',
+            'location': r[2] if level == 'location' else '',
+            'provision_pieces': int(r.provision_pieces or 0),
+            'provision_weight': safe_float(r.provision_weight),
+            'stock_pieces': int(r.stock_pieces or 0),
+            'stock_weight': safe_float(r.stock_weight),
+            'short_pieces': int(r.short_pieces or 0),
+            'short_weight': safe_float(r.short_weight),
+            'max_allocate': safe_float(r.max_allocate),
+            'max_refill': safe_float(r.max_refill),
+            'level': level
+        }
+        if row_dict['state'] is None: row_dict['state'] = 'Unknown'
+        if row_dict['location'] is None: row_dict['location'] = 'Unknown'
+        processed_rows.append(row_dict)
+
+    return {
+        'stats': stats,
+        'rows': processed_rows,
+        'pagination': pagination_state(pagination),
+        'current_level': level,
+        'footer_totals': footer_totals
+    }
+
 @dashboard_bp.route('/branchweight')
+@read_replica
 def branch_weight_allocation():
     try:
-        unread_count = Notification.query.filter_by(is_read=False).count()
+        unread_count = get_unread_count()
         sync_time = datetime.now().strftime("%H:%M")
 
-        # Fetch latest snapshot date (handle Nulls by using COALESCE or just checking if any data exists)
-        has_any_data = db.session.query(LocationWiseStockSnapshot).first()
-        if not has_any_data:
+        # Active snapshot and its row count come from the snapshot registry
+        if not has_snapshot_data(LocationWiseStockSnapshot):
             empty_stats = {
                 'provision_pieces': 0, 'provision_weight': 0.0,
                 'stock_pieces': 0, 'stock_weight': 0.0,
@@ -70,85 +161,141 @@ def branch_weight_allocation():
                                  footer_totals=empty_stats,
                                  current_level='zone')
 
-        latest_date_query = db.session.query(func.max(LocationWiseStockSnapshot.snapshot_date)).scalar()
+        latest_date_query = active_snapshot_date(LocationWiseStockSnapshot)
         
-        # Filters
-        search = request.args.get('search', '').strip()
-        zone = request.args.get('zone', '')
-        state = request.args.get('state', '')
-        location = request.args.get('location', '')
-        business_head = request.args.get('business_head', '')
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 50, type=int)
 
-        # Cache Key for Main Route
-        cache_key = generate_cache_key('bw_main', latest_date_query, 
-                                     search=search, zone=zone, state=state, location=location, 
-                                     business_head=business_head, page=page, per_page=per_page)
+        data = branch_weight_report(latest_date_query, page, per_page)
+        pagination = restore_pagination(data['rows'], data['pagination'])
+
+        return render_template('branch_weight_allocation.html', 
+                             unread_count=unread_count, 
+                             sync_time=sync_time, 
+                             stats=data['stats'], 
+                             rows=data['rows'], 
+                             pagination=pagination, 
+                             footer_totals=data['footer_totals'],
+                             current_level=data['current_level'])
+    except Exception as e:
+        logger.error(f"Error in branch_weight_allocation: {str(e)}")
+        return f"Error: {str(e)}", 500
+
+@dashboard_bp.route('/api/branchweight/options')
+@read_replica
+@jwt_required()
+def branch_weight_options():
+    try:
+        zone = request.args.get('zone')
+        state = request.args.get('state')
+        return catalog_response('branchweight', narrow_locations(zone, state))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@dashboard_bp.route('/api/branchweight/facets')
+@read_replica
+@jwt_required()
+def branch_weight_facets():
+    try:
+        return jsonify(facet_counts('branchweight', request.args))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@dashboard_bp.route('/api/branchweight/suggest')
+@read_replica
+@jwt_required()
+def branch_weight_suggest():
+    try:
+        query = request.args.get('q', '')
+        return jsonify({'query': query, 'suggestions': suggestions('branchweight', query)})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@report_cache('branchweight', LocationWiseStockSnapshot)
+def branch_partial_report(latest_date_query, page, per_page):
+    """Grid rows for the branch weight partial: the root level, or the children of one expanded node."""
+    # Filters and Parent Info for Drill-down
+    search = request.args.get('search', '').strip()
+    zone = request.args.get('zone', '')
+    state = request.args.get('state', '')
+    location = request.args.get('location', '')
+    business_head = request.args.get('business_head', '')
+    
+    # Tree-grid specific params
+    parent_level = request.args.get('parent_level')
+    parent_value = request.args.get('parent_value')
+    grandparent_value = request.args.get('grandparent_value') # For state level, we might need zone
+
+    def apply_filters(query):
+        if search:
+            query = query.filter(search_filter('branchweight', search))
+        if zone:
+            query = query.filter(LocationWiseStockSnapshot.zone == zone)
+        if state:
+            query = query.filter(LocationWiseStockSnapshot.state == state)
+        if location:
+            query = query.filter(LocationWiseStockSnapshot.location == location)
+        if business_head:
+            query = query.filter(LocationWiseStockSnapshot.business_head == business_head)
         
-        # Try to fetch from Redis
-        cached_data = redis_client.get(cache_key)
-        if cached_data:
-            logger.info(f"Cache HIT for {cache_key}")
-            data = json.loads(cached_data)
-            stats = data['stats']
-            rows = data['rows']
-            total = data['total']
-            current_level = data['current_level']
-            footer_totals = data['footer_totals']
-            
-            pagination = CachedPagination(rows, page, per_page, total)
-            
-            return render_template('branch_weight_allocation.html', 
-                                 unread_count=unread_count, 
-                                 sync_time=sync_time, 
-                                 stats=stats, 
-                                 rows=rows, 
-                                 pagination=pagination, 
-                                 footer_totals=footer_totals,
-                                 current_level=current_level)
-
-        logger.info(f"Cache MISS for {cache_key}")
-
-        def apply_filters(query):
-            if search:
-                query = query.filter(LocationWiseStockSnapshot.location.ilike(f"%{search}%") | 
-                                     LocationWiseStockSnapshot.zone.ilike(f"%{search}%") |
-                                     LocationWiseStockSnapshot.state.ilike(f"%{search}%"))
-            if zone:
-                query = query.filter(LocationWiseStockSnapshot.zone == zone)
-            if state:
-                query = query.filter(LocationWiseStockSnapshot.state == state)
-            if location:
-                query = query.filter(LocationWiseStockSnapshot.location == location)
-            if business_head:
-                query = query.filter(LocationWiseStockSnapshot.business_head == business_head)
+        if latest_date_query:
+            query = query.filter(LocationWiseStockSnapshot.snapshot_date == latest_date_query)
+        else:
+            query = query.filter(LocationWiseStockSnapshot.snapshot_date.is_(None))
             
-            if latest_date_query:
-                query = query.filter(LocationWiseStockSnapshot.snapshot_date == latest_date_query)
-            else:
-                query = query.filter(LocationWiseStockSnapshot.snapshot_date.is_(None))
-                
-            return query
-
-        # Global Stats
-        agg_cols = [
-            func.sum(LocationWiseStockSnapshot.provision_pieces).label('provision_pieces'),
-            func.sum(LocationWiseStockSnapshot.provision_weight).label('provision_weight'),
-            func.sum(LocationWiseStockSnapshot.stock_pieces).label('stock_pieces'),
-            func.sum(LocationWiseStockSnapshot.stock_weight).label('stock_weight'),
-            func.sum(LocationWiseStockSnapshot.short_pieces).label('short_pieces'),
-            func.sum(LocationWiseStockSnapshot.short_weight).label('short_weight'),
-            func.sum(LocationWiseStockSnapshot.max_weight_allocate_other_branches).label('max_allocate'),
-            func.sum(LocationWiseStockSnapshot.max_refill_qty_other_branches).label('max_refill')
-        ]
-        
+        return query
+
+    # Determine Grouping and Filtering based on Parent
+    if parent_level == 'zone':
+        # Expanding a Zone -> Show States
+        group_cols = [LocationWiseStockSnapshot.zone, LocationWiseStockSnapshot.state]
+        level = 'state'
+        # Filter by the parent zone
+        base_query = db.session.query(LocationWiseStockSnapshot).filter(LocationWiseStockSnapshot.zone == parent_value)
+    elif parent_level == 'state':
+        # Expanding a State -> Show Locations
+        group_cols = [LocationWiseStockSnapshot.zone, LocationWiseStockSnapshot.state, LocationWiseStockSnapshot.location]
+        level = 'location'
+        # Filter by the parent state (and zone if provided for uniqueness)
+        base_query = db.session.query(LocationWiseStockSnapshot).filter(LocationWiseStockSnapshot.state == parent_value)
+        if grandparent_value:
+             base_query = base_query.filter(LocationWiseStockSnapshot.zone == grandparent_value)
+    else:
+        # Default Root Level (Zone Summary) unless filters dictate otherwise
+        # Note: The original filter logic (zone/state/location args) still applies if used via sidebar
+        base_query = db.session.query(LocationWiseStockSnapshot)
+        if not zone:
+            group_cols = [LocationWiseStockSnapshot.zone]
+            level = 'zone'
+        elif zone and not state:
+            group_cols = [LocationWiseStockSnapshot.zone, LocationWiseStockSnapshot.state]
+            level = 'state'
+        else:
+            group_cols = [LocationWiseStockSnapshot.zone, LocationWiseStockSnapshot.state, LocationWiseStockSnapshot.location]
+            level = 'location'
+
+    # Global Stats (Updated for filters - only relevant for full view, not child rows)
+    agg_cols = [
+        func.sum(LocationWiseStockSnapshot.provision_pieces).label('provision_pieces'),
+        func.sum(LocationWiseStockSnapshot.provision_weight).label('provision_weight'),
+        func.sum(LocationWiseStockSnapshot.stock_pieces).label('stock_pieces'),
+        func.sum(LocationWiseStockSnapshot.stock_weight).label('stock_weight'),
+        func.sum(LocationWiseStockSnapshot.short_pieces).label('short_pieces'),
+        func.sum(LocationWiseStockSnapshot.short_weight).label('short_weight'),
+        func.sum(LocationWiseStockSnapshot.max_weight_allocate_other_branches).label('max_allocate'),
+        func.sum(LocationWiseStockSnapshot.max_refill_qty_other_branches).label('max_refill')
+    ]
+    
+    # Calculate stats only if it's the main view (not child rows)
+    stats = {}
+    footer_totals = {}
+    if not parent_level:
         agg_q = db.session.query(*agg_cols)
         agg_q = apply_filters(agg_q)
         aggs = agg_q.first()
 
         if not aggs or aggs.provision_pieces is None:
-             stats = {
+            stats = {
                 'provision_pieces': 0, 'provision_weight': 0.0,
                 'stock_pieces': 0, 'stock_weight': 0.0,
                 'short_pieces': 0, 'short_weight': 0.0,
@@ -165,107 +312,56 @@ def branch_weight_allocation():
                 'max_allocate': safe_float(aggs.max_allocate),
                 'max_refill': safe_float(aggs.max_refill)
             }
-
         footer_totals = stats
-        
-        # Drill-down level
-        if not zone:
-            group_cols = [LocationWiseStockSnapshot.zone]
-            level = 'zone'
-        elif zone and not state:
-            group_cols = [LocationWiseStockSnapshot.zone, LocationWiseStockSnapshot.state]
-            level = 'state'
-        else:
-            group_cols = [LocationWiseStockSnapshot.zone, LocationWiseStockSnapshot.state, LocationWiseStockSnapshot.location]
-            level = 'location'
-
-        main_q = db.session.query(*(group_cols + agg_cols))
-        main_q = apply_filters(main_q)
-        main_q = main_q.group_by(*group_cols).order_by(*group_cols)
-        
-        pagination = main_q.paginate(page=page, per_page=per_page, error_out=False)
-        
-        processed_rows = []
-        for r in pagination.items:
-            row_dict = {
-                'zone': r[0] or 'Unknown',
-                'state': r[1] if level in ['state', 'location'] else '',
-                'location': r[2] if level == 'location' else '',
-                'provision_pieces': int(r.provision_pieces or 0),
-                'provision_weight': safe_float(r.provision_weight),
-                'stock_pieces': int(r.stock_pieces or 0),
-                'stock_weight': safe_float(r.stock_weight),
-                'short_pieces': int(r.short_pieces or 0),
-                'short_weight': safe_float(r.short_weight),
-                'max_allocate': safe_float(r.max_allocate),
-                'max_refill': safe_float(r.max_refill),
-                'level': level
-            }
-            if row_dict['state'] is None: row_dict['state'] = 'Unknown'
-            if row_dict['location'] is None: row_dict['location'] = 'Unknown'
-            processed_rows.append(row_dict)
-
-        # Write to Cache (Expire in 1 hour)
-        cache_payload = {
-            'stats': stats,
-            'rows': processed_rows,
-            'total': pagination.total,
-            'current_level': level,
-            'footer_totals': footer_totals
-        }
-        redis_client.setex(cache_key, 3600, json.dumps(cache_payload))
-
-        return render_template('branch_weight_allocation.html', 
-                             unread_count=unread_count, 
-                             sync_time=sync_time, 
-                             stats=stats, 
-                             rows=processed_rows, 
-                             pagination=pagination, 
-                             footer_totals=footer_totals,
-                             current_level=level)
-    except Exception as e:
-        logger.error(f"Error in branch_weight_allocation: {str(e)}")
-        return f"Error: {str(e)}", 500
 
-@dashboard_bp.route('/api/branchweight/options')
-@jwt_required()
-def branch_weight_options():
-    try:
-        zone = request.args.get('zone')
-        state = request.args.get('state')
-        
-        options = {
-            'zones': [r[0] for r in db.session.query(LocationWiseStockSnapshot.zone.distinct()).order_by(LocationWiseStockSnapshot.zone).all() if r[0]],
-            'states': [],
-            'locations': [],
-            'business_heads': [r[0] for r in db.session.query(LocationWiseStockSnapshot.business_head.distinct()).order_by(LocationWiseStockSnapshot.business_head).all() if r[0]]
+    # Main Query for Rows
+    main_q = base_query.with_entities(*(group_cols + agg_cols))
+    main_q = apply_filters(main_q)
+    main_q = main_q.group_by(*group_cols)
+    
+    # Pagination (only for root level or if needed, but tree grid usually just shows all children or paginates them)
+    # For simplicity, we'll paginate root, but maybe return all children? 
+    # Let's keep pagination for now.
+    pagination = paginate_query(main_q, group_cols, page, per_page)
+
+    processed_rows = []
+    for r in pagination.items:
+        row_dict = {
+            'zone': r[0] or 'Unknown',
+            'state': r[1] if level in ['state', 'location'] else '',
+            'location': r[2] if level == 'location' else '',
+            'provision_pieces': int(r.provision_pieces or 0),
+            'provision_weight': safe_float(r.provision_weight),
+            'stock_pieces': int(r.stock_pieces or 0),
+            'stock_weight': safe_float(r.stock_weight),
+            'short_pieces': int(r.short_pieces or 0),
+            'short_weight': safe_float(r.short_weight),
+            'max_allocate': safe_float(r.max_allocate),
+            'max_refill': safe_float(r.max_refill),
+            'level': level
         }
-        
-        if zone:
-            options['states'] = [r[0] for r in db.session.query(LocationWiseStockSnapshot.state.distinct()).filter(LocationWiseStockSnapshot.zone == zone).order_by(LocationWiseStockSnapshot.state).all() if r[0]]
-        else:
-            options['states'] = [r[0] for r in db.session.query(LocationWiseStockSnapshot.state.distinct()).order_by(LocationWiseStockSnapshot.state).all() if r[0]]
-            
-        if state:
-            options['locations'] = [r[0] for r in db.session.query(LocationWiseStockSnapshot.location.distinct()).filter(LocationWiseStockSnapshot.state == state).order_by(LocationWiseStockSnapshot.location).all() if r[0]]
-        elif zone:
-             options['locations'] = [r[0] for r in db.session.query(LocationWiseStockSnapshot.location.distinct()).filter(LocationWiseStockSnapshot.zone == zone).order_by(LocationWiseStockSnapshot.location).all() if r[0]]
-        else:
-            options['locations'] = [r[0] for r in db.session.query(LocationWiseStockSnapshot.location.distinct()).order_by(LocationWiseStockSnapshot.location).all() if r[0]]
-
-        return jsonify(options)
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        if row_dict['state'] is None: row_dict['state'] = 'Unknown'
+        if row_dict['location'] is None: row_dict['location'] = 'Unknown'
+        processed_rows.append(row_dict)
+
+    return {
+        'rows': processed_rows,
+        'pagination': pagination_state(pagination),
+        'footer_totals': footer_totals,
+        'stats': stats,
+        'current_level': level
+    }
 
 @dashboard_bp.route('/partial/branch')
+@read_replica
 @jwt_required()
+@fragment_cache('branchweight', LocationWiseStockSnapshot)
 def get_branch_partial():
     try:
-        latest_date_query = db.session.query(func.max(LocationWiseStockSnapshot.snapshot_date)).scalar()
+        latest_date_query = active_snapshot_date(LocationWiseStockSnapshot)
         
         # If no data at all, return an empty template with 200
-        has_any_data = db.session.query(LocationWiseStockSnapshot).first()
-        if not has_any_data:
+        if not has_snapshot_data(LocationWiseStockSnapshot):
             empty_stats = {
                 'provision_pieces': 0, 'provision_weight': 0.0,
                 'stock_pieces': 0, 'stock_weight': 0.0,
@@ -279,229 +375,137 @@ def get_branch_partial():
                                  stats=empty_stats,
                                  current_level='zone')
 
-        # Filters and Parent Info for Drill-down
-        search = request.args.get('search', '').strip()
-        zone = request.args.get('zone', '')
-        state = request.args.get('state', '')
-        location = request.args.get('location', '')
-        business_head = request.args.get('business_head', '')
-        
         # Tree-grid specific params
         parent_level = request.args.get('parent_level')
         parent_value = request.args.get('parent_value')
-        grandparent_value = request.args.get('grandparent_value') # For state level, we might need zone
+        is_child_rows = bool(parent_level)
 
         # Pagination Params
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 50, type=int)
-        
-        # Cache Key for Partial Route
-        cache_key = generate_cache_key('bw_partial', latest_date_query, 
-                                     search=search, zone=zone, state=state, location=location, 
-                                     business_head=business_head, parent_level=parent_level, 
-                                     parent_value=parent_value, grandparent_value=grandparent_value,
-                                     page=page, per_page=per_page)
-        
-        is_child_rows = bool(parent_level)
-        
-        # Try Cache
-        cached_data = redis_client.get(cache_key)
-        if cached_data:
-             logger.info(f"Cache HIT for {cache_key}")
-             data = json.loads(cached_data)
-             
-             # If paginated, rows are just rows. Pagination object reconstruction if needed.
-             if not is_child_rows:
-                 pagination = CachedPagination(data['rows'], page, per_page, data['total'])
-             else:
-                 pagination = None
-             
-             return render_template('partials/_view_branch_weight.html', 
-                              rows=data['rows'], 
-                              pagination=pagination, 
-                              footer_totals=data['footer_totals'],
-                              stats=data['stats'],
-                              current_level=data['current_level'],
-                              is_child_rows=is_child_rows,
-                              parent_level=parent_level,
-                              parent_value=parent_value)
-
-        logger.info(f"Cache MISS for {cache_key}")
-
-        def apply_filters(query):
-            if search:
-                query = query.filter(LocationWiseStockSnapshot.location.ilike(f"%{search}%") | 
-                                     LocationWiseStockSnapshot.zone.ilike(f"%{search}%") |
-                                     LocationWiseStockSnapshot.state.ilike(f"%{search}%"))
-            if zone:
-                query = query.filter(LocationWiseStockSnapshot.zone == zone)
-            if state:
-                query = query.filter(LocationWiseStockSnapshot.state == state)
-            if location:
-                query = query.filter(LocationWiseStockSnapshot.location == location)
-            if business_head:
-                query = query.filter(LocationWiseStockSnapshot.business_head == business_head)
-            
-            if latest_date_query:
-                query = query.filter(LocationWiseStockSnapshot.snapshot_date == latest_date_query)
-            else:
-                query = query.filter(LocationWiseStockSnapshot.snapshot_date.is_(None))
-                
-            return query
-
-        # Determine Grouping and Filtering based on Parent
-        if parent_level == 'zone':
-            # Expanding a Zone -> Show States
-            group_cols = [LocationWiseStockSnapshot.zone, LocationWiseStockSnapshot.state]
-            level = 'state'
-            # Filter by the parent zone
-            base_query = db.session.query(LocationWiseStockSnapshot).filter(LocationWiseStockSnapshot.zone == parent_value)
-        elif parent_level == 'state':
-            # Expanding a State -> Show Locations
-            group_cols = [LocationWiseStockSnapshot.zone, LocationWiseStockSnapshot.state, LocationWiseStockSnapshot.location]
-            level = 'location'
-            # Filter by the parent state (and zone if provided for uniqueness)
-            base_query = db.session.query(LocationWiseStockSnapshot).filter(LocationWiseStockSnapshot.state == parent_value)
-            if grandparent_value:
-                 base_query = base_query.filter(LocationWiseStockSnapshot.zone == grandparent_value)
-        else:
-            # Default Root Level (Zone Summary) unless filters dictate otherwise
-            # Note: The original filter logic (zone/state/location args) still applies if used via sidebar
-            base_query = db.session.query(LocationWiseStockSnapshot)
-            if not zone:
-                group_cols = [LocationWiseStockSnapshot.zone]
-                level = 'zone'
-            elif zone and not state:
-                group_cols = [LocationWiseStockSnapshot.zone, LocationWiseStockSnapshot.state]
-                level = 'state'
-            else:
-                group_cols = [LocationWiseStockSnapshot.zone, LocationWiseStockSnapshot.state, LocationWiseStockSnapshot.location]
-                level = 'location'
-
-        # Global Stats (Updated for filters - only relevant for full view, not child rows)
-        agg_cols = [
-            func.sum(LocationWiseStockSnapshot.provision_pieces).label('provision_pieces'),
-            func.sum(LocationWiseStockSnapshot.provision_weight).label('provision_weight'),
-            func.sum(LocationWiseStockSnapshot.stock_pieces).label('stock_pieces'),
-            func.sum(LocationWiseStockSnapshot.stock_weight).label('stock_weight'),
-            func.sum(LocationWiseStockSnapshot.short_pieces).label('short_pieces'),
-            func.sum(LocationWiseStockSnapshot.short_weight).label('short_weight'),
-            func.sum(LocationWiseStockSnapshot.max_weight_allocate_other_branches).label('max_allocate'),
-            func.sum(LocationWiseStockSnapshot.max_refill_qty_other_branches).label('max_refill')
-        ]
-        
-        # Calculate stats only if it's the main view (not child rows)
-        stats = {}
-        footer_totals = {}
-        if not parent_level:
-            agg_q = db.session.query(*agg_cols)
-            agg_q = apply_filters(agg_q)
-            aggs = agg_q.first()
-
-            if not aggs or aggs.provision_pieces is None:
-                stats = {
-                    'provision_pieces': 0, 'provision_weight': 0.0,
-                    'stock_pieces': 0, 'stock_weight': 0.0,
-                    'short_pieces': 0, 'short_weight': 0.0,
-                    'max_allocate': 0.0, 'max_refill': 0.0
-                }
-            else:
-                stats = {
-                    'provision_pieces': int(aggs.provision_pieces or 0),
-                    'provision_weight': safe_float(aggs.provision_weight),
-                    'stock_pieces': int(aggs.stock_pieces or 0),
-                    'stock_weight': safe_float(aggs.stock_weight),
-                    'short_pieces': int(aggs.short_pieces or 0),
-                    'short_weight': safe_float(aggs.short_weight),
-                    'max_allocate': safe_float(aggs.max_allocate),
-                    'max_refill': safe_float(aggs.max_refill)
-                }
-            footer_totals = stats
-
-        # Main Query for Rows
-        main_q = base_query.with_entities(*(group_cols + agg_cols))
-        main_q = apply_filters(main_q)
-        main_q = main_q.group_by(*group_cols).order_by(*group_cols)
-        
-        # Pagination (only for root level or if needed, but tree grid usually just shows all children or paginates them)
-        # For simplicity, we'll paginate root, but maybe return all children? 
-        # Let's keep pagination for now.
-        pagination = main_q.paginate(page=page, per_page=per_page, error_out=False)
-
-        processed_rows = []
-        for r in pagination.items:
-            row_dict = {
-                'zone': r[0] or 'Unknown',
-                'state': r[1] if level in ['state', 'location'] else '',
-                'location': r[2] if level == 'location' else '',
-                'provision_pieces': int(r.provision_pieces or 0),
-                'provision_weight': safe_float(r.provision_weight),
-                'stock_pieces': int(r.stock_pieces or 0),
-                'stock_weight': safe_float(r.stock_weight),
-                'short_pieces': int(r.short_pieces or 0),
-                'short_weight': safe_float(r.short_weight),
-                'max_allocate': safe_float(r.max_allocate),
-                'max_refill': safe_float(r.max_refill),
-                'level': level
-            }
-            if row_dict['state'] is None: row_dict['state'] = 'Unknown'
-            if row_dict['location'] is None: row_dict['location'] = 'Unknown'
-            processed_rows.append(row_dict)
-
-        # Cache Write
-        cache_payload = {
-            'rows': processed_rows,
-            'total': pagination.total,
-            'footer_totals': footer_totals,
-            'stats': stats,
-            'current_level': level
-        }
-        redis_client.setex(cache_key, 3600, json.dumps(cache_payload))
+
+        data = branch_partial_report(latest_date_query, page, per_page)
+
+        # Child rows render without a pager
+        pagination = restore_pagination(data['rows'], data['pagination']) if not is_child_rows else None
 
         return render_template('partials/_view_branch_weight.html', 
-                             rows=processed_rows, 
-                             pagination=pagination if not is_child_rows else None, 
-                             footer_totals=footer_totals,
-                             stats=stats,
-                             current_level=level,
+                             rows=data['rows'], 
+                             pagination=pagination, 
+                             footer_totals=data['footer_totals'],
+                             stats=data['stats'],
+                             current_level=data['current_level'],
                              is_child_rows=is_child_rows,
                              parent_level=parent_level,
                              parent_value=parent_value)
     except Exception as e:
         logger.error(f"Error in get_branch_partial: {str(e)}")
+        skip_fragment_cache()
         return f'<div class="p-8 text-center text-red-500 font-bold">Backend Error: {str(e)}</div>', 200
 
+def barcode_args():
+    """(location, batch_id) of a barcode popup or drill request; raises ValueError on a malformed batch_id."""
+    return request.args.get('location'), resolve_batch_id(request.args.get('batch_id'))
+
 #Max Refill Weight(in) popup content.
 @dashboard_bp.route('/api/branchweight/refill-barcodes')
+@read_replica
 @jwt_required()
 def get_refill_barcodes():
     try:
-        location = request.args.get('location')
+        location, batch_id = barcode_args()
         totalRefillAmount = Decimal(request.args.get('totalRefillAmount', 0))
         if not location:
             return '<div class="p-4 text-center text-red-500">Location required</div>', 400
-            
-        # For refill, we filter by target_location
-        barcodes = AllocatedBarcodesSnapshot.query.filter_by(target_location=location).all()
-        
-        return render_template('partials/_view_refill_barcodes.html', barcodes=barcodes, location=location, totalRefillAmount=totalRefillAmount)
+
+        # Source subtotals only; each source location's barcodes load when it is expanded
+        tree = weight_tree('refill', location, batch_id) if batch_id is not None else None
+
+        return render_template('partials/_view_refill_barcodes.html', tree=tree, batch_id=batch_id, location=location, totalRefillAmount=totalRefillAmount)
     except Exception as e:
         logger.error(f"Error in get_refill_barcodes: {str(e)}")
         return f'<div class="p-4 text-center text-red-500">Error: {str(e)}</div>', 200
 
 #Max Allocation Weight(out) popup content.
 @dashboard_bp.route('/api/branchweight/allocated-barcodes')
+@read_replica
 @jwt_required()
 def get_allocated_barcodes():
     try:
-        location = request.args.get('location')
+        location, batch_id = barcode_args()
         totalAmount = Decimal(request.args.get('totalAmount', '0'))
         if not location:
             return '<div class="p-4 text-center text-red-500">Location required</div>', 400
-            
-        barcodes = AllocatedBarcodesSnapshot.query.filter_by(source_location=location).all()
-        
-        return render_template('partials/_view_allocated_barcodes.html', barcodes=barcodes, location=location, totalAmount=totalAmount)
+
+        tree = weight_tree('allocated', location, batch_id) if batch_id is not None else None
+
+        return render_template('partials/_view_allocated_barcodes.html', tree=tree, batch_id=batch_id, location=location, totalAmount=totalAmount)
     except Exception as e:
         logger.error(f"Error in get_allocated_barcodes: {str(e)}")
         return f'<div class="p-4 text-center text-red-500">Error: {str(e)}</div>', 200
+
+# Barcode drill API: subtotals, lazily paged leaves and a streamed export per direction
+@dashboard_bp.route('/api/branchweight/barcodes/<direction>')
+@read_replica
+@jwt_required()
+def barcode_tree(direction):
+    if direction not in DIRECTIONS:
+        return jsonify({'error': 'Unknown direction'}), 404
+    try:
+        location, batch_id = barcode_args()
+    except ValueError:
+        return jsonify({'error': 'Invalid batch_id'}), 400
+    if not location:
+        return jsonify({'error': 'Location required'}), 400
+
+    tree = weight_tree(direction, location, batch_id) if batch_id is not None else None
+    return jsonify({'direction': direction, 'location': location, 'batch_id': batch_id, 'tree': tree})
+
+@dashboard_bp.route('/api/branchweight/barcodes/<direction>/leaves')
+@read_replica
+@jwt_required()
+def barcode_leaves(direction):
+    """One page of the barcodes under a location node, as rows for the popup's tree grid."""
+    if direction not in DIRECTIONS:
+        return "Unknown direction", 404
+    try:
+        location, batch_id = barcode_args()
+    except ValueError:
+        return "Invalid batch_id", 400
+    if not location or batch_id is None:
+        return "Location and batch required", 400
+
+    # The node's path; a level missing from the URL is the 'Unknown ...' node of blanks
+    path = [request.args.get('zone'), request.args.get('state'), request.args.get('counterpart')]
+    page = request.args.get('page', 1, type=int)
+    per_page = min(request.args.get('per_page', LEAF_PAGE_SIZE, type=int), MAX_LEAF_PAGE_SIZE)
+
+    query = leaf_query(direction, location, batch_id, path)
+    pagination = paginate_query(query, [AllocatedBarcodesSnapshot.barcode], page, per_page)
+
+    return render_template('partials/_view_barcode_leaves.html',
+                         barcodes=pagination.items,
+                         pagination=pagination,
+                         direction=direction,
+                         location=location,
+                         batch_id=batch_id,
+                         path=path)
+
+@dashboard_bp.route('/api/branchweight/barcodes/<direction>/export')
+@read_replica
+@jwt_required()
+def barcode_export(direction):
+    """Every barcode of the branch's batch as streamed newline-delimited JSON."""
+    if direction not in DIRECTIONS:
+        return jsonify({'error': 'Unknown direction'}), 404
+    try:
+        location, batch_id = barcode_args()
+    except ValueError:
+        return jsonify({'error': 'Invalid batch_id'}), 400
+    if not location or batch_id is None:
+        return jsonify({'error': 'Location and batch required'}), 400
+
+    response = Response(stream_with_context(stream_barcodes(direction, location, batch_id)),
+                        mimetype='application/x-ndjson')
+    response.headers['X-Batch-Id'] = str(batch_id)
+    return response
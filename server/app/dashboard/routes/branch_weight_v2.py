@@ -1,29 +1,29 @@
 from flask import render_template, request, jsonify
 from flask_jwt_extended import jwt_required
 from app.dashboard import dashboard_bp
-from app.models import Notification, LocationWiseStockSnapshot
-from app.extensions import db
-from sqlalchemy import func
+from app.database import read_replica
+from app.cache import fragment_cache, skip_fragment_cache
+from app.dashboard.pagination import restore_pagination
+from app.dashboard.routes.branch_weight import branch_weight_report, branch_partial_report
+from app.filter_catalog import catalog_response, facet_counts, narrow_locations
+from app.search import suggestions
+from app.models import LocationWiseStockSnapshot
+from app.notification_counter import get_unread_count
+from app.snapshots import active_snapshot_date, has_snapshot_data
 from datetime import datetime
 import logging
 
 logger = logging.getLogger(__name__)
 
-def safe_float(val):
-    try:
-        return float(val or 0)
-    except:
-        return 0.0
-
 @dashboard_bp.route('/branchweightv2')
+@read_replica
 def branch_weight_allocation_v2():
     try:
-        unread_count = Notification.query.filter_by(is_read=False).count()
+        unread_count = get_unread_count()
         sync_time = datetime.now().strftime("%H:%M")
 
-        # Fetch latest snapshot date (handle Nulls by using COALESCE or just checking if any data exists)
-        has_any_data = db.session.query(LocationWiseStockSnapshot).first()
-        if not has_any_data:
+        # Active snapshot and its row count come from the snapshot registry
+        if not has_snapshot_data(LocationWiseStockSnapshot):
             empty_stats = {
                 'provision_pieces': 0, 'provision_weight': 0.0,
                 'stock_pieces': 0, 'stock_weight': 0.0,
@@ -39,114 +39,18 @@ def branch_weight_allocation_v2():
                                  footer_totals=empty_stats,
                                  current_level='zone')
 
-        latest_date_query = db.session.query(func.max(LocationWiseStockSnapshot.snapshot_date)).scalar()
-        
-        # Filters
-        search = request.args.get('search', '').strip()
-        zone = request.args.get('zone', '')
-        state = request.args.get('state', '')
-        location = request.args.get('location', '')
-        business_head = request.args.get('business_head', '')
-
-        def apply_filters(query):
-            if search:
-                query = query.filter(LocationWiseStockSnapshot.location.ilike(f"%{search}%") | 
-                                     LocationWiseStockSnapshot.zone.ilike(f"%{search}%") |
-                                     LocationWiseStockSnapshot.state.ilike(f"%{search}%"))
-            if zone:
-                query = query.filter(LocationWiseStockSnapshot.zone == zone)
-            if state:
-                query = query.filter(LocationWiseStockSnapshot.state == state)
-            if location:
-                query = query.filter(LocationWiseStockSnapshot.location == location)
-            if business_head:
-                query = query.filter(LocationWiseStockSnapshot.business_head == business_head)
-            
-            # If latest_date_query is None, it means all rows are NULL date. 
-            # If not None, we filter by it.
-            if latest_date_query:
-                query = query.filter(LocationWiseStockSnapshot.snapshot_date == latest_date_query)
-            else:
-                query = query.filter(LocationWiseStockSnapshot.snapshot_date.is_(None))
-                
-            return query
-
-        # Global Stats
-        agg_cols = [
-            func.sum(LocationWiseStockSnapshot.provision_pieces).label('provision_pieces'),
-            func.sum(LocationWiseStockSnapshot.provision_weight).label('provision_weight'),
-            func.sum(LocationWiseStockSnapshot.stock_pieces).label('stock_pieces'),
-            func.sum(LocationWiseStockSnapshot.stock_weight).label('stock_weight'),
-            func.sum(LocationWiseStockSnapshot.short_pieces).label('short_pieces'),
-            func.sum(LocationWiseStockSnapshot.short_weight).label('short_weight'),
-            func.sum(LocationWiseStockSnapshot.max_weight_allocate_other_branches).label('max_allocate'),
-            func.sum(LocationWiseStockSnapshot.max_refill_qty_other_branches).label('max_refill')
-        ]
-        
-        agg_q = db.session.query(*agg_cols)
-        agg_q = apply_filters(agg_q)
-        aggs = agg_q.first()
-
-        if not aggs or aggs.provision_pieces is None:
-             # This means filters returned no rows
-             stats = {
-                'provision_pieces': 0, 'provision_weight': 0.0,
-                'stock_pieces': 0, 'stock_weight': 0.0,
-                'short_pieces': 0, 'short_weight': 0.0,
-                'max_allocate': 0.0, 'max_refill': 0.0
-            }
-        else:
-            stats = {
-                'provision_pieces': int(aggs.provision_pieces or 0),
-                'provision_weight': safe_float(aggs.provision_weight),
-                'stock_pieces': int(aggs.stock_pieces or 0),
-                'stock_weight': safe_float(aggs.stock_weight),
-                'short_pieces': int(aggs.short_pieces or 0),
-                'short_weight': safe_float(aggs.short_weight),
-                'max_allocate': safe_float(aggs.max_allocate),
-                'max_refill': safe_float(aggs.max_refill)
-            }
-
-        footer_totals = stats
-        
-        # Drill-down level
-        if not zone:
-            group_cols = [LocationWiseStockSnapshot.zone]
-            level = 'zone'
-        elif zone and not state:
-            group_cols = [LocationWiseStockSnapshot.zone, LocationWiseStockSnapshot.state]
-            level = 'state'
-        else:
-            group_cols = [LocationWiseStockSnapshot.zone, LocationWiseStockSnapshot.state, LocationWiseStockSnapshot.location]
-            level = 'location'
+        latest_date_query = active_snapshot_date(LocationWiseStockSnapshot)
 
-        main_q = db.session.query(*(group_cols + agg_cols))
-        main_q = apply_filters(main_q)
-        main_q = main_q.group_by(*group_cols).order_by(*group_cols)
-        
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 50, type=int)
-        pagination = main_q.paginate(page=page, per_page=per_page, error_out=False)
-        
-        processed_rows = []
-        for r in pagination.items:
-            row_dict = {
-                'zone': r[0] or 'Unknown',
-                'state': r[1] if level in ['state', 'location'] else '',
-                'location': r[2] if level == 'location' else '',
-                'provision_pieces': int(r.provision_pieces or 0),
-                'provision_weight': safe_float(r.provision_weight),
-                'stock_pieces': int(r.stock_pieces or 0),
-                'stock_weight': safe_float(r.stock_weight),
-                'short_pieces': int(r.short_pieces or 0),
-                'short_weight': safe_float(r.short_weight),
-                'max_allocate': safe_float(r.max_allocate),
-                'max_refill': safe_float(r.max_refill),
-                'level': level
-            }
-            if row_dict['state'] is None: row_dict['state'] = 'Unknown'
-            if row_dict['location'] is None: row_dict['location'] = 'Unknown'
-            processed_rows.append(row_dict)
+
+        # Same computation and cache entry as the v1 page
+        data = branch_weight_report(latest_date_query, page, per_page)
+        stats = data['stats']
+        footer_totals = data['footer_totals']
+        level = data['current_level']
+        processed_rows = data['rows']
+        pagination = restore_pagination(processed_rows, data['pagination'])
 
         # Calculate max values for data bars
         max_val_allocate = max((r['max_allocate'] for r in processed_rows), default=1)
@@ -167,44 +71,45 @@ def branch_weight_allocation_v2():
         return f"Error: {str(e)}", 500
 
 @dashboard_bp.route('/api/branchweightv2/options')
+@read_replica
 @jwt_required()
 def branch_weight_options_v2():
     try:
         zone = request.args.get('zone')
         state = request.args.get('state')
-        
-        options = {
-            'zones': [r[0] for r in db.session.query(LocationWiseStockSnapshot.zone.distinct()).order_by(LocationWiseStockSnapshot.zone).all() if r[0]],
-            'states': [],
-            'locations': [],
-            'business_heads': [r[0] for r in db.session.query(LocationWiseStockSnapshot.business_head.distinct()).order_by(LocationWiseStockSnapshot.business_head).all() if r[0]]
-        }
-        
-        if zone:
-            options['states'] = [r[0] for r in db.session.query(LocationWiseStockSnapshot.state.distinct()).filter(LocationWiseStockSnapshot.zone == zone).order_by(LocationWiseStockSnapshot.state).all() if r[0]]
-        else:
-            options['states'] = [r[0] for r in db.session.query(LocationWiseStockSnapshot.state.distinct()).order_by(LocationWiseStockSnapshot.state).all() if r[0]]
-            
-        if state:
-            options['locations'] = [r[0] for r in db.session.query(LocationWiseStockSnapshot.location.distinct()).filter(LocationWiseStockSnapshot.state == state).order_by(LocationWiseStockSnapshot.location).all() if r[0]]
-        elif zone:
-             options['locations'] = [r[0] for r in db.session.query(LocationWiseStockSnapshot.location.distinct()).filter(LocationWiseStockSnapshot.zone == zone).order_by(LocationWiseStockSnapshot.location).all() if r[0]]
-        else:
-            options['locations'] = [r[0] for r in db.session.query(LocationWiseStockSnapshot.location.distinct()).order_by(LocationWiseStockSnapshot.location).all() if r[0]]
+        return catalog_response('branchweight', narrow_locations(zone, state))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@dashboard_bp.route('/api/branchweightv2/facets')
+@read_replica
+@jwt_required()
+def branch_weight_facets_v2():
+    try:
+        return jsonify(facet_counts('branchweight', request.args))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
-        return jsonify(options)
+@dashboard_bp.route('/api/branchweightv2/suggest')
+@read_replica
+@jwt_required()
+def branch_weight_suggest_v2():
+    try:
+        query = request.args.get('q', '')
+        return jsonify({'query': query, 'suggestions': suggestions('branchweight', query)})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @dashboard_bp.route('/partial/branchv2')
+@read_replica
 @jwt_required()
+@fragment_cache('branchweight', LocationWiseStockSnapshot)
 def get_branch_partial_v2():
     try:
-        latest_date_query = db.session.query(func.max(LocationWiseStockSnapshot.snapshot_date)).scalar()
+        latest_date_query = active_snapshot_date(LocationWiseStockSnapshot)
         
         # If no data at all, return an empty template with 200
-        has_any_data = db.session.query(LocationWiseStockSnapshot).first()
-        if not has_any_data:
+        if not has_snapshot_data(LocationWiseStockSnapshot):
             empty_stats = {
                 'provision_pieces': 0, 'provision_weight': 0.0,
                 'stock_pieces': 0, 'stock_weight': 0.0,
@@ -218,140 +123,20 @@ def get_branch_partial_v2():
                                  stats=empty_stats,
                                  current_level='zone')
 
-        # Filters and Parent Info for Drill-down
-        search = request.args.get('search', '').strip()
-        zone = request.args.get('zone', '')
-        state = request.args.get('state', '')
-        location = request.args.get('location', '')
-        business_head = request.args.get('business_head', '')
-        
         # Tree-grid specific params
         parent_level = request.args.get('parent_level')
         parent_value = request.args.get('parent_value')
-        grandparent_value = request.args.get('grandparent_value') # For state level, we might need zone
-
-        def apply_filters(query):
-            if search:
-                query = query.filter(LocationWiseStockSnapshot.location.ilike(f"%{search}%") | 
-                                     LocationWiseStockSnapshot.zone.ilike(f"%{search}%") |
-                                     LocationWiseStockSnapshot.state.ilike(f"%{search}%"))
-            if zone:
-                query = query.filter(LocationWiseStockSnapshot.zone == zone)
-            if state:
-                query = query.filter(LocationWiseStockSnapshot.state == state)
-            if location:
-                query = query.filter(LocationWiseStockSnapshot.location == location)
-            if business_head:
-                query = query.filter(LocationWiseStockSnapshot.business_head == business_head)
-            
-            if latest_date_query:
-                query = query.filter(LocationWiseStockSnapshot.snapshot_date == latest_date_query)
-            else:
-                query = query.filter(LocationWiseStockSnapshot.snapshot_date.is_(None))
-                
-            return query
 
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 50, type=int)
-        
-        # Determine Grouping and Filtering based on Parent
-        if parent_level == 'zone':
-            # Expanding a Zone -> Show States
-            group_cols = [LocationWiseStockSnapshot.zone, LocationWiseStockSnapshot.state]
-            level = 'state'
-            # Filter by the parent zone
-            base_query = db.session.query(LocationWiseStockSnapshot).filter(LocationWiseStockSnapshot.zone == parent_value)
-        elif parent_level == 'state':
-            # Expanding a State -> Show Locations
-            group_cols = [LocationWiseStockSnapshot.zone, LocationWiseStockSnapshot.state, LocationWiseStockSnapshot.location]
-            level = 'location'
-            # Filter by the parent state (and zone if provided for uniqueness)
-            base_query = db.session.query(LocationWiseStockSnapshot).filter(LocationWiseStockSnapshot.state == parent_value)
-            if grandparent_value:
-                 base_query = base_query.filter(LocationWiseStockSnapshot.zone == grandparent_value)
-        else:
-            # Default Root Level (Zone Summary) unless filters dictate otherwise
-            # Note: The original filter logic (zone/state/location args) still applies if used via sidebar
-            base_query = db.session.query(LocationWiseStockSnapshot)
-            if not zone:
-                group_cols = [LocationWiseStockSnapshot.zone]
-                level = 'zone'
-            elif zone and not state:
-                group_cols = [LocationWiseStockSnapshot.zone, LocationWiseStockSnapshot.state]
-                level = 'state'
-            else:
-                group_cols = [LocationWiseStockSnapshot.zone, LocationWiseStockSnapshot.state, LocationWiseStockSnapshot.location]
-                level = 'location'
-
-        # Global Stats (Updated for filters - only relevant for full view, not child rows)
-        agg_cols = [
-            func.sum(LocationWiseStockSnapshot.provision_pieces).label('provision_pieces'),
-            func.sum(LocationWiseStockSnapshot.provision_weight).label('provision_weight'),
-            func.sum(LocationWiseStockSnapshot.stock_pieces).label('stock_pieces'),
-            func.sum(LocationWiseStockSnapshot.stock_weight).label('stock_weight'),
-            func.sum(LocationWiseStockSnapshot.short_pieces).label('short_pieces'),
-            func.sum(LocationWiseStockSnapshot.short_weight).label('short_weight'),
-            func.sum(LocationWiseStockSnapshot.max_weight_allocate_other_branches).label('max_allocate'),
-            func.sum(LocationWiseStockSnapshot.max_refill_qty_other_branches).label('max_refill')
-        ]
-        
-        # Calculate stats only if it's the main view (not child rows)
-        stats = {}
-        footer_totals = {}
-        if not parent_level:
-            agg_q = db.session.query(*agg_cols)
-            agg_q = apply_filters(agg_q)
-            aggs = agg_q.first()
 
-            if not aggs or aggs.provision_pieces is None:
-                stats = {
-                    'provision_pieces': 0, 'provision_weight': 0.0,
-                    'stock_pieces': 0, 'stock_weight': 0.0,
-                    'short_pieces': 0, 'short_weight': 0.0,
-                    'max_allocate': 0.0, 'max_refill': 0.0
-                }
-            else:
-                stats = {
-                    'provision_pieces': int(aggs.provision_pieces or 0),
-                    'provision_weight': safe_float(aggs.provision_weight),
-                    'stock_pieces': int(aggs.stock_pieces or 0),
-                    'stock_weight': safe_float(aggs.stock_weight),
-                    'short_pieces': int(aggs.short_pieces or 0),
-                    'short_weight': safe_float(aggs.short_weight),
-                    'max_allocate': safe_float(aggs.max_allocate),
-                    'max_refill': safe_float(aggs.max_refill)
-                }
-            footer_totals = stats
-
-        # Main Query for Rows
-        main_q = base_query.with_entities(*(group_cols + agg_cols))
-        main_q = apply_filters(main_q)
-        main_q = main_q.group_by(*group_cols).order_by(*group_cols)
-        
-        # Pagination (only for root level or if needed, but tree grid usually just shows all children or paginates them)
-        # For simplicity, we'll paginate root, but maybe return all children? 
-        # Let's keep pagination for now.
-        pagination = main_q.paginate(page=page, per_page=per_page, error_out=False)
-
-        processed_rows = []
-        for r in pagination.items:
-            row_dict = {
-                'zone': r[0] or 'Unknown',
-                'state': r[1] if level in ['state', 'location'] else '',
-                'location': r[2] if level == 'location' else '',
-                'provision_pieces': int(r.provision_pieces or 0),
-                'provision_weight': safe_float(r.provision_weight),
-                'stock_pieces': int(r.stock_pieces or 0),
-                'stock_weight': safe_float(r.stock_weight),
-                'short_pieces': int(r.short_pieces or 0),
-                'short_weight': safe_float(r.short_weight),
-                'max_allocate': safe_float(r.max_allocate),
-                'max_refill': safe_float(r.max_refill),
-                'level': level
-            }
-            if row_dict['state'] is None: row_dict['state'] = 'Unknown'
-            if row_dict['location'] is None: row_dict['location'] = 'Unknown'
-            processed_rows.append(row_dict)
+        # Same computation and cache entry as the v1 partial
+        data = branch_partial_report(latest_date_query, page, per_page)
+        stats = data['stats']
+        footer_totals = data['footer_totals']
+        level = data['current_level']
+        processed_rows = data['rows']
+        pagination = restore_pagination(processed_rows, data['pagination'])
 
         # Calculate max values for data bars
         max_val_allocate = max((r['max_allocate'] for r in processed_rows), default=1)
@@ -375,4 +160,5 @@ def get_branch_partial_v2():
                              max_val_refill=max_val_refill if max_val_refill > 0 else 1)
     except Exception as e:
         logger.error(f"Error in get_branch_partial_v2: {str(e)}")
+        skip_fragment_cache()
         return f'<div class="p-8 text-center text-red-500 font-bold">Backend Error: {str(e)}</div>', 200
@@ -1,17 +1,25 @@
 from flask import render_template, request, jsonify
 from flask_jwt_extended import jwt_required
 from app.dashboard import dashboard_bp
-from app.models import Notification, LocationWiseOrderSnapshot
+from app.database import read_replica
+from app.cache import fragment_cache, report_cache, row_dict
+from app.dashboard.pagination import paginate_query, pagination_state, restore_pagination
+from app.filter_catalog import catalog_response, facet_counts
+from app.search import search_filter, suggestions
+from app.models import LocationWiseOrderSnapshot
+from app.notification_counter import get_unread_count
+from app.snapshots import active_snapshot_date
 from app.extensions import db
 from sqlalchemy import func
 from datetime import datetime
 
 @dashboard_bp.route('/locationwiseorderstatus')
+@read_replica
 def location_wise_order_status():
-    unread_count = Notification.query.filter_by(is_read=False).count()
+    unread_count = get_unread_count()
     sync_time = datetime.now().strftime("%H:%M")
 
-    latest_date_query = db.session.query(func.max(LocationWiseOrderSnapshot.snapshot_date)).scalar()
+    latest_date_query = active_snapshot_date(LocationWiseOrderSnapshot)
     
     if not latest_date_query:
         return render_template('location_wise_order_status.html', 
@@ -30,11 +38,9 @@ def location_wise_order_status():
                          pagination=None, 
                          footer_totals={})
 
-@dashboard_bp.route('/locationwiseorderstatus/partial')
-@jwt_required()
-def get_location_wise_order_partial():
-    latest_date_query = db.session.query(func.max(LocationWiseOrderSnapshot.snapshot_date)).scalar()
-    
+@report_cache('locationwiseorder', LocationWiseOrderSnapshot)
+def location_wise_order_report(latest_date, page, per_page):
+    """Stats, footer totals and one page of rows for the request's filters at latest_date."""
     # Filters
     search = request.args.get('search', '').strip()
     location = request.args.get('location', '')
@@ -53,8 +59,7 @@ def get_location_wise_order_partial():
 
     def apply_filters(query):
         if search:
-            query = query.filter(LocationWiseOrderSnapshot.division.ilike(f"%{search}%") | 
-                                 LocationWiseOrderSnapshot.location.ilike(f"%{search}%"))
+            query = query.filter(search_filter('locationwiseorder', search))
         if location:
             query = query.filter(LocationWiseOrderSnapshot.location == location)
         if division:
@@ -81,6 +86,66 @@ def get_location_wise_order_partial():
             
         return query
 
+    # Global Stats
+    agg_q = db.session.query(
+        func.sum(LocationWiseOrderSnapshot.total_count).label('total_orders'),
+        func.sum(LocationWiseOrderSnapshot.dispatched_count).label('dispatched'),
+        func.sum(LocationWiseOrderSnapshot.in_process_count).label('in_process'),
+        func.sum(LocationWiseOrderSnapshot.delayed_count).label('delayed'),
+        func.avg(LocationWiseOrderSnapshot.sla_index_pct).label('sla_index'),
+        func.avg(LocationWiseOrderSnapshot.fulfillment_pct).label('fulfillment')
+    ).filter(LocationWiseOrderSnapshot.snapshot_date == latest_date)
+    agg_q = apply_filters(agg_q)
+    aggs = agg_q.first()
+
+    stats = {
+        'total_orders': f"{aggs.total_orders or 0:,}",
+        'dispatched': f"{aggs.dispatched or 0:,}",
+        'in_process': f"{aggs.in_process or 0:,}",
+        'delayed': f"{aggs.delayed or 0:,}",
+        'sla_index': f"{round(aggs.sla_index or 0, 1)}%",
+        'fulfillment': f"{int(aggs.fulfillment or 0)}%"
+    }
+
+    # Footer Totals
+    f_agg_q = db.session.query(
+        func.sum(LocationWiseOrderSnapshot.a_completed_count + LocationWiseOrderSnapshot.a_pending_count).label('a'),
+        func.sum(LocationWiseOrderSnapshot.b_completed_count + LocationWiseOrderSnapshot.b_pending_count).label('b'),
+        func.sum(LocationWiseOrderSnapshot.c_completed_count + LocationWiseOrderSnapshot.c_pending_count).label('c'),
+        func.sum(LocationWiseOrderSnapshot.d_completed_count + LocationWiseOrderSnapshot.d_pending_count).label('d'),
+        func.sum(LocationWiseOrderSnapshot.e_completed_count + LocationWiseOrderSnapshot.e_pending_count).label('e'),
+        func.sum(LocationWiseOrderSnapshot.f_completed_count + LocationWiseOrderSnapshot.f_pending_count).label('f'),
+        func.sum(LocationWiseOrderSnapshot.g_completed_count + LocationWiseOrderSnapshot.g_pending_count).label('g'),
+        func.sum(LocationWiseOrderSnapshot.total_count).label('total')
+    ).filter(LocationWiseOrderSnapshot.snapshot_date == latest_date)
+    f_agg_q = apply_filters(f_agg_q)
+    f_agg = f_agg_q.first()
+
+    footer_totals = {
+        'a': f"{f_agg.a or 0:,}", 'b': f"{f_agg.b or 0:,}", 'c': f"{f_agg.c or 0:,}",
+        'd': f"{f_agg.d or 0:,}", 'e': f"{f_agg.e or 0:,}", 'f': f"{f_agg.f or 0:,}",
+        'g': f"{f_agg.g or 0:,}", 'total': f"{f_agg.total or 0:,}"
+    }
+
+    # Paginate
+    main_q = LocationWiseOrderSnapshot.query.filter_by(snapshot_date=latest_date)
+    main_q = apply_filters(main_q)
+    pagination = paginate_query(main_q, [LocationWiseOrderSnapshot.snapshot_id], page, per_page)
+
+    return {
+        'stats': stats,
+        'footer_totals': footer_totals,
+        'rows': [row_dict(r) for r in pagination.items],
+        'pagination': pagination_state(pagination)
+    }
+
+@dashboard_bp.route('/locationwiseorderstatus/partial')
+@read_replica
+@jwt_required()
+@fragment_cache('locationwiseorder', LocationWiseOrderSnapshot)
+def get_location_wise_order_partial():
+    latest_date_query = active_snapshot_date(LocationWiseOrderSnapshot)
+
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 50, type=int)
     
@@ -89,51 +154,10 @@ def get_location_wise_order_partial():
     stats = {}
     
     if latest_date_query:
-        # Global Stats
-        agg_q = db.session.query(
-            func.sum(LocationWiseOrderSnapshot.total_count).label('total_orders'),
-            func.sum(LocationWiseOrderSnapshot.dispatched_count).label('dispatched'),
-            func.sum(LocationWiseOrderSnapshot.in_process_count).label('in_process'),
-            func.sum(LocationWiseOrderSnapshot.delayed_count).label('delayed'),
-            func.avg(LocationWiseOrderSnapshot.sla_index_pct).label('sla_index'),
-            func.avg(LocationWiseOrderSnapshot.fulfillment_pct).label('fulfillment')
-        ).filter(LocationWiseOrderSnapshot.snapshot_date == latest_date_query)
-        agg_q = apply_filters(agg_q)
-        aggs = agg_q.first()
-
-        stats = {
-            'total_orders': f"{aggs.total_orders or 0:,}",
-            'dispatched': f"{aggs.dispatched or 0:,}",
-            'in_process': f"{aggs.in_process or 0:,}",
-            'delayed': f"{aggs.delayed or 0:,}",
-            'sla_index': f"{round(aggs.sla_index or 0, 1)}%",
-            'fulfillment': f"{int(aggs.fulfillment or 0)}%"
-        }
-
-        # Footer Totals
-        f_agg_q = db.session.query(
-            func.sum(LocationWiseOrderSnapshot.a_completed_count + LocationWiseOrderSnapshot.a_pending_count).label('a'),
-            func.sum(LocationWiseOrderSnapshot.b_completed_count + LocationWiseOrderSnapshot.b_pending_count).label('b'),
-            func.sum(LocationWiseOrderSnapshot.c_completed_count + LocationWiseOrderSnapshot.c_pending_count).label('c'),
-            func.sum(LocationWiseOrderSnapshot.d_completed_count + LocationWiseOrderSnapshot.d_pending_count).label('d'),
-            func.sum(LocationWiseOrderSnapshot.e_completed_count + LocationWiseOrderSnapshot.e_pending_count).label('e'),
-            func.sum(LocationWiseOrderSnapshot.f_completed_count + LocationWiseOrderSnapshot.f_pending_count).label('f'),
-            func.sum(LocationWiseOrderSnapshot.g_completed_count + LocationWiseOrderSnapshot.g_pending_count).label('g'),
-            func.sum(LocationWiseOrderSnapshot.total_count).label('total')
-        ).filter(LocationWiseOrderSnapshot.snapshot_date == latest_date_query)
-        f_agg_q = apply_filters(f_agg_q)
-        f_agg = f_agg_q.first()
-
-        footer_totals = {
-            'a': f"{f_agg.a or 0:,}", 'b': f"{f_agg.b or 0:,}", 'c': f"{f_agg.c or 0:,}",
-            'd': f"{f_agg.d or 0:,}", 'e': f"{f_agg.e or 0:,}", 'f': f"{f_agg.f or 0:,}",
-            'g': f"{f_agg.g or 0:,}", 'total': f"{f_agg.total or 0:,}"
-        }
-
-        # Paginate
-        main_q = LocationWiseOrderSnapshot.query.filter_by(snapshot_date=latest_date_query)
-        main_q = apply_filters(main_q)
-        pagination = main_q.paginate(page=page, per_page=per_page, error_out=False)
+        report = location_wise_order_report(latest_date_query, page, per_page)
+        stats = report['stats']
+        footer_totals = report['footer_totals']
+        pagination = restore_pagination(report['rows'], report['pagination'])
 
     return render_template('partials/_view_location_wise_order.html', 
                          rows=pagination.items if pagination else [], 
@@ -142,19 +166,20 @@ def get_location_wise_order_partial():
                          stats=stats)
 
 @dashboard_bp.route('/api/locationwiseorderstatus/options')
+@read_replica
 @jwt_required()
 def location_wise_order_options():
-    options = {
-        'locations': [r[0] for r in db.session.query(LocationWiseOrderSnapshot.location.distinct()).order_by(LocationWiseOrderSnapshot.location).all() if r[0]],
-        'divisions': [r[0] for r in db.session.query(LocationWiseOrderSnapshot.division.distinct()).order_by(LocationWiseOrderSnapshot.division).all() if r[0]],
-        'groups': [r[0] for r in db.session.query(LocationWiseOrderSnapshot.group_name.distinct()).order_by(LocationWiseOrderSnapshot.group_name).all() if r[0]],
-        'purities': [r[0] for r in db.session.query(LocationWiseOrderSnapshot.purity.distinct()).order_by(LocationWiseOrderSnapshot.purity).all() if r[0]],
-        'classifications': [r[0] for r in db.session.query(LocationWiseOrderSnapshot.classification.distinct()).order_by(LocationWiseOrderSnapshot.classification).all() if r[0]],
-        'makes': [r[0] for r in db.session.query(LocationWiseOrderSnapshot.make_location.distinct()).order_by(LocationWiseOrderSnapshot.make_location).all() if r[0]],
-        'collections': [r[0] for r in db.session.query(LocationWiseOrderSnapshot.collection.distinct()).order_by(LocationWiseOrderSnapshot.collection).all() if r[0]],
-        'make_owners': [r[0] for r in db.session.query(LocationWiseOrderSnapshot.make_owner.distinct()).order_by(LocationWiseOrderSnapshot.make_owner).all() if r[0]],
-        'collection_owners': [r[0] for r in db.session.query(LocationWiseOrderSnapshot.collection_owner.distinct()).order_by(LocationWiseOrderSnapshot.collection_owner).all() if r[0]],
-        'classification_owners': [r[0] for r in db.session.query(LocationWiseOrderSnapshot.classification_owner.distinct()).order_by(LocationWiseOrderSnapshot.classification_owner).all() if r[0]],
-        'business_heads': [r[0] for r in db.session.query(LocationWiseOrderSnapshot.business_head.distinct()).order_by(LocationWiseOrderSnapshot.business_head).all() if r[0]]
-    }
-    return jsonify(options)
+    return catalog_response('locationwiseorder')
+
+@dashboard_bp.route('/api/locationwiseorderstatus/facets')
+@read_replica
+@jwt_required()
+def location_wise_order_facets():
+    return jsonify(facet_counts('locationwiseorder', request.args))
+
+@dashboard_bp.route('/api/locationwiseorderstatus/suggest')
+@read_replica
+@jwt_required()
+def location_wise_order_suggest():
+    query = request.args.get('q', '')
+    return jsonify({'query': query, 'suggestions': suggestions('locationwiseorder', query)})
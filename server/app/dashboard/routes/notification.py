@@ -1,17 +1,42 @@
-from flask import render_template, request, jsonify
+from flask import render_template, request, jsonify, make_response
 from flask_jwt_extended import jwt_required
 from app.dashboard import dashboard_bp
 from app.models import Notification
+from app.notification_counter import adjust_unread
+from app.notification_feed import load_feed, push_to_feed, invalidate_feed, encode_cursor, decode_cursor
 from app.extensions import db, socketio
-import time
 from datetime import datetime
 
 @dashboard_bp.route('/notifications/list')
 @jwt_required()
 def get_notifications_list():
-    time.sleep(1) # Simulate network/processing delay
-    notifications = Notification.query.order_by(Notification.created_at.desc()).limit(20).all()
-    return render_template('partials/_notifications_list.html', notifications=notifications)
+    # ?cursor= pages back through older rows, ?since= fetches only rows newer than the client has,
+    # oldest first in pages of limit; latest is the next since while more_newer is set
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+    before = decode_cursor(request.args.get('cursor', ''))
+    since = decode_cursor(request.args.get('since', ''))
+    items, has_more = load_feed(before, since, limit)
+
+    next_cursor = encode_cursor(items[-1]) if items and has_more and since is None else None
+    latest = encode_cursor(items[0]) if items else request.args.get('since')
+    more_newer = since is not None and has_more
+
+    if request.args.get('format') == 'json':
+        return jsonify({
+            'items': [dict(item.to_dict(), time=item.get_time_ago()) for item in items],
+            'next_cursor': next_cursor,
+            'latest': latest,
+            'more_newer': more_newer
+        })
+
+    response = make_response(render_template('partials/_notifications_list.html', notifications=items))
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    if latest:
+        response.headers['X-Feed-Latest'] = latest
+    if more_newer:
+        response.headers['X-Feed-More'] = '1'
+    return response
 
 @dashboard_bp.route('/notify', methods=['POST'])
 def create_notification():
@@ -29,6 +54,8 @@ def create_notification():
         )
         db.session.add(notification)
         db.session.commit()
+        adjust_unread(1)
+        push_to_feed(notification)
 
         # Emit to all connected clients
         socketio.emit('new_notification', {
@@ -46,3 +73,25 @@ def create_notification():
     except Exception as e:
         db.session.rollback()
         return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@dashboard_bp.route('/notifications/<int:notification_id>/read', methods=['POST'])
+@jwt_required()
+def mark_notification_read(notification_id):
+    # Conditional UPDATE so a repeated click cannot decrement the counter twice
+    updated = Notification.query.filter_by(id=notification_id, is_read=False) \
+        .update({'is_read': True}, synchronize_session=False)
+    db.session.commit()
+    adjust_unread(-updated)
+    if updated:
+        invalidate_feed()
+    return jsonify({'status': 'success', 'updated': updated})
+
+@dashboard_bp.route('/notifications/read-all', methods=['POST'])
+@jwt_required()
+def mark_all_notifications_read():
+    updated = Notification.query.filter_by(is_read=False).update({'is_read': True}, synchronize_session=False)
+    db.session.commit()
+    adjust_unread(-updated)
+    if updated:
+        invalidate_feed()
+    return jsonify({'status': 'success', 'updated': updated})
@@ -1,18 +1,144 @@
 from flask import render_template, request, jsonify
 from flask_jwt_extended import jwt_required
 from app.dashboard import dashboard_bp
-from app.models import Notification, OrderStatusReportSnapshot
-from app.extensions import db
-from sqlalchemy import func
+from app.database import read_replica
+from app.dashboard.aggregation import grouped_report
+from app.cache import fragment_cache, report_cache, row_dict
+from app.dashboard.pagination import pagination_state, request_cursor, restore_pagination
+from app.filter_catalog import catalog_response, facet_counts
+from app.models import OrderStatusReportSnapshot
+from app.notification_counter import get_unread_count
+from app.rollups import STAGES, ORDER_STATUS_SUM_KEYS, ORDER_STATUS_AVG_KEYS, rollup_for, rollups_ready
+from app.search import search_filter, suggestions
+from app.snapshots import active_snapshot_date
 from datetime import datetime
 
+# Request arg -> snapshot column for the exact-match sidebar filters
+FILTER_COLUMNS = {
+    'division': OrderStatusReportSnapshot.division,
+    'group': OrderStatusReportSnapshot.group_name,
+    'purity': OrderStatusReportSnapshot.purity,
+    'classification': OrderStatusReportSnapshot.classification,
+    'make': OrderStatusReportSnapshot.make_location,
+    'collection': OrderStatusReportSnapshot.collection,
+    'party': OrderStatusReportSnapshot.party_name,
+    'make_owner': OrderStatusReportSnapshot.make_owner,
+    'collection_owner': OrderStatusReportSnapshot.collection_owner,
+    'classification_owner': OrderStatusReportSnapshot.classification_owner,
+    'business_head': OrderStatusReportSnapshot.business_head
+}
+
+# Identifiers to group by for each drill level
+GROUP_COLUMNS = {
+    'make': [
+        OrderStatusReportSnapshot.division,
+        OrderStatusReportSnapshot.group_name,
+        OrderStatusReportSnapshot.purity,
+        OrderStatusReportSnapshot.classification,
+        OrderStatusReportSnapshot.make_location
+    ],
+    'collection': [
+        OrderStatusReportSnapshot.division,
+        OrderStatusReportSnapshot.group_name,
+        OrderStatusReportSnapshot.purity,
+        OrderStatusReportSnapshot.classification,
+        OrderStatusReportSnapshot.make_location,
+        OrderStatusReportSnapshot.collection
+    ],
+    # hierarchy_key is unique per snapshot_date, so grouping on the full hierarchy yields one row per party line
+    'party': [
+        OrderStatusReportSnapshot.division,
+        OrderStatusReportSnapshot.group_name,
+        OrderStatusReportSnapshot.purity,
+        OrderStatusReportSnapshot.classification,
+        OrderStatusReportSnapshot.make_location,
+        OrderStatusReportSnapshot.collection,
+        OrderStatusReportSnapshot.party_name
+    ]
+}
+
+SUM_COLUMNS = [getattr(OrderStatusReportSnapshot, key) for key in ORDER_STATUS_SUM_KEYS]
+
+AVG_COLUMNS = [getattr(OrderStatusReportSnapshot, key) for key in ORDER_STATUS_AVG_KEYS]
+
+def apply_filters(query, search, filters, model=OrderStatusReportSnapshot):
+    if search:
+        query = query.filter(search_filter('orderstatus', search))
+    for name, column in FILTER_COLUMNS.items():
+        if filters.get(name):
+            query = query.filter(getattr(model, column.key) == filters[name])
+    return query
+
+def request_filters():
+    search = request.args.get('search', '').strip()
+    filters = {name: request.args.get(name, '') for name in FILTER_COLUMNS}
+    return search, filters
+
+def build_report(latest_date, view_type, page, per_page):
+    """KPIs, footer totals and the page of grouped rows from one grouped scan."""
+    search, filters = request_filters()
+
+    # Read the pre-aggregated rollup for this level when the filters fit its grain
+    rollup = rollup_for(view_type, search, filters, FILTER_COLUMNS)
+    if rollup is not None and rollups_ready(latest_date):
+        model = rollup
+        sum_cols = [getattr(rollup, key) for key in ORDER_STATUS_SUM_KEYS]
+        avg_cols = [(key, getattr(rollup, f'{key}_sum'), getattr(rollup, f'{key}_n')) for key in ORDER_STATUS_AVG_KEYS]
+        row_count_col = rollup.row_count
+    else:
+        model = OrderStatusReportSnapshot
+        sum_cols, avg_cols, row_count_col = SUM_COLUMNS, AVG_COLUMNS, None
+
+    base_q = model.query.filter(model.snapshot_date == latest_date)
+    base_q = apply_filters(base_q, search, filters, model)
+
+    group_cols = [getattr(model, c.key) for c in GROUP_COLUMNS[view_type]]
+    order_keys = ['division', 'group_name', 'make_location']
+    order_by = [getattr(model, key) for key in order_keys] + [c for c in group_cols if c.key not in order_keys]
+    totals, pagination = grouped_report(base_q, group_cols, sum_cols, avg_cols, order_by, page, per_page,
+                                        row_count_col=row_count_col, cursor=request_cursor())
+
+    stats = {
+        'total_orders': f"{totals['total_count'] or 0:,}",
+        'dispatched': f"{totals['dispatched_count'] or 0:,}",
+        'in_process': f"{totals['in_process_count'] or 0:,}",
+        'delayed': f"{totals['delayed_count'] or 0:,}",
+        'active_slots': f"{totals['active_slots'] or 0:,}",
+        'sla_index': f"{round(totals['sla_index_pct'] or 0, 1)}%",
+        'quality_score': f"{round(totals['avg_quality_score'] or 0, 1)}/5",
+        'fulfillment': f"{int(totals['fulfillment_pct'] or 0)}%"
+    }
+
+    footer_totals = {
+        stage: f"{(totals[f'{stage}_completed_count'] or 0) + (totals[f'{stage}_pending_count'] or 0):,}"
+        for stage in STAGES
+    }
+    footer_totals['total'] = f"{totals['total_count'] or 0:,}"
+
+    return stats, footer_totals, pagination
+
+@report_cache('orderstatus', OrderStatusReportSnapshot)
+def order_status_report(latest_date, view_type, page, per_page):
+    stats, footer_totals, pagination = build_report(latest_date, view_type, page, per_page)
+    return {
+        'stats': stats,
+        'footer_totals': footer_totals,
+        'rows': [row_dict(r) for r in pagination.items],
+        'pagination': pagination_state(pagination)
+    }
+
+def cached_report(latest_date, view_type, page, per_page):
+    report = order_status_report(latest_date, view_type, page, per_page)
+    return report['stats'], report['footer_totals'], restore_pagination(report['rows'], report['pagination'])
+
 @dashboard_bp.route('/orderstatus')
+@read_replica
 def order_status():
-    unread_count = Notification.query.filter_by(is_read=False).count()
+    unread_count = get_unread_count()
     sync_time = datetime.now().strftime("%H:%M")
 
     # Fetch latest snapshot date
-    latest_date_query = db.session.query(func.max(OrderStatusReportSnapshot.snapshot_date)).scalar()
+    latest_date_query = active_snapshot_date(OrderStatusReportSnapshot)
     
     if not latest_date_query:
         return render_template('order_status.html', 
@@ -23,320 +149,48 @@ def order_status():
                              pagination=None, 
                              footer_totals={})
 
-    # Filters
-    search = request.args.get('search', '').strip()
-    division = request.args.get('division', '')
-    group = request.args.get('group', '')
-    purity = request.args.get('purity', '')
-    classification = request.args.get('classification', '')
-    make = request.args.get('make', '')
-    collection = request.args.get('collection', '')
-    party = request.args.get('party', '')
-    
-    # New Owner Filters
-    make_owner = request.args.get('make_owner', '')
-    collection_owner = request.args.get('collection_owner', '')
-    classification_owner = request.args.get('classification_owner', '')
-    business_head = request.args.get('business_head', '')
-
-    def apply_filters(query):
-        if search:
-            query = query.filter(OrderStatusReportSnapshot.hierarchy_key.ilike(f"%{search}%"))
-        if division:
-            query = query.filter(OrderStatusReportSnapshot.division == division)
-        if group:
-            query = query.filter(OrderStatusReportSnapshot.group_name == group)
-        if purity:
-            query = query.filter(OrderStatusReportSnapshot.purity == purity)
-        if classification:
-            query = query.filter(OrderStatusReportSnapshot.classification == classification)
-        if make:
-            query = query.filter(OrderStatusReportSnapshot.make_location == make)
-        if collection:
-            query = query.filter(OrderStatusReportSnapshot.collection == collection)
-        if party:
-            query = query.filter(OrderStatusReportSnapshot.party_name == party)
-            
-        # Apply New Owner Filters
-        if make_owner:
-            query = query.filter(OrderStatusReportSnapshot.make_owner == make_owner)
-        if collection_owner:
-            query = query.filter(OrderStatusReportSnapshot.collection_owner == collection_owner)
-        if classification_owner:
-            query = query.filter(OrderStatusReportSnapshot.classification_owner == classification_owner)
-        if business_head:
-            query = query.filter(OrderStatusReportSnapshot.business_head == business_head)
-            
-        return query
-
-    # Global Stats
-    agg_q = db.session.query(
-        func.sum(OrderStatusReportSnapshot.total_count).label('total_orders'),
-        func.sum(OrderStatusReportSnapshot.dispatched_count).label('dispatched'),
-        func.sum(OrderStatusReportSnapshot.in_process_count).label('in_process'),
-        func.sum(OrderStatusReportSnapshot.delayed_count).label('delayed'),
-        func.sum(OrderStatusReportSnapshot.active_slots).label('active_slots'),
-        func.avg(OrderStatusReportSnapshot.sla_index_pct).label('sla_index'),
-        func.avg(OrderStatusReportSnapshot.avg_quality_score).label('quality_score'),
-        func.avg(OrderStatusReportSnapshot.fulfillment_pct).label('fulfillment')
-    ).filter(OrderStatusReportSnapshot.snapshot_date == latest_date_query)
-    
-    agg_q = apply_filters(agg_q)
-    aggs = agg_q.first()
-
-    stats = {
-        'total_orders': f"{aggs.total_orders or 0:,}",
-        'dispatched': f"{aggs.dispatched or 0:,}",
-        'in_process': f"{aggs.in_process or 0:,}",
-        'delayed': f"{aggs.delayed or 0:,}",
-        'active_slots': f"{aggs.active_slots or 0:,}",
-        'sla_index': f"{round(aggs.sla_index or 0, 1)}%",
-        'quality_score': f"{round(aggs.quality_score or 0, 1)}/5",
-        'fulfillment': f"{int(aggs.fulfillment or 0)}%"
-    }
-
-    # Footer Totals
-    footer_q = db.session.query(
-        func.sum(OrderStatusReportSnapshot.a_completed_count + OrderStatusReportSnapshot.a_pending_count).label('a'),
-        func.sum(OrderStatusReportSnapshot.b_completed_count + OrderStatusReportSnapshot.b_pending_count).label('b'),
-        func.sum(OrderStatusReportSnapshot.c_completed_count + OrderStatusReportSnapshot.c_pending_count).label('c'),
-        func.sum(OrderStatusReportSnapshot.d_completed_count + OrderStatusReportSnapshot.d_pending_count).label('d'),
-        func.sum(OrderStatusReportSnapshot.e_completed_count + OrderStatusReportSnapshot.e_pending_count).label('e'),
-        func.sum(OrderStatusReportSnapshot.f_completed_count + OrderStatusReportSnapshot.f_pending_count).label('f'),
-        func.sum(OrderStatusReportSnapshot.g_completed_count + OrderStatusReportSnapshot.g_pending_count).label('g'),
-        func.sum(OrderStatusReportSnapshot.total_count).label('total')
-    ).filter(OrderStatusReportSnapshot.snapshot_date == latest_date_query)
-    
-    footer_q = apply_filters(footer_q)
-    footer_aggs = footer_q.first()
-
-    footer_totals = {
-        'a': f"{footer_aggs.a or 0:,}", 'b': f"{footer_aggs.b or 0:,}", 'c': f"{footer_aggs.c or 0:,}",
-        'd': f"{footer_aggs.d or 0:,}", 'e': f"{footer_aggs.e or 0:,}", 'f': f"{footer_aggs.f or 0:,}",
-        'g': f"{footer_aggs.g or 0:,}", 'total': f"{footer_aggs.total or 0:,}"
-    }
-    
     # Pagination
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 50, type=int)
-    
-    # Identifiers to group by for Make view
-    group_cols_make = [
-        OrderStatusReportSnapshot.division,
-        OrderStatusReportSnapshot.group_name,
-        OrderStatusReportSnapshot.purity,
-        OrderStatusReportSnapshot.classification,
-        OrderStatusReportSnapshot.make_location
-    ]
-    
-    # Aggregates
-    agg_cols = [
-        func.sum(OrderStatusReportSnapshot.a_completed_count).label('a_completed_count'),
-        func.sum(OrderStatusReportSnapshot.a_pending_count).label('a_pending_count'),
-        func.sum(OrderStatusReportSnapshot.b_completed_count).label('b_completed_count'),
-        func.sum(OrderStatusReportSnapshot.b_pending_count).label('b_pending_count'),
-        func.sum(OrderStatusReportSnapshot.c_completed_count).label('c_completed_count'),
-        func.sum(OrderStatusReportSnapshot.c_pending_count).label('c_pending_count'),
-        func.sum(OrderStatusReportSnapshot.d_completed_count).label('d_completed_count'),
-        func.sum(OrderStatusReportSnapshot.d_pending_count).label('d_pending_count'),
-        func.sum(OrderStatusReportSnapshot.e_completed_count).label('e_completed_count'),
-        func.sum(OrderStatusReportSnapshot.e_pending_count).label('e_pending_count'),
-        func.sum(OrderStatusReportSnapshot.f_completed_count).label('f_completed_count'),
-        func.sum(OrderStatusReportSnapshot.f_pending_count).label('f_pending_count'),
-        func.sum(OrderStatusReportSnapshot.g_completed_count).label('g_completed_count'),
-        func.sum(OrderStatusReportSnapshot.g_pending_count).label('g_pending_count'),
-        func.sum(OrderStatusReportSnapshot.total_count).label('total_count'),
-        func.sum(OrderStatusReportSnapshot.dispatched_count).label('dispatched_count'),
-        func.sum(OrderStatusReportSnapshot.in_process_count).label('in_process_count'),
-        func.sum(OrderStatusReportSnapshot.delayed_count).label('delayed_count'),
-        func.sum(OrderStatusReportSnapshot.active_slots).label('active_slots'),
-        func.avg(OrderStatusReportSnapshot.sla_index_pct).label('sla_index_pct'),
-        func.avg(OrderStatusReportSnapshot.avg_quality_score).label('avg_quality_score'),
-        func.avg(OrderStatusReportSnapshot.fulfillment_pct).label('fulfillment_pct')
-    ]
 
-    main_q = db.session.query(*(group_cols_make + agg_cols)).filter(OrderStatusReportSnapshot.snapshot_date == latest_date_query)
-    main_q = apply_filters(main_q)
-    main_q = main_q.group_by(*group_cols_make).order_by(OrderStatusReportSnapshot.division, OrderStatusReportSnapshot.group_name, OrderStatusReportSnapshot.make_location)
-    
-    pagination = main_q.paginate(page=page, per_page=per_page, error_out=False)
+    stats, footer_totals, pagination = cached_report(latest_date_query, 'make', page, per_page)
     
     return render_template('order_status.html', unread_count=unread_count, sync_time=sync_time, stats=stats, rows=pagination.items, pagination=pagination, footer_totals=footer_totals)
 
 @dashboard_bp.route('/api/orderstatus/options')
+@read_replica
 @jwt_required()
 def order_status_options():
-    options = {
-        'divisions': [r[0] for r in db.session.query(OrderStatusReportSnapshot.division.distinct()).order_by(OrderStatusReportSnapshot.division).all() if r[0]],
-        'groups': [r[0] for r in db.session.query(OrderStatusReportSnapshot.group_name.distinct()).order_by(OrderStatusReportSnapshot.group_name).all() if r[0]],
-        'purities': [r[0] for r in db.session.query(OrderStatusReportSnapshot.purity.distinct()).order_by(OrderStatusReportSnapshot.purity).all() if r[0]],
-        'classifications': [r[0] for r in db.session.query(OrderStatusReportSnapshot.classification.distinct()).order_by(OrderStatusReportSnapshot.classification).all() if r[0]],
-        'makes': [r[0] for r in db.session.query(OrderStatusReportSnapshot.make_location.distinct()).order_by(OrderStatusReportSnapshot.make_location).all() if r[0]],
-        'collections': [r[0] for r in db.session.query(OrderStatusReportSnapshot.collection.distinct()).order_by(OrderStatusReportSnapshot.collection).all() if r[0]],
-        'parties': [r[0] for r in db.session.query(OrderStatusReportSnapshot.party_name.distinct()).order_by(OrderStatusReportSnapshot.party_name).all() if r[0]],
-        'make_owners': [r[0] for r in db.session.query(OrderStatusReportSnapshot.make_owner.distinct()).order_by(OrderStatusReportSnapshot.make_owner).all() if r[0]],
-        'collection_owners': [r[0] for r in db.session.query(OrderStatusReportSnapshot.collection_owner.distinct()).order_by(OrderStatusReportSnapshot.collection_owner).all() if r[0]],
-        'classification_owners': [r[0] for r in db.session.query(OrderStatusReportSnapshot.classification_owner.distinct()).order_by(OrderStatusReportSnapshot.classification_owner).all() if r[0]],
-        'business_heads': [r[0] for r in db.session.query(OrderStatusReportSnapshot.business_head.distinct()).order_by(OrderStatusReportSnapshot.business_head).all() if r[0]]
-    }
-    return jsonify(options)
+    return catalog_response('orderstatus')
+
+@dashboard_bp.route('/api/orderstatus/facets')
+@read_replica
+@jwt_required()
+def order_status_facets():
+    return jsonify(facet_counts('orderstatus', request.args))
+
+@dashboard_bp.route('/api/orderstatus/suggest')
+@read_replica
+@jwt_required()
+def order_status_suggest():
+    query = request.args.get('q', '')
+    return jsonify({'query': query, 'suggestions': suggestions('orderstatus', query)})
 
 @dashboard_bp.route('/partial/<view_type>')
+@read_replica
 @jwt_required()
+@fragment_cache('orderstatus', OrderStatusReportSnapshot)
 def get_dashboard_partial(view_type):
     if view_type not in ['make', 'collection', 'party']:
         return "Invalid view type", 400
         
-    latest_date_query = db.session.query(func.max(OrderStatusReportSnapshot.snapshot_date)).scalar()
-    
-    # Filters
-    search = request.args.get('search', '').strip()
-    division = request.args.get('division', '')
-    group = request.args.get('group', '')
-    purity = request.args.get('purity', '')
-    classification = request.args.get('classification', '')
-    make = request.args.get('make', '')
-    collection = request.args.get('collection', '')
-    party = request.args.get('party', '')
-    
-    # New Owner Filters
-    make_owner = request.args.get('make_owner', '')
-    collection_owner = request.args.get('collection_owner', '')
-    classification_owner = request.args.get('classification_owner', '')
-    business_head = request.args.get('business_head', '')
-
-    def apply_filters(query):
-        if search:
-            query = query.filter(OrderStatusReportSnapshot.hierarchy_key.ilike(f"%{search}%"))
-        if division:
-            query = query.filter(OrderStatusReportSnapshot.division == division)
-        if group:
-            query = query.filter(OrderStatusReportSnapshot.group_name == group)
-        if purity:
-            query = query.filter(OrderStatusReportSnapshot.purity == purity)
-        if classification:
-            query = query.filter(OrderStatusReportSnapshot.classification == classification)
-        if make:
-            query = query.filter(OrderStatusReportSnapshot.make_location == make)
-        if collection:
-            query = query.filter(OrderStatusReportSnapshot.collection == collection)
-        if party:
-            query = query.filter(OrderStatusReportSnapshot.party_name == party)
-            
-        # Apply New Owner Filters
-        if make_owner:
-            query = query.filter(OrderStatusReportSnapshot.make_owner == make_owner)
-        if collection_owner:
-            query = query.filter(OrderStatusReportSnapshot.collection_owner == collection_owner)
-        if classification_owner:
-            query = query.filter(OrderStatusReportSnapshot.classification_owner == classification_owner)
-        if business_head:
-            query = query.filter(OrderStatusReportSnapshot.business_head == business_head)
-            
-        return query
+    latest_date_query = active_snapshot_date(OrderStatusReportSnapshot)
 
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 50, type=int)
     
-    # Re-using stat queries could be refactored but copying for now
     if latest_date_query:
-        # Global Stats (Updated for filters)
-        agg_q = db.session.query(
-            func.sum(OrderStatusReportSnapshot.total_count).label('total_orders'),
-            func.sum(OrderStatusReportSnapshot.dispatched_count).label('dispatched'),
-            func.sum(OrderStatusReportSnapshot.in_process_count).label('in_process'),
-            func.sum(OrderStatusReportSnapshot.delayed_count).label('delayed'),
-            func.sum(OrderStatusReportSnapshot.active_slots).label('active_slots'),
-            func.avg(OrderStatusReportSnapshot.sla_index_pct).label('sla_index'),
-            func.avg(OrderStatusReportSnapshot.avg_quality_score).label('quality_score'),
-            func.avg(OrderStatusReportSnapshot.fulfillment_pct).label('fulfillment')
-        ).filter(OrderStatusReportSnapshot.snapshot_date == latest_date_query)
-        agg_q = apply_filters(agg_q)
-        aggs = agg_q.first()
-
-        stats = {
-            'total_orders': f"{aggs.total_orders or 0:,}",
-            'dispatched': f"{aggs.dispatched or 0:,}",
-            'in_process': f"{aggs.in_process or 0:,}",
-            'delayed': f"{aggs.delayed or 0:,}",
-            'active_slots': f"{aggs.active_slots or 0:,}",
-            'sla_index': f"{round(aggs.sla_index or 0, 1)}%",
-            'quality_score': f"{round(aggs.quality_score or 0, 1)}/5",
-            'fulfillment': f"{int(aggs.fulfillment or 0)}%"
-        }
-
-        # Footer Totals
-        f_agg_q = db.session.query(
-            func.sum(OrderStatusReportSnapshot.a_completed_count + OrderStatusReportSnapshot.a_pending_count).label('a'),
-            func.sum(OrderStatusReportSnapshot.b_completed_count + OrderStatusReportSnapshot.b_pending_count).label('b'),
-            func.sum(OrderStatusReportSnapshot.c_completed_count + OrderStatusReportSnapshot.c_pending_count).label('c'),
-            func.sum(OrderStatusReportSnapshot.d_completed_count + OrderStatusReportSnapshot.d_pending_count).label('d'),
-            func.sum(OrderStatusReportSnapshot.e_completed_count + OrderStatusReportSnapshot.e_pending_count).label('e'),
-            func.sum(OrderStatusReportSnapshot.f_completed_count + OrderStatusReportSnapshot.f_pending_count).label('f'),
-            func.sum(OrderStatusReportSnapshot.g_completed_count + OrderStatusReportSnapshot.g_pending_count).label('g'),
-            func.sum(OrderStatusReportSnapshot.total_count).label('total')
-        ).filter(OrderStatusReportSnapshot.snapshot_date == latest_date_query)
-        f_agg_q = apply_filters(f_agg_q)
-        f_agg = f_agg_q.first()
-
-        footer_totals = {
-            'a': f"{f_agg.a or 0:,}", 'b': f"{f_agg.b or 0:,}", 'c': f"{f_agg.c or 0:,}",
-            'd': f"{f_agg.d or 0:,}", 'e': f"{f_agg.e or 0:,}", 'f': f"{f_agg.f or 0:,}",
-            'g': f"{f_agg.g or 0:,}", 'total': f"{f_agg.total or 0:,}"
-        }
-
-        # Paginate
-        if view_type in ['make', 'collection']:
-            if view_type == 'make':
-                group_cols = [
-                    OrderStatusReportSnapshot.division,
-                    OrderStatusReportSnapshot.group_name,
-                    OrderStatusReportSnapshot.purity,
-                    OrderStatusReportSnapshot.classification,
-                    OrderStatusReportSnapshot.make_location
-                ]
-            else: # collection
-                group_cols = [
-                    OrderStatusReportSnapshot.division,
-                    OrderStatusReportSnapshot.group_name,
-                    OrderStatusReportSnapshot.purity,
-                    OrderStatusReportSnapshot.classification,
-                    OrderStatusReportSnapshot.make_location,
-                    OrderStatusReportSnapshot.collection
-                ]
-                
-            agg_cols = [
-                func.sum(OrderStatusReportSnapshot.a_completed_count).label('a_completed_count'),
-                func.sum(OrderStatusReportSnapshot.a_pending_count).label('a_pending_count'),
-                func.sum(OrderStatusReportSnapshot.b_completed_count).label('b_completed_count'),
-                func.sum(OrderStatusReportSnapshot.b_pending_count).label('b_pending_count'),
-                func.sum(OrderStatusReportSnapshot.c_completed_count).label('c_completed_count'),
-                func.sum(OrderStatusReportSnapshot.c_pending_count).label('c_pending_count'),
-                func.sum(OrderStatusReportSnapshot.d_completed_count).label('d_completed_count'),
-                func.sum(OrderStatusReportSnapshot.d_pending_count).label('d_pending_count'),
-                func.sum(OrderStatusReportSnapshot.e_completed_count).label('e_completed_count'),
-                func.sum(OrderStatusReportSnapshot.e_pending_count).label('e_pending_count'),
-                func.sum(OrderStatusReportSnapshot.f_completed_count).label('f_completed_count'),
-                func.sum(OrderStatusReportSnapshot.f_pending_count).label('f_pending_count'),
-                func.sum(OrderStatusReportSnapshot.g_completed_count).label('g_completed_count'),
-                func.sum(OrderStatusReportSnapshot.g_pending_count).label('g_pending_count'),
-                func.sum(OrderStatusReportSnapshot.total_count).label('total_count'),
-                func.sum(OrderStatusReportSnapshot.dispatched_count).label('dispatched_count'),
-                func.sum(OrderStatusReportSnapshot.in_process_count).label('in_process_count'),
-                func.sum(OrderStatusReportSnapshot.delayed_count).label('delayed_count'),
-                func.sum(OrderStatusReportSnapshot.active_slots).label('active_slots'),
-                func.avg(OrderStatusReportSnapshot.sla_index_pct).label('sla_index_pct'),
-                func.avg(OrderStatusReportSnapshot.avg_quality_score).label('avg_quality_score'),
-                func.avg(OrderStatusReportSnapshot.fulfillment_pct).label('fulfillment_pct')
-            ]
-            main_q = db.session.query(*(group_cols + agg_cols)).filter(OrderStatusReportSnapshot.snapshot_date == latest_date_query)
-            main_q = apply_filters(main_q)
-            main_q = main_q.group_by(*group_cols).order_by(OrderStatusReportSnapshot.division, OrderStatusReportSnapshot.group_name, OrderStatusReportSnapshot.make_location)
-        else: # party
-            main_q = OrderStatusReportSnapshot.query.filter_by(snapshot_date=latest_date_query)
-            main_q = apply_filters(main_q)
-            
-        pagination = main_q.paginate(page=page, per_page=per_page, error_out=False)
+        stats, footer_totals, pagination = cached_report(latest_date_query, view_type, page, per_page)
 
         return render_template(f'partials/_view_{view_type}.html', 
                              rows=pagination.items if pagination else [], 
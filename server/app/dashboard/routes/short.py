@@ -1,18 +1,26 @@
 from flask import render_template, request, jsonify
 from flask_jwt_extended import jwt_required
 from app.dashboard import dashboard_bp
-from app.models import Notification, ShortStatusReportSnapshot
+from app.database import read_replica
+from app.cache import fragment_cache, report_cache, row_dict
+from app.dashboard.pagination import paginate_query, pagination_state, restore_pagination
+from app.filter_catalog import catalog_response, facet_counts
+from app.search import search_filter, suggestions
+from app.models import ShortStatusReportSnapshot
+from app.notification_counter import get_unread_count
+from app.snapshots import active_snapshot_date
 from app.extensions import db
 from sqlalchemy import func
 from datetime import datetime
 
 @dashboard_bp.route('/shortstatus')
+@read_replica
 def short_status():
-    unread_count = Notification.query.filter_by(is_read=False).count()
+    unread_count = get_unread_count()
     sync_time = datetime.now().strftime("%H:%M")
 
     # Fetch latest snapshot date
-    latest_date_query = db.session.query(func.max(ShortStatusReportSnapshot.snapshot_date)).scalar()
+    latest_date_query = active_snapshot_date(ShortStatusReportSnapshot)
     
     if not latest_date_query:
         return render_template('short_status.html', 
@@ -31,11 +39,9 @@ def short_status():
                          pagination=None,
                          footer_totals={})
 
-@dashboard_bp.route('/shortstatus/partial')
-@jwt_required()
-def get_short_status_partial():
-    latest_date_query = db.session.query(func.max(ShortStatusReportSnapshot.snapshot_date)).scalar()
-    
+@report_cache('shortstatus', ShortStatusReportSnapshot)
+def short_status_report(latest_date, page, per_page):
+    """Stats, footer totals and one page of rows for the request's filters at latest_date."""
     # Filters (mapping requested names to model columns)
     search = request.args.get('search', '').strip()
     division = request.args.get('division', '')
@@ -49,9 +55,7 @@ def get_short_status_partial():
 
     def apply_filters(query):
         if search:
-            query = query.filter(ShortStatusReportSnapshot.division.ilike(f"%{search}%") | 
-                                 ShortStatusReportSnapshot.group_name.ilike(f"%{search}%") |
-                                 ShortStatusReportSnapshot.classification.ilike(f"%{search}%"))
+            query = query.filter(search_filter('shortstatus', search))
         if division:
             query = query.filter(ShortStatusReportSnapshot.division == division)
         if group:
@@ -70,6 +74,62 @@ def get_short_status_partial():
             query = query.filter(ShortStatusReportSnapshot.product_type == product_type)
         return query
 
+    # Global Stats for Short Status
+    agg_q = db.session.query(
+        func.sum(ShortStatusReportSnapshot.total_count).label('total_items'),
+        func.sum(ShortStatusReportSnapshot.weight).label('total_weight'),
+        func.count(ShortStatusReportSnapshot.product_type.distinct()).label('unique_products'),
+        func.avg(ShortStatusReportSnapshot.weight).label('avg_weight')
+    ).filter(ShortStatusReportSnapshot.snapshot_date == latest_date)
+    agg_q = apply_filters(agg_q)
+    aggs = agg_q.first()
+
+    stats = {
+        'total_items': f"{aggs.total_items or 0:,}",
+        'total_weight': f"{round(aggs.total_weight or 0, 3)}",
+        'unique_products': f"{aggs.unique_products or 0:,}",
+        'avg_weight': f"{round(aggs.avg_weight or 0, 3)}"
+    }
+
+    # Footer Totals
+    f_agg_q = db.session.query(
+        func.sum(ShortStatusReportSnapshot.a_completed_count + ShortStatusReportSnapshot.a_pending_count).label('a'),
+        func.sum(ShortStatusReportSnapshot.b_completed_count + ShortStatusReportSnapshot.b_pending_count).label('b'),
+        func.sum(ShortStatusReportSnapshot.c_completed_count + ShortStatusReportSnapshot.c_pending_count).label('c'),
+        func.sum(ShortStatusReportSnapshot.d_completed_count + ShortStatusReportSnapshot.d_pending_count).label('d'),
+        func.sum(ShortStatusReportSnapshot.e_completed_count + ShortStatusReportSnapshot.e_pending_count).label('e'),
+        func.sum(ShortStatusReportSnapshot.f_completed_count + ShortStatusReportSnapshot.f_pending_count).label('f'),
+        func.sum(ShortStatusReportSnapshot.g_completed_count + ShortStatusReportSnapshot.g_pending_count).label('g'),
+        func.sum(ShortStatusReportSnapshot.total_count).label('total')
+    ).filter(ShortStatusReportSnapshot.snapshot_date == latest_date)
+    f_agg_q = apply_filters(f_agg_q)
+    f_agg = f_agg_q.first()
+
+    footer_totals = {
+        'a': f"{f_agg.a or 0:,}", 'b': f"{f_agg.b or 0:,}", 'c': f"{f_agg.c or 0:,}",
+        'd': f"{f_agg.d or 0:,}", 'e': f"{f_agg.e or 0:,}", 'f': f"{f_agg.f or 0:,}",
+        'g': f"{f_agg.g or 0:,}", 'total': f"{f_agg.total or 0:,}"
+    }
+
+    # Paginate
+    main_q = ShortStatusReportSnapshot.query.filter_by(snapshot_date=latest_date)
+    main_q = apply_filters(main_q)
+    pagination = paginate_query(main_q, [ShortStatusReportSnapshot.snapshot_id], page, per_page)
+
+    return {
+        'stats': stats,
+        'footer_totals': footer_totals,
+        'rows': [row_dict(r) for r in pagination.items],
+        'pagination': pagination_state(pagination)
+    }
+
+@dashboard_bp.route('/shortstatus/partial')
+@read_replica
+@jwt_required()
+@fragment_cache('shortstatus', ShortStatusReportSnapshot)
+def get_short_status_partial():
+    latest_date_query = active_snapshot_date(ShortStatusReportSnapshot)
+
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 50, type=int)
     
@@ -78,47 +138,10 @@ def get_short_status_partial():
     stats = {}
     
     if latest_date_query:
-        # Global Stats for Short Status
-        agg_q = db.session.query(
-            func.sum(ShortStatusReportSnapshot.total_count).label('total_items'),
-            func.sum(ShortStatusReportSnapshot.weight).label('total_weight'),
-            func.count(ShortStatusReportSnapshot.product_type.distinct()).label('unique_products'),
-            func.avg(ShortStatusReportSnapshot.weight).label('avg_weight')
-        ).filter(ShortStatusReportSnapshot.snapshot_date == latest_date_query)
-        agg_q = apply_filters(agg_q)
-        aggs = agg_q.first()
-
-        stats = {
-            'total_items': f"{aggs.total_items or 0:,}",
-            'total_weight': f"{round(aggs.total_weight or 0, 3)}",
-            'unique_products': f"{aggs.unique_products or 0:,}",
-            'avg_weight': f"{round(aggs.avg_weight or 0, 3)}"
-        }
-
-        # Footer Totals
-        f_agg_q = db.session.query(
-            func.sum(ShortStatusReportSnapshot.a_completed_count + ShortStatusReportSnapshot.a_pending_count).label('a'),
-            func.sum(ShortStatusReportSnapshot.b_completed_count + ShortStatusReportSnapshot.b_pending_count).label('b'),
-            func.sum(ShortStatusReportSnapshot.c_completed_count + ShortStatusReportSnapshot.c_pending_count).label('c'),
-            func.sum(ShortStatusReportSnapshot.d_completed_count + ShortStatusReportSnapshot.d_pending_count).label('d'),
-            func.sum(ShortStatusReportSnapshot.e_completed_count + ShortStatusReportSnapshot.e_pending_count).label('e'),
-            func.sum(ShortStatusReportSnapshot.f_completed_count + ShortStatusReportSnapshot.f_pending_count).label('f'),
-            func.sum(ShortStatusReportSnapshot.g_completed_count + ShortStatusReportSnapshot.g_pending_count).label('g'),
-            func.sum(ShortStatusReportSnapshot.total_count).label('total')
-        ).filter(ShortStatusReportSnapshot.snapshot_date == latest_date_query)
-        f_agg_q = apply_filters(f_agg_q)
-        f_agg = f_agg_q.first()
-
-        footer_totals = {
-            'a': f"{f_agg.a or 0:,}", 'b': f"{f_agg.b or 0:,}", 'c': f"{f_agg.c or 0:,}",
-            'd': f"{f_agg.d or 0:,}", 'e': f"{f_agg.e or 0:,}", 'f': f"{f_agg.f or 0:,}",
-            'g': f"{f_agg.g or 0:,}", 'total': f"{f_agg.total or 0:,}"
-        }
-
-        # Paginate
-        main_q = ShortStatusReportSnapshot.query.filter_by(snapshot_date=latest_date_query)
-        main_q = apply_filters(main_q)
-        pagination = main_q.paginate(page=page, per_page=per_page, error_out=False)
+        report = short_status_report(latest_date_query, page, per_page)
+        stats = report['stats']
+        footer_totals = report['footer_totals']
+        pagination = restore_pagination(report['rows'], report['pagination'])
 
     return render_template('partials/_view_shortstatus.html', 
                          rows=pagination.items if pagination else [], 
@@ -127,21 +150,20 @@ def get_short_status_partial():
                          stats=stats)
 
 @dashboard_bp.route('/api/shortstatus/options')
+@read_replica
 @jwt_required()
 def short_status_options():
-    options = {
-        'divisions': [r[0] for r in db.session.query(ShortStatusReportSnapshot.division.distinct()).order_by(ShortStatusReportSnapshot.division).all() if r[0]],
-        'groups': [r[0] for r in db.session.query(ShortStatusReportSnapshot.group_name.distinct()).order_by(ShortStatusReportSnapshot.group_name).all() if r[0]],
-        'purities': [r[0] for r in db.session.query(ShortStatusReportSnapshot.purity.distinct()).order_by(ShortStatusReportSnapshot.purity).all() if r[0]],
-        'classifications': [r[0] for r in db.session.query(ShortStatusReportSnapshot.classification.distinct()).order_by(ShortStatusReportSnapshot.classification).all() if r[0]],
-        'makes': [r[0] for r in db.session.query(ShortStatusReportSnapshot.make_location.distinct()).order_by(ShortStatusReportSnapshot.make_location).all() if r[0]],
-        'collections': [r[0] for r in db.session.query(ShortStatusReportSnapshot.collection.distinct()).order_by(ShortStatusReportSnapshot.collection).all() if r[0]],
-        'sections': [r[0] for r in db.session.query(ShortStatusReportSnapshot.section.distinct()).order_by(ShortStatusReportSnapshot.section).all() if r[0]],
-        'product_types': [r[0] for r in db.session.query(ShortStatusReportSnapshot.product_type.distinct()).order_by(ShortStatusReportSnapshot.product_type).all() if r[0]],
-        'parties': [],
-        'make_owners': [],
-        'collection_owners': [],
-        'classification_owners': [],
-        'business_heads': []
-    }
-    return jsonify(options)
+    return catalog_response('shortstatus')
+
+@dashboard_bp.route('/api/shortstatus/facets')
+@read_replica
+@jwt_required()
+def short_status_facets():
+    return jsonify(facet_counts('shortstatus', request.args))
+
+@dashboard_bp.route('/api/shortstatus/suggest')
+@read_replica
+@jwt_required()
+def short_status_suggest():
+    query = request.args.get('q', '')
+    return jsonify({'query': query, 'suggestions': suggestions('shortstatus', query)})
@@ -0,0 +1,228 @@
+import itertools
+import logging
+import os
+import threading
+import time
+from functools import wraps
+from flask import g, has_request_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, text
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+def _env_bool(name, default):
+    return os.getenv(name, default).lower() in ('1', 'true', 'yes', 'on')
+
+class PoolMetrics:
+    """Process-wide counters for time spent waiting on a pooled connection."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.total_wait = 0.0
+            self.max_wait = 0.0
+
+    def record(self, wait, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'avg_wait_ms': round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                'max_wait_ms': round(self.max_wait * 1000, 3)
+            }
+
+pool_metrics = PoolMetrics()
+
+SLOW_CHECKOUT_SECONDS = int(os.getenv('DB_POOL_SLOW_WAIT_MS', 100)) / 1000
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a free connection."""
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except Exception:
+            pool_metrics.record(time.perf_counter() - started, timed_out=True)
+            raise
+        wait = time.perf_counter() - started
+        pool_metrics.record(wait)
+        if wait > SLOW_CHECKOUT_SECONDS:
+            logger.warning(f"Waited {wait * 1000:.0f}ms for a database connection ({self.status()})")
+        return conn
+
+def pgbouncer_mode():
+    return _env_bool('DB_PGBOUNCER', '0')
+
+def engine_options(database_uri):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS from the environment.
+
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE and DB_POOL_PRE_PING size
+    and health-check the pool; DB_STATEMENT_TIMEOUT_MS caps any single statement and
+    DB_APPLICATION_NAME labels our sessions in pg_stat_activity.
+
+    DB_PGBOUNCER=1 targets a transaction-pooling PgBouncer: no session state may outlive a
+    transaction, so the statement timeout is set per transaction instead of as a startup
+    option and driver-side prepared statements are disabled.
+    """
+    if not database_uri.startswith('postgresql'):
+        return {}
+
+    options = {
+        'poolclass': TimedQueuePool,
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 20)),
+        'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': _env_bool('DB_POOL_PRE_PING', '1')
+    }
+
+    connect_args = {'application_name': os.getenv('DB_APPLICATION_NAME', 'dcrystal-server')}
+    statement_timeout = os.getenv('DB_STATEMENT_TIMEOUT_MS')
+    if pgbouncer_mode():
+        if database_uri.startswith('postgresql+psycopg:'):
+            connect_args['prepare_threshold'] = None
+    elif statement_timeout:
+        connect_args['options'] = f"-c statement_timeout={int(statement_timeout)}"
+    options['connect_args'] = connect_args
+    return options
+
+def install_engine_events(engine):
+    statement_timeout = os.getenv('DB_STATEMENT_TIMEOUT_MS')
+    if engine.dialect.name != 'postgresql' or not pgbouncer_mode() or not statement_timeout:
+        return
+
+    @event.listens_for(engine, 'begin')
+    def set_statement_timeout(conn):
+        # SET LOCAL ends with the transaction, so nothing leaks to the next client of the server connection
+        conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(statement_timeout)}")
+
+def pool_status(engine):
+    pool = engine.pool
+    status = pool_metrics.snapshot()
+    if isinstance(pool, QueuePool):
+        status.update({
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'overflow': pool.overflow(),
+            'idle': pool.checkedin()
+        })
+    return status
+
+# Replicas further behind the primary than this are skipped until they catch up
+REPLICA_MAX_LAG_SECONDS = float(os.getenv('DB_REPLICA_MAX_LAG_SECONDS', 10))
+REPLICA_LAG_CHECK_SECONDS = float(os.getenv('DB_REPLICA_LAG_CHECK_SECONDS', 5))
+
+# A replica that has replayed everything it received is current even if the primary has been idle
+REPLICA_LAG_SQL = text("""
+    SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END
+""")
+
+# bind key -> (checked_at, healthy)
+_replica_health = {}
+_replica_turn = itertools.count()
+
+def replica_binds():
+    """SQLALCHEMY_BINDS entries for the comma-separated SQLALCHEMY_REPLICA_URIS."""
+    uris = [uri.strip() for uri in os.getenv('SQLALCHEMY_REPLICA_URIS', '').split(',') if uri.strip()]
+    return {f'replica_{i}': dict(engine_options(uri), url=uri) for i, uri in enumerate(uris)}
+
+def _replica_healthy(key, engine):
+    checked_at, healthy = _replica_health.get(key, (0.0, True))
+    if time.monotonic() - checked_at < REPLICA_LAG_CHECK_SECONDS:
+        return healthy
+    try:
+        with engine.connect() as conn:
+            lag = float(conn.execute(REPLICA_LAG_SQL).scalar() or 0)
+        healthy = lag <= REPLICA_MAX_LAG_SECONDS
+        if not healthy:
+            logger.warning(f"Replica {key} is {lag:.1f}s behind; reading from the primary")
+    except Exception as e:
+        logger.warning(f"Replica {key} unavailable; reading from the primary: {e}")
+        healthy = False
+    _replica_health[key] = (time.monotonic(), healthy)
+    return healthy
+
+def pick_replica(db):
+    keys = [key for key in db.engines if key and key.startswith('replica_')]
+    if not keys:
+        return None
+    start = next(_replica_turn)
+    for i in range(len(keys)):
+        key = keys[(start + i) % len(keys)]
+        if _replica_healthy(key, db.engines[key]):
+            return key
+    return None
+
+# A standby has replayed a primary write once its replay position passes the write's WAL position
+REPLICA_REPLAYED_SQL = text("""
+    SELECT NOT pg_is_in_recovery() OR pg_last_wal_replay_lsn() >= CAST(:lsn AS pg_lsn)
+""")
+
+# (bind key, lsn) pairs already seen replayed; a replica never moves backwards
+_replayed = set()
+
+def _replica_replayed(key, engine, lsn):
+    if (key, lsn) in _replayed:
+        return True
+    try:
+        with engine.connect() as conn:
+            replayed = bool(conn.execute(REPLICA_REPLAYED_SQL, {'lsn': lsn}).scalar())
+    except Exception as e:
+        logger.warning(f"Could not check replay position of replica {key}: {e}")
+        replayed = False
+    if replayed:
+        _replayed.add((key, lsn))
+    return replayed
+
+def read_primary_until_replayed(db, lsn):
+    """
+    Moves the current @read_replica request to the primary unless its replica has replayed the
+    primary's WAL up to lsn. The lag check alone admits a replica a few seconds behind, which
+    right after a load may not hold the rows the snapshot registry already points at.
+    """
+    if not lsn or not (has_request_context() and g.get('read_replica')):
+        return
+    if 'replica_bind' not in g:
+        g.replica_bind = pick_replica(db)
+    key = g.replica_bind
+    if key is not None and not _replica_replayed(key, db.engines[key], lsn):
+        logger.info(f"Replica {key} has not replayed {lsn} yet; reading from the primary")
+        g.replica_bind = None
+
+class RoutingSession(Session):
+    """
+    Sends the queries of @read_replica views to a healthy replica. Each request sticks to
+    the replica it first picked, so its queries see one consistent snapshot; flushes and
+    every other view use the primary.
+    """
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_request_context() and g.get('read_replica'):
+            if 'replica_bind' not in g:
+                g.replica_bind = pick_replica(self._db)
+            if g.replica_bind is not None:
+                return self._db.engines[g.replica_bind]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+def read_replica(view):
+    """Marks a read-only view whose queries may be served by a replica."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.read_replica = True
+        return view(*args, **kwargs)
+    return wrapper
@@ -1,15 +1,29 @@
 import os
-import redis
+from app.redis_pool import make_redis_client, normalize_url
 from flask_sqlalchemy import SQLAlchemy
 
-# Redis Configuration
+# Redis Configuration; REDIS_URL (redis://, rediss:// or redis+unix://) overrides host and port
 REDIS_HOST = os.getenv('REDIS_HOST', 'localhost')
 REDIS_PORT = os.getenv('REDIS_PORT', 6379)
+REDIS_URL = normalize_url(os.getenv('REDIS_URL', f"redis://{REDIS_HOST}:{REDIS_PORT}/0"))
 
-redis_client = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, decode_responses=True)
+REDIS_OPTIONS = dict(
+    max_connections=int(os.getenv('REDIS_MAX_CONNECTIONS', 50)),
+    pool_timeout=float(os.getenv('REDIS_POOL_TIMEOUT', 2)),
+    socket_timeout=float(os.getenv('REDIS_SOCKET_TIMEOUT', 0.5)),
+    connect_timeout=float(os.getenv('REDIS_CONNECT_TIMEOUT', 0.5)),
+    breaker_threshold=int(os.getenv('REDIS_BREAKER_THRESHOLD', 5)),
+    breaker_cooldown=float(os.getenv('REDIS_BREAKER_COOLDOWN', 30))
+)
 
-# Database
-db = SQLAlchemy()
+redis_client = make_redis_client(REDIS_URL, **REDIS_OPTIONS)
+
+# Undecoded client for binary values such as compressed HTML fragments
+redis_bytes_client = make_redis_client(REDIS_URL, decode_responses=False, **REDIS_OPTIONS)
+
+# Database; report views marked @read_replica are routed to replicas by the session
+from app.database import RoutingSession
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 # SocketIO
 from flask_socketio import SocketIO
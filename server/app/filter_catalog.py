@@ -0,0 +1,239 @@
+import hashlib
+import json
+import logging
+from flask import Response, request
+from sqlalchemy import func, distinct, tuple_
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from app.extensions import db, redis_client
+from app.search import search_filter
+from app.snapshots import active_snapshot_date, snapshot_version
+from app.models import (
+    OrderStatusReportSnapshot, ShortStatusReportSnapshot, OrderProvisionSummaryReport,
+    LocationWiseOrderSnapshot, LocationWiseStockSnapshot
+)
+
+logger = logging.getLogger(__name__)
+
+CATALOG_TTL = 7 * 24 * 3600
+
+# Report -> snapshot model and option list name -> column.
+# 'empty' lists are part of the response shape the report's JS expects but have no column.
+CATALOGS = {
+    'orderstatus': {
+        'model': OrderStatusReportSnapshot,
+        'options': {
+            'divisions': OrderStatusReportSnapshot.division,
+            'groups': OrderStatusReportSnapshot.group_name,
+            'purities': OrderStatusReportSnapshot.purity,
+            'classifications': OrderStatusReportSnapshot.classification,
+            'makes': OrderStatusReportSnapshot.make_location,
+            'collections': OrderStatusReportSnapshot.collection,
+            'parties': OrderStatusReportSnapshot.party_name,
+            'make_owners': OrderStatusReportSnapshot.make_owner,
+            'collection_owners': OrderStatusReportSnapshot.collection_owner,
+            'classification_owners': OrderStatusReportSnapshot.classification_owner,
+            'business_heads': OrderStatusReportSnapshot.business_head
+        }
+    },
+    'shortstatus': {
+        'model': ShortStatusReportSnapshot,
+        'options': {
+            'divisions': ShortStatusReportSnapshot.division,
+            'groups': ShortStatusReportSnapshot.group_name,
+            'purities': ShortStatusReportSnapshot.purity,
+            'classifications': ShortStatusReportSnapshot.classification,
+            'makes': ShortStatusReportSnapshot.make_location,
+            'collections': ShortStatusReportSnapshot.collection,
+            'sections': ShortStatusReportSnapshot.section,
+            'product_types': ShortStatusReportSnapshot.product_type
+        },
+        'empty': ['parties', 'make_owners', 'collection_owners', 'classification_owners', 'business_heads']
+    },
+    'locationwiseorder': {
+        'model': LocationWiseOrderSnapshot,
+        'options': {
+            'locations': LocationWiseOrderSnapshot.location,
+            'divisions': LocationWiseOrderSnapshot.division,
+            'groups': LocationWiseOrderSnapshot.group_name,
+            'purities': LocationWiseOrderSnapshot.purity,
+            'classifications': LocationWiseOrderSnapshot.classification,
+            'makes': LocationWiseOrderSnapshot.make_location,
+            'collections': LocationWiseOrderSnapshot.collection,
+            'make_owners': LocationWiseOrderSnapshot.make_owner,
+            'collection_owners': LocationWiseOrderSnapshot.collection_owner,
+            'classification_owners': LocationWiseOrderSnapshot.classification_owner,
+            'business_heads': LocationWiseOrderSnapshot.business_head
+        }
+    },
+    'provisionstatus': {
+        'model': OrderProvisionSummaryReport,
+        'options': {
+            'divisions': OrderProvisionSummaryReport.division,
+            'groups': OrderProvisionSummaryReport.group_name,
+            'purities': OrderProvisionSummaryReport.purity,
+            'classifications': OrderProvisionSummaryReport.classification,
+            'makes': OrderProvisionSummaryReport.make,
+            'collections': OrderProvisionSummaryReport.collection,
+            'parties': OrderProvisionSummaryReport.party,
+            'sections': OrderProvisionSummaryReport.section,
+            'product_types': OrderProvisionSummaryReport.master_collection,
+            'business_heads': OrderProvisionSummaryReport.business_head
+        }
+    },
+    'branchweight': {
+        'model': LocationWiseStockSnapshot,
+        'options': {
+            'zones': LocationWiseStockSnapshot.zone,
+            'states': LocationWiseStockSnapshot.state,
+            'locations': LocationWiseStockSnapshot.location,
+            'business_heads': LocationWiseStockSnapshot.business_head
+        },
+        # Distinct (zone, state, location) paths so dependent dropdowns can be narrowed without SQL
+        'hierarchy': [LocationWiseStockSnapshot.zone, LocationWiseStockSnapshot.state, LocationWiseStockSnapshot.location]
+    }
+}
+
+# Option list name -> request arg carrying the selected value
+OPTION_ARGS = {
+    'divisions': 'division', 'groups': 'group', 'purities': 'purity', 'classifications': 'classification',
+    'makes': 'make', 'collections': 'collection', 'parties': 'party', 'make_owners': 'make_owner',
+    'collection_owners': 'collection_owner', 'classification_owners': 'classification_owner',
+    'business_heads': 'business_head', 'sections': 'section', 'product_types': 'product_type',
+    'locations': 'location', 'zones': 'zone', 'states': 'state'
+}
+
+def latest_snapshot_date(report):
+    model = CATALOGS[report]['model']
+    if not hasattr(model, 'snapshot_date'):
+        return None
+    return active_snapshot_date(model)
+
+def cache_key(report, snapshot_date):
+    # Under the table's cache version, so any publish or bump purges it with the report caches
+    model = CATALOGS[report]['model']
+    version = snapshot_version(model)
+    return f"filter_catalog:{model.__tablename__}:{version}:{report}:{snapshot_date.isoformat() if snapshot_date else 'all'}"
+
+def build_catalog(report, snapshot_date):
+    """Extracts every option list of a report in one scan of its snapshot rows."""
+    spec = CATALOGS[report]
+    model = spec['model']
+    names = list(spec['options'])
+    # One row back: array_agg(DISTINCT col ORDER BY col) per option column
+    query = db.session.query(*[
+        func.array_agg(aggregate_order_by(distinct(col), col)) for col in spec['options'].values()
+    ])
+    if snapshot_date is not None:
+        query = query.filter(model.snapshot_date == snapshot_date)
+    row = query.one()
+
+    catalog = {name: [v for v in (values or []) if v] for name, values in zip(names, row)}
+    for name in spec.get('empty', []):
+        catalog[name] = []
+
+    if 'hierarchy' in spec:
+        hier_q = db.session.query(*spec['hierarchy']).distinct()
+        if snapshot_date is not None:
+            hier_q = hier_q.filter(model.snapshot_date == snapshot_date)
+        catalog['hierarchy'] = [list(r) for r in hier_q.order_by(*spec['hierarchy']).all()]
+    return catalog
+
+def store_catalog(report, snapshot_date, catalog):
+    body = json.dumps(catalog, separators=(',', ':'))
+    etag = hashlib.sha1(body.encode()).hexdigest()
+    try:
+        key = cache_key(report, snapshot_date)
+        redis_client.hset(key, mapping={'body': body, 'etag': etag})
+        redis_client.expire(key, CATALOG_TTL)
+    except Exception as e:
+        logger.warning(f"Could not store filter catalog {report}: {e}")
+    return body, etag
+
+def refresh_filter_catalog(report, snapshot_date=None):
+    """Rebuilds and stores a report's catalog; called once a snapshot finishes loading."""
+    if snapshot_date is None:
+        snapshot_date = latest_snapshot_date(report)
+    return store_catalog(report, snapshot_date, build_catalog(report, snapshot_date))
+
+def get_catalog(report):
+    """Returns (catalog body JSON, etag) for the report's latest snapshot, building it on a miss."""
+    snapshot_date = latest_snapshot_date(report)
+    try:
+        cached = redis_client.hgetall(cache_key(report, snapshot_date))
+        if cached and 'body' in cached:
+            return cached['body'], cached['etag']
+    except Exception as e:
+        logger.warning(f"Filter catalog cache unavailable for {report}: {e}")
+    return store_catalog(report, snapshot_date, build_catalog(report, snapshot_date))
+
+def catalog_response(report, transform=None):
+    """JSON response for a report's filter options with ETag / If-None-Match support."""
+    body, etag = get_catalog(report)
+    if transform is not None:
+        options = transform(json.loads(body))
+        body = json.dumps(options, separators=(',', ':'))
+        etag = hashlib.sha1(body.encode()).hexdigest()
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+def narrow_locations(zone=None, state=None):
+    """Transform for the branch weight catalog: states follow the zone, locations the state (or zone)."""
+    def transform(catalog):
+        paths = catalog.pop('hierarchy', [])
+        if zone:
+            catalog['states'] = sorted({s for z, s, l in paths if z == zone and s})
+        if state:
+            catalog['locations'] = sorted({l for z, s, l in paths if s == state and l})
+        elif zone:
+            catalog['locations'] = sorted({l for z, s, l in paths if z == zone and l})
+        return catalog
+    return transform
+
+def facet_counts(report, args):
+    """
+    Row counts per value for every facet that is not yet selected, under the active filters.
+
+    All facets come from one GROUPING SETS query, so the filtered rows are scanned once
+    however many dropdowns are open; the empty grouping set yields the matching total.
+    """
+    spec = CATALOGS[report]
+    model = spec['model']
+    query = db.session.query()
+    snapshot_date = latest_snapshot_date(report)
+    if snapshot_date is not None:
+        query = query.filter(model.snapshot_date == snapshot_date)
+
+    search = (args.get('search') or '').strip()
+    if search:
+        query = query.filter(search_filter(report, search))
+
+    remaining = {}
+    for name, col in spec['options'].items():
+        value = args.get(OPTION_ARGS[name])
+        if value:
+            query = query.filter(col == value)
+        else:
+            remaining[name] = col
+
+    result = {name: [] for name in list(remaining) + spec.get('empty', [])}
+    result['total'] = 0
+    cols = list(remaining.values())
+    rows = query.with_entities(
+        *cols, *[func.grouping(c) for c in cols], func.count()
+    ).group_by(func.grouping_sets(*[tuple_(c) for c in cols], tuple_())).all()
+
+    for row in rows:
+        values, grouped, count = row[:len(cols)], row[len(cols):-1], row[-1]
+        # GROUPING(col) is 0 only for the set grouped on that column
+        level = next((i for i, g in enumerate(grouped) if g == 0), None)
+        if level is None:
+            result['total'] = count
+        elif values[level]:
+            result[list(remaining)[level]].append({'value': values[level], 'count': count})
+
+    for name in remaining:
+        result[name].sort(key=lambda f: f['value'])
+    return result
@@ -0,0 +1,205 @@
+import json
+import logging
+from sqlalchemy import text
+from app.extensions import db
+from app.barcodes import latest_batch_id
+from app.filter_catalog import CATALOGS
+from app.models import AllocatedBarcodesSnapshot
+from app.partitions import is_partitioned
+from app.snapshots import active_snapshot_date
+
+logger = logging.getLogger(__name__)
+
+# Columns each report's KPI query aggregates. They are INCLUDEd in the report's filter indexes
+# so a single-filter KPI query is answered by an index-only scan.
+KPI_COLUMNS = {
+    'orderstatus': [],
+    'shortstatus': ['total_count', 'weight', 'product_type'],
+    'locationwiseorder': ['total_count', 'dispatched_count', 'in_process_count', 'delayed_count',
+                          'sla_index_pct', 'fulfillment_pct'],
+    'provisionstatus': ['pieces', 'gr_wt', 'master_collection'],
+    'branchweight': ['provision_pieces', 'provision_weight', 'stock_pieces', 'stock_weight', 'short_pieces',
+                     'short_weight', 'max_weight_allocate_other_branches', 'max_refill_qty_other_branches']
+}
+
+# Lookups outside the report filters: the branch weight popups roll up and page a batch's
+# barcodes by source or target branch (see app.barcodes). Same names as the model's indexes.
+EXTRA_INDEXES = [
+    (AllocatedBarcodesSnapshot, ['batch_id', 'source_location', 'target_location', 'barcode'],
+     ['target_zone', 'target_state', 'barcode_weight'], 'ix_allocated_barcodes_snapshot_source', 'source_location'),
+    (AllocatedBarcodesSnapshot, ['batch_id', 'target_location', 'source_location', 'barcode'],
+     ['source_zone', 'source_state', 'barcode_weight'], 'ix_allocated_barcodes_snapshot_target', 'target_location')
+]
+
+MAX_IDENTIFIER = 63
+
+class IndexSpec:
+    """One index the dashboard's queries call for: key columns, covered columns and an optional predicate."""
+    def __init__(self, model, columns, include=(), where=None, name=None, lookup=None):
+        self.model = model
+        self.table = model.__tablename__
+        self.columns = list(columns)
+        # The column the query filters on; the key columns before it are pinned to the current snapshot or batch
+        self.lookup = lookup or self.columns[-1]
+        self.scope = self.columns[:self.columns.index(self.lookup)]
+        self.include = [c for c in include if c not in columns]
+        self.where = where
+        self.name = (name or f"ix_{self.table}_{'_'.join(self.columns[-1:])}")[:MAX_IDENTIFIER]
+
+    def ddl(self, concurrently=False):
+        sql = f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS {self.name} ON {self.table} ({', '.join(self.columns)})"
+        if self.include:
+            sql += f" INCLUDE ({', '.join(self.include)})"
+        if self.where:
+            sql += f" WHERE {self.where}"
+        return sql
+
+def index_specs():
+    """
+    Indexes derived from the filters the report routes issue: every dropdown filter is an
+    equality on one column within the active snapshot, so each gets (snapshot_date, column).
+    The filter's IS NOT NULL predicate keeps sparse columns such as the owners small, and the
+    report's KPI columns are included.
+    """
+    specs = []
+    for report, spec in CATALOGS.items():
+        model = spec['model']
+        dated = hasattr(model, 'snapshot_date')
+        for column in spec['options'].values():
+            columns = ['snapshot_date', column.key] if dated else [column.key]
+            specs.append(IndexSpec(model, columns, KPI_COLUMNS[report], where=f"{column.key} IS NOT NULL"))
+    for model, columns, include, name, lookup in EXTRA_INDEXES:
+        specs.append(IndexSpec(model, columns, include, name=name, lookup=lookup))
+    return specs
+
+def existing_indexes(table):
+    """
+    {index name: (key column names, scans since the stats were reset)} for table. Scans of a
+    partitioned table are counted on its partitions' indexes, so a parent index sums its children.
+    """
+    rows = db.session.execute(text("""
+        SELECT i.relname,
+               ARRAY(SELECT a.attname FROM unnest(x.indkey::int2[]) WITH ORDINALITY k(attnum, n)
+                     JOIN pg_attribute a ON a.attrelid = x.indrelid AND a.attnum = k.attnum
+                     WHERE k.n <= x.indnkeyatts
+                     ORDER BY k.n),
+               COALESCE(s.idx_scan, 0) + COALESCE((SELECT sum(cs.idx_scan) FROM pg_inherits h
+                                                   JOIN pg_stat_all_indexes cs ON cs.indexrelid = h.inhrelid
+                                                   WHERE h.inhparent = x.indexrelid), 0)::bigint
+        FROM pg_index x
+        JOIN pg_class i ON i.oid = x.indexrelid
+        LEFT JOIN pg_stat_all_indexes s ON s.indexrelid = x.indexrelid
+        WHERE x.indrelid = to_regclass(:table)
+    """), {'table': table})
+    return {name: (list(columns), scans) for name, columns, scans in rows}
+
+def covering_index(spec, existing):
+    """Name of an existing index whose leading keys already serve spec, if any."""
+    for name, (columns, _) in existing.items():
+        if columns[:len(spec.columns)] == spec.columns:
+            return name
+    return None
+
+def advise():
+    """
+    Compares the derived indexes with the database. Returns a dict with 'missing' index specs
+    and, per table, 'unused' existing indexes that have not been scanned since the stats reset.
+    """
+    missing, unused, seen = [], {}, {}
+    for spec in index_specs():
+        if spec.table not in seen:
+            seen[spec.table] = existing_indexes(spec.table)
+        if covering_index(spec, seen[spec.table]) is None:
+            missing.append(spec)
+    for table, existing in seen.items():
+        idle = [name for name, (_, scans) in existing.items() if scans == 0 and not name.endswith('_pkey')]
+        if idle:
+            unused[table] = idle
+    return {'missing': missing, 'unused': unused}
+
+def create_indexes(specs):
+    """
+    Builds specs outside a transaction. Plain tables are indexed CONCURRENTLY so loads and
+    reads continue; on a partitioned table the index is created on the parent and cascades to
+    every partition. Each touched table is analyzed afterwards.
+    """
+    created = []
+    with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        for spec in specs:
+            partitioned = is_partitioned(spec.table)
+            logger.info(f"Creating {spec.name}")
+            conn.execute(text(spec.ddl(concurrently=not partitioned)))
+            created.append(spec.name)
+        for table in {spec.table for spec in specs}:
+            conn.execute(text(f"ANALYZE {table}"))
+    return created
+
+# --- EXPLAIN benchmarks
+
+def scope_values(spec):
+    # The active snapshot date or the newest barcode batch, for the key columns before the lookup
+    values = {}
+    for column in spec.scope:
+        if column == 'snapshot_date':
+            values[column] = active_snapshot_date(spec.model)
+        elif column == 'batch_id':
+            values[column] = latest_batch_id()
+    return values
+
+def _scope_sql(spec):
+    return ''.join(f"{column} = :{column} AND " for column in spec.scope)
+
+def sample_value(spec, scope):
+    """The most frequent value of the spec's filter column: the least selective, so the worst case."""
+    column = spec.lookup
+    return db.session.execute(text(f"""
+        SELECT {column} FROM {spec.table} WHERE {_scope_sql(spec)}{column} IS NOT NULL
+        GROUP BY {column} ORDER BY count(*) DESC LIMIT 1
+    """), scope).scalar()
+
+def benchmark_query(spec):
+    """The query shape the spec serves: an aggregate over the covered columns, or the row fetch for lookups."""
+    if spec.include or spec.where:
+        selected = ', '.join(['count(*)'] + [f'count({c})' for c in spec.include])
+    else:
+        selected = '*'
+    return f"SELECT {selected} FROM {spec.table} WHERE {_scope_sql(spec)}{spec.lookup} = :value"
+
+def _scans(plan):
+    # Scan nodes of a JSON plan, as 'Index Only Scan using ix_...' or 'Seq Scan on table'
+    node = plan.get('Node Type', '')
+    found = []
+    if 'Scan' in node:
+        target = plan.get('Index Name') or plan.get('Relation Name')
+        found.append(f"{node} {'using' if plan.get('Index Name') else 'on'} {target}")
+    for child in plan.get('Plans', []):
+        found.extend(_scans(child))
+    return found
+
+def explain(spec):
+    """EXPLAIN (ANALYZE, BUFFERS) of the spec's benchmark query on the active snapshot, summarized."""
+    scope = scope_values(spec)
+    value = sample_value(spec, scope)
+    if value is None:
+        return None
+    raw = db.session.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {benchmark_query(spec)}"),
+                             {**scope, 'value': value}).scalar()
+    result = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+    plan = result['Plan']
+    return {
+        'index': spec.name,
+        'value': value,
+        'ms': result['Execution Time'],
+        'buffers': plan.get('Shared Hit Blocks', 0) + plan.get('Shared Read Blocks', 0),
+        'scans': _scans(plan)
+    }
+
+def benchmark(specs):
+    """{index name: explain summary} for specs, skipping filters with no values in the snapshot."""
+    results = {}
+    for spec in specs:
+        summary = explain(spec)
+        if summary is not None:
+            results[spec.name] = summary
+    db.session.rollback()
+    return results
@@ -0,0 +1,459 @@
+import csv
+import io
+import json
+import logging
+import time
+from sqlalchemy import Date, Integer, Numeric, String, text
+from app.extensions import db, redis_client, socketio
+from app.filter_catalog import refresh_filter_catalog
+from app.models import (
+    OrderStatusReportSnapshot, ShortStatusReportSnapshot, OrderProvisionSummaryReport, LocationWiseStockSnapshot,
+    IngestQuarantine
+)
+from app.partitions import apply_retention, ensure_partition
+from app.rollups import rebuild_order_status_rollups
+from app.snapshots import bump_snapshot_version, publish_snapshot
+
+logger = logging.getLogger(__name__)
+
+STAGING_TABLE = 'ingest_staging'
+INCOMING_TABLE = 'ingest_incoming'
+QUARANTINE_TABLE = IngestQuarantine.__tablename__
+
+# Delta loads publish their change set here (and a summary to Socket.IO clients as 'snapshot_changed')
+CHANGES_CHANNEL = 'snapshot_changes'
+
+# Keys listed per change set; larger deltas are sent as counts with truncated=True
+CHANGESET_KEY_LIMIT = 1000
+
+# Report -> snapshot table and the columns a row is unique on within one snapshot_date.
+# 'conflict' is the unique index delta loads upsert against; a report without one only loads in full.
+# The order status key matches ux_order_status_snapshot (snapshot_date, hierarchy_key).
+INGEST_TARGETS = {
+    'orderstatus': {
+        'model': OrderStatusReportSnapshot,
+        'key': ['division', 'group_name', 'purity', 'classification', 'make_location', 'collection', 'party_name'],
+        'conflict': ['snapshot_date', 'hierarchy_key']
+    },
+    'shortstatus': {
+        'model': ShortStatusReportSnapshot,
+        'key': ['division', 'group_name', 'purity', 'classification', 'make_location', 'collection',
+                'section', 'product_type']
+    },
+    'provisionstatus': {
+        'model': OrderProvisionSummaryReport,
+        'key': ['po_number', 'location', 'collection', 'section', 'purity'],
+        # ux_order_provision_snapshot
+        'conflict': ['snapshot_date', 'po_number', 'location', 'collection', 'section', 'purity']
+    },
+    'branchweight': {
+        'model': LocationWiseStockSnapshot,
+        'key': ['location'],
+        'conflict': ['snapshot_date', 'location']
+    }
+}
+
+# Filled in by the database or the load itself, never read from the file
+SYSTEM_COLUMNS = {'snapshot_id', 'snapshot_date', 'updated_at'}
+
+class IngestError(Exception):
+    pass
+
+def load_columns(model):
+    return [c for c in model.__table__.columns if c.name not in SYSTEM_COLUMNS and c.computed is None]
+
+def is_dated(model):
+    return 'snapshot_date' in model.__table__.c
+
+# --- Readers: every format is streamed to COPY as CSV without loading the file into memory
+
+class RowStream(io.RawIOBase):
+    """Read-only file object that renders an iterator of rows as CSV on demand."""
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self._buffer = b''
+        self._text = io.StringIO()
+        self._writer = csv.writer(self._text)
+
+    def readable(self):
+        return True
+
+    def readinto(self, target):
+        while len(self._buffer) < len(target):
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self._writer.writerow(['' if v is None else v for v in row])
+            self._buffer += self._text.getvalue().encode()
+            self._text.seek(0)
+            self._text.truncate()
+        n = min(len(target), len(self._buffer))
+        target[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+def _csv_source(path):
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        header = next(csv.reader(f), None)
+    if not header:
+        raise IngestError(f"{path} is empty")
+    # COPY skips the header line itself; the file is streamed as is
+    return [h.strip() for h in header], lambda: open(path, 'rb')
+
+def _jsonl_source(path):
+    with open(path, encoding='utf-8') as f:
+        first = next((line for line in f if line.strip()), None)
+    if first is None:
+        raise IngestError(f"{path} is empty")
+    columns = list(json.loads(first).keys())
+
+    def rows():
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    yield [record.get(c) for c in columns]
+    return columns, lambda: io.BufferedReader(RowStream(rows()))
+
+def _parquet_source(path):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise IngestError("Parquet input needs pyarrow (pip install pyarrow)")
+    parquet = pq.ParquetFile(path)
+    columns = parquet.schema_arrow.names
+
+    def rows():
+        for batch in parquet.iter_batches(batch_size=10000):
+            yield from zip(*[col.to_pylist() for col in batch.columns])
+    return columns, lambda: io.BufferedReader(RowStream(rows()))
+
+READERS = {'csv': _csv_source, 'jsonl': _jsonl_source, 'parquet': _parquet_source}
+
+def detect_format(path):
+    suffix = path.rsplit('.', 1)[-1].lower()
+    if suffix in ('ndjson', 'json'):
+        return 'jsonl'
+    if suffix in READERS:
+        return suffix
+    raise IngestError(f"Cannot tell the format of {path}; pass --format")
+
+# --- Staging, validation and the swap
+
+def _copy(stream, sql):
+    raw = db.session.connection().connection.dbapi_connection
+    with raw.cursor() as cur:
+        if hasattr(cur, 'copy_expert'):
+            cur.copy_expert(sql, stream)
+        else:
+            # psycopg 3
+            with cur.copy(sql) as copy:
+                while chunk := stream.read(1 << 16):
+                    copy.write(chunk)
+
+def _value(column, alias='s'):
+    """SQL turning a staged text value into column's type; blanks are NULL, or 0 for NOT NULL counts."""
+    name = f"{alias}.{column.name}" if alias else column.name
+    expr = f"NULLIF(btrim({name}), '')"
+    if isinstance(column.type, (Integer, Numeric)):
+        if not column.nullable:
+            expr = f"COALESCE({expr}, '0')"
+        return f"({expr})::{column.type.compile(db.engine.dialect)}"
+    if isinstance(column.type, Date):
+        return f"({expr})::date"
+    return expr
+
+def _check(column):
+    """Predicate that is true when the staged value fits column, so a bad row is skipped instead of failing the load."""
+    value = f"btrim(s.{column.name})"
+    blank = f"(s.{column.name} IS NULL OR {value} = '')"
+    if isinstance(column.type, Integer):
+        return f"({blank} OR {value} ~ '^-?[0-9]{{1,9}}$')"
+    if isinstance(column.type, Numeric):
+        check = f"{value} ~ '^-?([0-9]+(\\.[0-9]*)?|\\.[0-9]+)$'"
+        if column.type.precision is not None:
+            digits = column.type.precision - (column.type.scale or 0)
+            check += f" AND length(split_part(ltrim({value}, '-'), '.', 1)) <= {digits}"
+        return f"({blank} OR ({check}))"
+    if isinstance(column.type, Date):
+        return f"({blank} OR {value} ~ '^[0-9]{{4}}-[0-9]{{2}}-[0-9]{{2}}$')"
+    if isinstance(column.type, String) and column.type.length:
+        check = f"(s.{column.name} IS NULL OR length({value}) <= {column.type.length})"
+        return check if column.nullable else f"(NOT {blank} AND {check})"
+    return 'TRUE' if column.nullable else f"NOT {blank}"
+
+def stage(report, path, fmt=None):
+    """
+    COPYs the file into a temporary text-typed staging table in the current transaction.
+    Returns (file columns, rows copied, seconds spent copying).
+    """
+    spec = INGEST_TARGETS[report]
+    fmt = fmt or detect_format(path)
+    columns, open_stream = READERS[fmt](path)
+
+    allowed = {c.name for c in load_columns(spec['model'])}
+    unknown = [c for c in columns if c not in allowed]
+    if unknown:
+        raise IngestError(f"Unknown columns for {report}: {', '.join(unknown)}")
+    missing = [k for k in spec['key'] if k not in columns]
+    if missing:
+        raise IngestError(f"Key columns missing from {path}: {', '.join(missing)}")
+
+    # _line keeps file order so the last of several duplicate rows wins
+    db.session.execute(text(
+        f"CREATE TEMP TABLE {STAGING_TABLE} (_line BIGSERIAL, {', '.join(f'{c} TEXT' for c in columns)}) ON COMMIT DROP"
+    ))
+    options = "FORMAT csv, HEADER true" if fmt == 'csv' else "FORMAT csv"
+    started = time.perf_counter()
+    with open_stream() as stream:
+        _copy(stream, f"COPY {STAGING_TABLE} ({', '.join(columns)}) FROM STDIN WITH ({options})")
+    copied = db.session.execute(text(f"SELECT count(*) FROM {STAGING_TABLE}")).scalar()
+    return columns, copied, time.perf_counter() - started
+
+def staged_select(report, columns):
+    """
+    SELECT over the staging table yielding one valid, typed row per key (the file's last),
+    with the target's insert column list. Also returns the validity predicate.
+    """
+    spec = INGEST_TARGETS[report]
+    model = spec['model']
+    present = [c for c in load_columns(model) if c.name in columns]
+    valid = ' AND '.join(_check(c) for c in present) or 'TRUE'
+    keys = [f"COALESCE(NULLIF(btrim(s.{k}), ''), '')" for k in spec['key']]
+
+    target_cols = [c.name for c in present]
+    select_cols = [f"{_value(c)} AS {c.name}" for c in present]
+    if is_dated(model):
+        target_cols.insert(0, 'snapshot_date')
+        select_cols.insert(0, 'CAST(:snapshot_date AS date) AS snapshot_date')
+    if 'updated_at' in model.__table__.c:
+        target_cols.append('updated_at')
+        select_cols.append('now() AS updated_at')
+
+    sql = f"""
+        SELECT DISTINCT ON ({', '.join(keys)}) {', '.join(select_cols)}
+        FROM {STAGING_TABLE} s
+        WHERE {valid}
+        ORDER BY {', '.join(keys)}, s._line DESC
+    """
+    return target_cols, sql, valid
+
+def rejected_lines(valid, limit=5):
+    rows = db.session.execute(text(f"SELECT s._line FROM {STAGING_TABLE} s WHERE NOT ({valid}) ORDER BY s._line LIMIT {limit}"))
+    return [r[0] for r in rows]
+
+def faults(columns):
+    """SQL naming the columns whose value in row s fails validation, e.g. 'invalid pieces, gr_wt'."""
+    cases = ', '.join(f"CASE WHEN NOT {_check(c)} THEN '{c.name}' END" for c in columns) or 'NULL::text'
+    return f"'invalid ' || array_to_string(ARRAY[{cases}], ', ')"
+
+def quarantine_rejected(report, columns, snapshot_date, valid):
+    """
+    Copies staged rows that fail validation to ingest_quarantine, as received and with the
+    columns at fault, so they can be corrected and reloaded. Returns how many there were.
+    """
+    model = INGEST_TARGETS[report]['model']
+    present = [c for c in load_columns(model) if c.name in columns]
+    rejected = db.session.execute(text(f"""
+        INSERT INTO {QUARANTINE_TABLE} (report, snapshot_date, line, row, reason, quarantined_at)
+        SELECT :report, CAST(:snapshot_date AS date), s._line, to_jsonb(s) - '_line', {faults(present)}, now()
+        FROM {STAGING_TABLE} s
+        WHERE NOT ({valid})
+    """), {'report': report, 'snapshot_date': snapshot_date if is_dated(model) else None}).rowcount
+    if rejected:
+        logger.warning(f"{rejected} invalid rows quarantined in {QUARANTINE_TABLE}; first at lines {rejected_lines(valid)}")
+    return rejected
+
+def swap_in(report, columns, snapshot_date):
+    """
+    Replaces the snapshot's rows with the staged ones inside the current transaction, so readers
+    see the old rows until commit and the new ones after. Returns (loaded, rejected).
+    """
+    model = INGEST_TARGETS[report]['model']
+    table = model.__tablename__
+    target_cols, select_sql, valid = staged_select(report, columns)
+    params = {'snapshot_date': snapshot_date} if is_dated(model) else {}
+    rejected = quarantine_rejected(report, columns, snapshot_date, valid)
+
+    if is_dated(model):
+        db.session.execute(text(f"DELETE FROM {table} WHERE snapshot_date = :snapshot_date"), params)
+    else:
+        db.session.execute(text(f"DELETE FROM {table}"))
+    loaded = db.session.execute(
+        text(f"INSERT INTO {table} ({', '.join(target_cols)}) {select_sql}"), params
+    ).rowcount
+    return loaded, rejected
+
+def merge_in(report, columns, snapshot_date):
+    """
+    Applies the staged snapshot as a delta inside the current transaction: rows whose values
+    changed are upserted on the report's unique index, unchanged rows are not written, and rows
+    missing from the file are deleted. Returns (change set, rejected).
+    """
+    spec = INGEST_TARGETS[report]
+    if not spec.get('conflict'):
+        raise IngestError(f"{report} has no unique key to upsert on; load it in full")
+    model = spec['model']
+    table = model.__tablename__
+    target_cols, select_sql, valid = staged_select(report, columns)
+    params = {'snapshot_date': snapshot_date} if is_dated(model) else {}
+    rejected = quarantine_rejected(report, columns, snapshot_date, valid)
+
+    db.session.execute(text(f"CREATE TEMP TABLE {INCOMING_TABLE} ON COMMIT DROP AS {select_sql}"), params)
+
+    keys = spec['key']
+    returning = ', '.join(f't.{k}' for k in keys)
+    values = [c for c in target_cols if c not in spec['conflict'] and c not in ('snapshot_date', 'updated_at')]
+    assignments = ', '.join(f'{c} = EXCLUDED.{c}' for c in values + ['updated_at'] if c in target_cols)
+    changed = ' OR '.join(f't.{c} IS DISTINCT FROM EXCLUDED.{c}' for c in values) or 'FALSE'
+    upserted = db.session.execute(text(f"""
+        INSERT INTO {table} AS t ({', '.join(target_cols)})
+        SELECT {', '.join(target_cols)} FROM {INCOMING_TABLE}
+        ON CONFLICT ({', '.join(spec['conflict'])}) DO UPDATE SET {assignments}
+        WHERE {changed}
+        RETURNING (t.xmax = 0) AS inserted, {returning}
+    """)).all()
+
+    # Rows of this snapshot that the file no longer has; keys compare the way hierarchy_key does
+    matches = ' AND '.join(f"COALESCE(r.{k}, '') = COALESCE(t.{k}, '')" for k in keys)
+    scope = 't.snapshot_date = :snapshot_date AND ' if is_dated(model) else ''
+    deleted = db.session.execute(text(f"""
+        DELETE FROM {table} t
+        WHERE {scope}NOT EXISTS (SELECT 1 FROM {INCOMING_TABLE} r WHERE {matches})
+        RETURNING {returning}
+    """), params).all()
+
+    inserted = [r for r in upserted if r.inserted]
+    updated = [r for r in upserted if not r.inserted]
+    changeset = {
+        'report': report,
+        'table': table,
+        'snapshot_date': snapshot_date.isoformat() if is_dated(model) else None,
+        'key': keys,
+        'inserted': len(inserted),
+        'updated': len(updated),
+        'deleted': len(deleted),
+        'truncated': len(upserted) + len(deleted) > CHANGESET_KEY_LIMIT,
+        'changed_keys': [list(r[1:]) for r in upserted[:CHANGESET_KEY_LIMIT]],
+        'deleted_keys': [list(r) for r in deleted[:max(CHANGESET_KEY_LIMIT - len(upserted), 0)]]
+    }
+    return changeset, rejected
+
+def publish_changes(changeset):
+    """Announces a delta's change set so downstream caches can drop only the affected groups."""
+    try:
+        redis_client.publish(CHANGES_CHANNEL, json.dumps(changeset, default=str))
+    except Exception as e:
+        logger.warning(f"Could not publish change set for {changeset['table']}: {e}")
+    summary = {k: changeset[k] for k in ('report', 'snapshot_date', 'inserted', 'updated', 'deleted')}
+    try:
+        socketio.emit('snapshot_changed', summary)
+    except Exception as e:
+        logger.warning(f"Could not notify clients of {changeset['table']} changes: {e}")
+
+def after_load(report, snapshot_date):
+    """
+    Cuts readers over to the committed snapshot, then refreshes what is cached beside it.
+    Publishing comes first so a failure below never leaves reports cached from before the load.
+    """
+    model = INGEST_TARGETS[report]['model']
+    if is_dated(model):
+        publish_snapshot(model, snapshot_date)
+        refresh_filter_catalog(report, snapshot_date)
+        # Old day partitions go once the new snapshot is live (SNAPSHOT_RETENTION_DAYS)
+        apply_retention(model)
+    else:
+        bump_snapshot_version(model)
+        refresh_filter_catalog(report)
+
+def ingest(report, path, snapshot_date, fmt=None, delta=False):
+    """
+    Bulk-loads one snapshot file: COPY into staging, validate and de-duplicate on the report's
+    key, then either replace the snapshot's rows or, with delta=True, apply only the differences,
+    all in one transaction, and publish. Returns load statistics.
+    """
+    if report not in INGEST_TARGETS:
+        raise IngestError(f"Unknown report {report}; expected one of {', '.join(INGEST_TARGETS)}")
+    started = time.perf_counter()
+    changeset = None
+    try:
+        columns, copied, copy_seconds = stage(report, path, fmt)
+        if is_dated(INGEST_TARGETS[report]['model']):
+            ensure_partition(INGEST_TARGETS[report]['model'], snapshot_date)
+        if delta:
+            changeset, rejected = merge_in(report, columns, snapshot_date)
+            loaded = db.session.execute(text(f"SELECT count(*) FROM {INCOMING_TABLE}")).scalar()
+        else:
+            loaded, rejected = swap_in(report, columns, snapshot_date)
+        # An unchanged delta leaves the snapshot, its derived tables and every cache as they are
+        changed = changeset is None or changeset['inserted'] or changeset['updated'] or changeset['deleted']
+        # Rollups commit with the rows they summarize, so grouped and raw views never disagree
+        if changed and report == 'orderstatus':
+            rebuild_order_status_rollups(snapshot_date)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    if changed:
+        after_load(report, snapshot_date)
+        if changeset is not None:
+            publish_changes(changeset)
+    seconds = time.perf_counter() - started
+    stats = {
+        'copied': copied,
+        'loaded': loaded,
+        'rejected': rejected,
+        'duplicates': copied - rejected - loaded,
+        'copy_seconds': copy_seconds,
+        'seconds': seconds,
+        'rows_per_second': copied / seconds if seconds else 0.0
+    }
+    if changeset is not None:
+        stats.update({k: changeset[k] for k in ('inserted', 'updated', 'deleted')})
+    return stats
+
+# --- Migrating tables created with text columns
+
+def retype_columns(report):
+    """
+    Converts the numeric and date columns a report's table still stores as text to the model's
+    types, in one transaction. Rows whose values would not convert are moved to
+    ingest_quarantine first. Returns (converted column names, rows quarantined).
+    """
+    model = INGEST_TARGETS[report]['model']
+    table = model.__tablename__
+    stored = dict(db.session.execute(text(
+        "SELECT column_name, data_type FROM information_schema.columns WHERE table_name = :table"
+    ), {'table': table}).all())
+    columns = [
+        c for c in load_columns(model)
+        if isinstance(c.type, (Integer, Numeric, Date)) and stored.get(c.name) in ('text', 'character varying')
+    ]
+    if not columns:
+        return [], 0
+
+    # Go by the stored table, not the model: a legacy table may predate its snapshot_date column
+    dated = 'snapshot_date' in stored
+    valid = ' AND '.join(_check(c) for c in columns)
+    try:
+        quarantined = db.session.execute(text(f"""
+            WITH bad AS (DELETE FROM {table} s WHERE NOT ({valid}) RETURNING s.*)
+            INSERT INTO {QUARANTINE_TABLE} (report, snapshot_date, line, row, reason, quarantined_at)
+            SELECT :report, {'s.snapshot_date' if dated else 'NULL'}, NULL, to_jsonb(s), {faults(columns)}, now()
+            FROM bad s
+        """), {'report': report}).rowcount
+        alters = ', '.join(
+            f"ALTER COLUMN {c.name} TYPE {c.type.compile(db.engine.dialect)} USING {_value(c, alias=None)}"
+            for c in columns
+        )
+        db.session.execute(text(f"ALTER TABLE {table} {alters}"))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    if quarantined:
+        logger.warning(f"{quarantined} {table} rows with malformed values moved to {QUARANTINE_TABLE}")
+    # Rendered values change type, so cached reports over the table are dropped
+    bump_snapshot_version(model)
+    return [c.name for c in columns], quarantined
@@ -1,5 +1,7 @@
 from app.extensions import db
 from datetime import datetime
+from sqlalchemy import DDL, event
+from sqlalchemy.dialects.postgresql import JSONB
 from passlib.hash import bcrypt
 
 class User(db.Model):
@@ -63,6 +65,23 @@ class DashboardStats(db.Model):
     avg_response_time = db.Column(db.String(20), default="0h")
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+def time_ago(created_at):
+    """Return human-readable time difference from a UTC timestamp"""
+    diff = datetime.utcnow() - created_at
+    seconds = diff.total_seconds()
+    
+    if seconds < 60:
+        return "just now"
+    elif seconds < 3600:
+        minutes = int(seconds / 60)
+        return f"{minutes}m ago"
+    elif seconds < 86400:
+        hours = int(seconds / 3600)
+        return f"{hours}h ago"
+    else:
+        days = int(seconds / 86400)
+        return f"{days}d ago"
+
 class Notification(db.Model):
     __tablename__ = 'notifications'
 
@@ -95,26 +114,18 @@ class Notification(db.Model):
 
     def get_time_ago(self):
         """Return human-readable time difference"""
-        diff = datetime.utcnow() - self.created_at
-        seconds = diff.total_seconds()
-        
-        if seconds < 60:
-            return "just now"
-        elif seconds < 3600:
-            minutes = int(seconds / 60)
-            return f"{minutes}m ago"
-        elif seconds < 86400:
-            hours = int(seconds / 3600)
-            return f"{hours}h ago"
-        else:
-            days = int(seconds / 86400)
-            return f"{days}d ago"
+        return time_ago(self.created_at)
 
 class OrderStatusReportSnapshot(db.Model):
     __tablename__ = 'order_status_report_snapshot'
+    # One range partition per snapshot_date (app/partitions.py); the key has to include it
+    __table_args__ = (
+        db.Index('ux_order_status_snapshot', 'snapshot_date', 'hierarchy_key', unique=True),
+        {'postgresql_partition_by': 'RANGE (snapshot_date)'}
+    )
 
-    snapshot_id = db.Column(db.BigInteger, primary_key=True)
-    snapshot_date = db.Column(db.Date, nullable=False)
+    snapshot_id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
+    snapshot_date = db.Column(db.Date, primary_key=True)
     division = db.Column(db.String(100))
     group_name = db.Column(db.String(100))
     purity = db.Column(db.String(50))
@@ -164,20 +175,81 @@ class OrderStatusReportSnapshot(db.Model):
 
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
-    # Note: Generated columns like hierarchy_key are not always directly supported by plain SQLAlchemy models
-    # without specific dialect options or plain SQL execution. 
-    # For simplicity in this ORM definition, we omit the generated column definition 
-    # but the actual table creation via SQL will handle it if we run the provided SQL.
-    # However, if we rely on db.create_all(), we need to approximate or skip the generated column 
-    # or define it using DDL. 
-    # For this task, we will create the table using the SQL provided by the user manually 
-    # or via a script, so the model definition here is just for querying.
+    # Stored by Postgres; unique per snapshot_date (ux_order_status_snapshot) and trigram-indexed for search
+    hierarchy_key = db.Column(db.Text, db.Computed(
+        "COALESCE(division,'') || '|' || COALESCE(group_name,'') || '|' || COALESCE(purity,'') || '|' || "
+        "COALESCE(classification,'') || '|' || COALESCE(make_location,'') || '|' || COALESCE(collection,'') || '|' || "
+        "COALESCE(party_name,'')",
+        persisted=True
+    ))
+
+class OrderStatusRollupMixin:
+    # Pre-aggregated order status figures for one drill level of one snapshot_date.
+    # Averages are stored as sum/count pairs so they can be re-aggregated exactly.
+    id = db.Column(db.BigInteger, primary_key=True)
+    snapshot_date = db.Column(db.Date, nullable=False)
+    division = db.Column(db.String(100))
+    group_name = db.Column(db.String(100))
+    purity = db.Column(db.String(50))
+    classification = db.Column(db.String(150))
+    make_location = db.Column(db.String(120))
+
+    a_completed_count = db.Column(db.BigInteger, default=0, nullable=False)
+    a_pending_count = db.Column(db.BigInteger, default=0, nullable=False)
+    b_completed_count = db.Column(db.BigInteger, default=0, nullable=False)
+    b_pending_count = db.Column(db.BigInteger, default=0, nullable=False)
+    c_completed_count = db.Column(db.BigInteger, default=0, nullable=False)
+    c_pending_count = db.Column(db.BigInteger, default=0, nullable=False)
+    d_completed_count = db.Column(db.BigInteger, default=0, nullable=False)
+    d_pending_count = db.Column(db.BigInteger, default=0, nullable=False)
+    e_completed_count = db.Column(db.BigInteger, default=0, nullable=False)
+    e_pending_count = db.Column(db.BigInteger, default=0, nullable=False)
+    f_completed_count = db.Column(db.BigInteger, default=0, nullable=False)
+    f_pending_count = db.Column(db.BigInteger, default=0, nullable=False)
+    g_completed_count = db.Column(db.BigInteger, default=0, nullable=False)
+    g_pending_count = db.Column(db.BigInteger, default=0, nullable=False)
+
+    total_count = db.Column(db.BigInteger, default=0, nullable=False)
+    dispatched_count = db.Column(db.BigInteger, default=0, nullable=False)
+    in_process_count = db.Column(db.BigInteger, default=0, nullable=False)
+    delayed_count = db.Column(db.BigInteger, default=0, nullable=False)
+    active_slots = db.Column(db.BigInteger, default=0, nullable=False)
+
+    sla_index_pct_sum = db.Column(db.Numeric(18, 2))
+    sla_index_pct_n = db.Column(db.Integer, default=0, nullable=False)
+    avg_quality_score_sum = db.Column(db.Numeric(18, 2))
+    avg_quality_score_n = db.Column(db.Integer, default=0, nullable=False)
+    fulfillment_pct_sum = db.Column(db.Numeric(18, 2))
+    fulfillment_pct_n = db.Column(db.Integer, default=0, nullable=False)
+
+    row_count = db.Column(db.Integer, default=0, nullable=False)
+    refreshed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+class OrderStatusMakeRollup(OrderStatusRollupMixin, db.Model):
+    __tablename__ = 'order_status_rollup_make'
+    __table_args__ = (
+        # Serves the snapshot_date lookup of reads, rebuilds and rollups_ready, plus the division and
+        # group_name filters on its prefix; pages are ordered after grouping, not by this index
+        db.Index('idx_order_status_rollup_make_order', 'snapshot_date', 'division', 'group_name',
+                 'make_location', 'purity', 'classification'),
+    )
+
+class OrderStatusCollectionRollup(OrderStatusRollupMixin, db.Model):
+    __tablename__ = 'order_status_rollup_collection'
+    __table_args__ = (
+        db.Index('idx_order_status_rollup_collection_order', 'snapshot_date', 'division', 'group_name',
+                 'make_location', 'purity', 'classification', 'collection'),
+    )
+
+    collection = db.Column(db.String(150))
 
 class LocationWiseOrderSnapshot(db.Model):
     __tablename__ = 'location_wise_order_snapshot'
+    # One range partition per snapshot_date (app/partitions.py); the key has to include it
+    __table_args__ = {'postgresql_partition_by': 'RANGE (snapshot_date)'}
 
-    snapshot_id = db.Column(db.BigInteger, primary_key=True)
-    snapshot_date = db.Column(db.Date, nullable=False)
+    snapshot_id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
+    snapshot_date = db.Column(db.Date, primary_key=True)
     location = db.Column(db.String(150))
     division = db.Column(db.String(100))
     group_name = db.Column(db.String(100))
@@ -219,9 +291,11 @@ class LocationWiseOrderSnapshot(db.Model):
 
 class ShortStatusReportSnapshot(db.Model):
     __tablename__ = 'short_status_report_snapshot'
+    # One range partition per snapshot_date (app/partitions.py); the key has to include it
+    __table_args__ = {'postgresql_partition_by': 'RANGE (snapshot_date)'}
 
-    snapshot_id = db.Column(db.BigInteger, primary_key=True)
-    snapshot_date = db.Column(db.Date, nullable=False)
+    snapshot_id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
+    snapshot_date = db.Column(db.Date, primary_key=True)
     division = db.Column(db.String(100))
     group_name = db.Column(db.String(100))
     purity = db.Column(db.String(50))
@@ -275,13 +349,15 @@ class ShortStatusReportSnapshot(db.Model):
 
 class OrderProvisionSummaryReport(db.Model):
     __tablename__ = 'order_provision_summary_report_snapshot'
+    # A PO can span several lines; one line is unique per snapshot on these columns (blanks compare equal)
+    __table_args__ = (
+        db.Index('ux_order_provision_snapshot', 'snapshot_date', 'po_number', 'location', 'collection', 'section',
+                 'purity', unique=True, postgresql_nulls_not_distinct=True),
+    )
 
-    # Since there's no explicit PK, we'll use po_number or just a dummy for SQLAlchemy
-    # But for a read-only report, we can use one of the columns as primary_key=True 
-    # if we are sure it's unique enough for the session, or use a composite.
-    # Given the table structure, po_number might be unique per order but not per row if split.
-    # I'll use a dummy ID or tell SQLAlchemy to use po_number as the PK for now.
-    po_number = db.Column(db.String(100), primary_key=True)
+    snapshot_id = db.Column(db.BigInteger, primary_key=True)
+    snapshot_date = db.Column(db.Date, nullable=False)
+    po_number = db.Column(db.String(100), nullable=False)
     location = db.Column(db.Text)
     party = db.Column(db.Text)
     party_type = db.Column(db.Text)
@@ -293,9 +369,10 @@ class OrderProvisionSummaryReport(db.Model):
     purity = db.Column(db.Text)
     master_collection = db.Column(db.Text)
     collection = db.Column(db.Text)
-    pieces = db.Column(db.Text) # Stored as text in DB
-    gr_wt = db.Column(db.Text)  # Stored as text in DB
-    total = db.Column(db.Text)
+    # Typed so KPIs are plain sums; tables created with TEXT are converted by migrate_typed_columns.py
+    pieces = db.Column(db.Integer)
+    gr_wt = db.Column(db.Numeric(14, 3))
+    total = db.Column(db.Numeric(14, 3))
     business_head = db.Column(db.Text)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
@@ -318,8 +395,21 @@ class OrderProvisionSummaryReport(db.Model):
             'total': self.total
         }
 
+class IngestQuarantine(db.Model):
+    # Rows a load or type migration could not store, kept as received with the columns at fault
+    __tablename__ = 'ingest_quarantine'
+
+    id = db.Column(db.BigInteger, primary_key=True)
+    report = db.Column(db.String(50), nullable=False, index=True)
+    snapshot_date = db.Column(db.Date)
+    line = db.Column(db.BigInteger)  # Line of the source file; NULL for rows moved out of a table
+    row = db.Column(db.JSON().with_variant(JSONB, 'postgresql'), nullable=False)
+    reason = db.Column(db.Text, nullable=False)
+    quarantined_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
 class LocationWiseStockSnapshot(db.Model):
     __tablename__ = "location_wise_stock_snapshot"
+    __table_args__ = {'postgresql_partition_by': 'RANGE (snapshot_date)'}
 
     # Snapshot info
     snapshot_date = db.Column(db.Date, primary_key=True)
@@ -389,6 +479,14 @@ class LocationWiseStockSnapshot(db.Model):
 
 class AllocatedBarcodesSnapshot(db.Model):
     __tablename__ = 'allocated_barcodes_snapshot'
+    __table_args__ = (
+        # One per popup direction: the branch's barcodes in a batch, grouped by the counterpart
+        # branch and paged by barcode, with the rollup's columns included for index-only scans
+        db.Index('ix_allocated_barcodes_snapshot_source', 'batch_id', 'source_location', 'target_location',
+                 'barcode', postgresql_include=['target_zone', 'target_state', 'barcode_weight']),
+        db.Index('ix_allocated_barcodes_snapshot_target', 'batch_id', 'target_location', 'source_location',
+                 'barcode', postgresql_include=['source_zone', 'source_state', 'barcode_weight']),
+    )
 
     batch_id = db.Column(db.BigInteger, primary_key=True)
     barcode = db.Column(db.BigInteger, primary_key=True)
@@ -414,4 +512,10 @@ class AllocatedBarcodesSnapshot(db.Model):
             'target_location': self.target_location
         }
 
-
+# Partitioned tables get a DEFAULT partition when create_all creates them, so rows loaded for a date
+# without a day partition still insert; ensure_partition moves them into their own partition later
+for _table in db.metadata.tables.values():
+    if _table.dialect_options['postgresql'].get('partition_by'):
+        event.listen(_table, 'after_create', DDL(
+            f"CREATE TABLE IF NOT EXISTS {_table.name}_default PARTITION OF {_table.name} DEFAULT"
+        ).execute_if(dialect='postgresql'))
@@ -0,0 +1,55 @@
+import logging
+from app.extensions import redis_client
+from app.models import Notification
+
+logger = logging.getLogger(__name__)
+
+UNREAD_KEY = 'notifications:unread'
+RECONCILE_KEY = 'notifications:unread:reconciled'
+
+# Drift from writes that bypass the helpers below is corrected at most this long after it happens
+RECONCILE_SECONDS = 300
+
+# Adjusts the counter only if it is already seeded; a missing counter is rebuilt from the table
+_ADJUST_SCRIPT = """
+if redis.call('exists', KEYS[1]) == 1 then
+    return redis.call('incrby', KEYS[1], ARGV[1])
+end
+return nil
+"""
+
+def _count_from_table():
+    return Notification.query.filter_by(is_read=False).count()
+
+def reconcile_unread():
+    """Resets the shared counter from the notifications table."""
+    count = _count_from_table()
+    try:
+        redis_client.set(UNREAD_KEY, count)
+        redis_client.set(RECONCILE_KEY, 1, ex=RECONCILE_SECONDS)
+    except Exception as e:
+        logger.warning(f"Could not store unread notification count: {e}")
+    return count
+
+def get_unread_count():
+    """Header badge count, read from Redis instead of counting the notifications table."""
+    try:
+        # Only the worker that wins the NX marker reconciles, once per interval; one round trip for both
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.get(UNREAD_KEY)
+        pipe.set(RECONCILE_KEY, 1, ex=RECONCILE_SECONDS, nx=True)
+        cached, due = pipe.execute()
+    except Exception as e:
+        logger.warning(f"Unread notification counter unavailable: {e}")
+        return _count_from_table()
+    if cached is None or due:
+        return reconcile_unread()
+    return max(int(cached), 0)
+
+def adjust_unread(delta):
+    if not delta:
+        return
+    try:
+        redis_client.eval(_ADJUST_SCRIPT, 1, UNREAD_KEY, delta)
+    except Exception as e:
+        logger.warning(f"Could not adjust unread notification count: {e}")
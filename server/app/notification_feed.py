@@ -0,0 +1,154 @@
+import base64
+import json
+import logging
+from datetime import datetime
+from sqlalchemy import tuple_
+from app.extensions import redis_client
+from app.models import Notification, time_ago
+
+logger = logging.getLogger(__name__)
+
+FEED_KEY = 'notifications:feed'
+
+# Newest notifications kept in the ring buffer; the bell dropdown reads only from here
+FEED_SIZE = 50
+
+# Pushes onto the ring only when it is already warm, so a cold ring is never left holding a partial head
+_PUSH_SCRIPT = """
+if redis.call('exists', KEYS[1]) == 1 then
+    redis.call('lpush', KEYS[1], ARGV[1])
+    redis.call('ltrim', KEYS[1], 0, tonumber(ARGV[2]) - 1)
+end
+return nil
+"""
+
+# Fills a cold ring; a ring another reader warmed meanwhile (and pushes since) is left untouched
+_WARM_SCRIPT = """
+if redis.call('exists', KEYS[1]) == 1 then
+    return 0
+end
+redis.call('rpush', KEYS[1], unpack(ARGV))
+return 1
+"""
+
+class FeedItem:
+    """Notification as served by the feed; renders in the same partial as the model."""
+    def __init__(self, data):
+        self.__dict__.update(data)
+        self.created_at = datetime.fromisoformat(data['created_at'])
+
+    def get_time_ago(self):
+        return time_ago(self.created_at)
+
+    def key(self):
+        return (self.created_at, self.id)
+
+    def to_dict(self):
+        data = dict(self.__dict__)
+        data['created_at'] = self.created_at.isoformat()
+        return data
+
+def serialize(notification):
+    return {
+        'id': notification.id,
+        'title': notification.title,
+        'message': notification.message,
+        'notification_type': notification.notification_type,
+        'icon': notification.icon,
+        'priority': notification.priority,
+        'is_read': bool(notification.is_read),
+        'related_order_id': notification.related_order_id,
+        'created_at': notification.created_at.isoformat()
+    }
+
+def encode_cursor(item):
+    payload = json.dumps([item.created_at.isoformat(), item.id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        created_at, notification_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(notification_id)
+    except (ValueError, TypeError):
+        return None
+
+def _push(data):
+    redis_client.eval(_PUSH_SCRIPT, 1, FEED_KEY, json.dumps(data), FEED_SIZE)
+
+def push_to_feed(notification):
+    try:
+        _push(serialize(notification))
+    except Exception as e:
+        logger.warning(f"Could not push notification {notification.id} to feed: {e}")
+
+def invalidate_feed():
+    # Read-state changes rewrite cached rows; the next read re-warms the ring from the table
+    try:
+        redis_client.delete(FEED_KEY)
+    except Exception as e:
+        logger.warning(f"Could not invalidate notification feed: {e}")
+
+def _query(before=None, since=None, limit=FEED_SIZE):
+    """
+    Newest first. With only since, the limit rows right after it are returned instead of the
+    newest ones, so a client that has missed more than limit rows catches up page by page.
+    """
+    key = tuple_(Notification.created_at, Notification.id)
+    query = Notification.query
+    if before is not None:
+        query = query.filter(key < tuple_(*before))
+    if since is not None:
+        query = query.filter(key > tuple_(*since))
+    if since is not None and before is None:
+        rows = query.order_by(Notification.created_at.asc(), Notification.id.asc()).limit(limit).all()[::-1]
+    else:
+        rows = query.order_by(Notification.created_at.desc(), Notification.id.desc()).limit(limit).all()
+    return [FeedItem(serialize(n)) for n in rows]
+
+def _ring():
+    """
+    (items newest first, complete) for the head of the feed, warmed from the table on a miss;
+    None if Redis is unavailable. complete means the ring holds every row in the table.
+    """
+    try:
+        cached = redis_client.lrange(FEED_KEY, 0, FEED_SIZE - 1)
+        if not cached:
+            items = _query()
+            if not items:
+                return [], True
+            redis_client.eval(_WARM_SCRIPT, 1, FEED_KEY, *[json.dumps(item.to_dict()) for item in items])
+            # A row committed after the query may have been pushed while the ring was still cold, and
+            # so dropped; every such row is newer than the query's head and this catch-up finds it
+            for item in reversed(_query(since=items[0].key())):
+                _push(item.to_dict())
+            cached = redis_client.lrange(FEED_KEY, 0, FEED_SIZE - 1)
+        # The catch-up can repeat a pushed row or land it out of order; the ring is small, so
+        # reads dedupe and sort it. Only a trimmed ring can be missing older rows
+        items = {item.id: item for item in (FeedItem(json.loads(raw)) for raw in cached)}
+        return sorted(items.values(), key=FeedItem.key, reverse=True), len(cached) < FEED_SIZE
+    except Exception as e:
+        logger.warning(f"Notification feed cache unavailable: {e}")
+        return None
+
+def load_feed(before=None, since=None, limit=20):
+    """
+    Returns (items, has_more) newest first. before pages back from a (created_at, id) cursor;
+    since returns the limit rows following the client's latest, has_more meaning newer rows
+    remain past them. The head of the feed and incremental fetches are answered from the ring
+    buffer when it covers them.
+    """
+    if before is None:
+        warm = _ring()
+        if warm is not None:
+            ring, complete = warm
+            if since is None:
+                if complete or limit < len(ring):
+                    return ring[:limit], len(ring) > limit
+            else:
+                newer = [item for item in ring if item.key() > since]
+                # Served from the ring only when it reaches back past the client's latest row
+                if complete or len(newer) < len(ring):
+                    return newer[-limit:], len(newer) > limit
+    items = _query(before, since, limit + 1)
+    return items[:limit], len(items) > limit
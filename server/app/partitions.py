@@ -0,0 +1,179 @@
+import logging
+import os
+from datetime import date, timedelta
+from sqlalchemy import text
+from app.extensions import db
+from app.models import (
+    OrderStatusReportSnapshot, ShortStatusReportSnapshot, LocationWiseOrderSnapshot, LocationWiseStockSnapshot
+)
+from app.snapshots import active_snapshot_date
+
+logger = logging.getLogger(__name__)
+
+# Snapshot tables range-partitioned on snapshot_date, one partition per day plus a DEFAULT
+# partition catching dates not yet given one. The models declare postgresql_partition_by, so
+# db.create_all creates them partitioned; convert_to_partitioned migrates a table created as a
+# plain heap by older tooling.
+PARTITIONED_MODELS = [
+    OrderStatusReportSnapshot, ShortStatusReportSnapshot, LocationWiseOrderSnapshot, LocationWiseStockSnapshot
+]
+
+# Days of snapshots kept by apply_retention; unset keeps everything
+SNAPSHOT_RETENTION_DAYS = os.getenv('SNAPSHOT_RETENTION_DAYS')
+
+def partition_name(table, snapshot_date):
+    return f"{table}_p{snapshot_date:%Y%m%d}"
+
+def default_partition_name(table):
+    return f"{table}_default"
+
+def is_partitioned(table):
+    if db.engine.dialect.name != 'postgresql':
+        return False
+    return db.session.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"
+    ), {'table': table}).scalar()
+
+def _insert_columns(table):
+    # Generated columns are computed by the target, never copied
+    return [r[0] for r in db.session.execute(text("""
+        SELECT attname FROM pg_attribute
+        WHERE attrelid = to_regclass(:table) AND attnum > 0 AND NOT attisdropped AND attgenerated = ''
+        ORDER BY attnum
+    """), {'table': table})]
+
+def ensure_default_partition(model):
+    """Adds the DEFAULT partition to a partitioned table created without one. Returns True if added."""
+    table = model.__tablename__
+    name = default_partition_name(table)
+    if not is_partitioned(table) or db.session.execute(text("SELECT to_regclass(:name)"), {'name': name}).scalar():
+        return False
+    db.session.execute(text(f"CREATE TABLE {name} PARTITION OF {table} DEFAULT"))
+    db.session.commit()
+    return True
+
+def ensure_partition(model, snapshot_date):
+    """
+    Creates the day partition snapshot_date is loaded into, if the table is partitioned. Rows of that
+    date already caught by the DEFAULT partition are moved into it.
+    """
+    table = model.__tablename__
+    if not is_partitioned(table):
+        return
+    name = partition_name(table, snapshot_date)
+    if db.session.execute(text("SELECT to_regclass(:name)"), {'name': name}).scalar():
+        return
+    bounds = f"FROM ('{snapshot_date.isoformat()}') TO ('{(snapshot_date + timedelta(days=1)).isoformat()}')"
+    default = default_partition_name(table)
+    has_default = db.session.execute(text("SELECT to_regclass(:name)"), {'name': default}).scalar() is not None
+    stray = has_default and db.session.execute(
+        text(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE snapshot_date = :d)"), {'d': snapshot_date}
+    ).scalar()
+    if not stray:
+        db.session.execute(text(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} FOR VALUES {bounds}"))
+        return
+    # The new partition's range may not overlap rows left in the default, so they move with it detached
+    columns = ', '.join(_insert_columns(table))
+    db.session.execute(text(f"ALTER TABLE {table} DETACH PARTITION {default}"))
+    db.session.execute(text(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES {bounds}"))
+    db.session.execute(text(
+        f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {default} WHERE snapshot_date = :d"
+    ), {'d': snapshot_date})
+    db.session.execute(text(f"DELETE FROM {default} WHERE snapshot_date = :d"), {'d': snapshot_date})
+    db.session.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT"))
+    logger.info(f"Moved {snapshot_date} rows of {table} out of its default partition")
+
+def list_partitions(table):
+    """[(partition name, snapshot_date)] of table's day partitions, oldest first."""
+    rows = db.session.execute(text("""
+        SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(:table)
+    """), {'table': table})
+    prefix = f"{table}_p"
+    partitions = []
+    for (name,) in rows:
+        suffix = name[len(prefix):] if name.startswith(prefix) else ''
+        if len(suffix) == 8 and suffix.isdigit():
+            partitions.append((name, date(int(suffix[:4]), int(suffix[4:6]), int(suffix[6:]))))
+    return sorted(partitions, key=lambda p: p[1])
+
+def convert_to_partitioned(model):
+    """
+    Rebuilds a plain snapshot table as a partitioned one in a single transaction: the old heap is
+    renamed aside, an identical partitioned table takes its name (columns, defaults, generated
+    columns and indexes, with the model's primary key), each existing date is copied into its own
+    partition beside a DEFAULT one and the old heap is dropped. Returns False if the table is
+    already partitioned.
+    """
+    table = model.__tablename__
+    if db.session.execute(text("SELECT to_regclass(:table)"), {'table': table}).scalar() is None or is_partitioned(table):
+        return False
+    legacy = f"{table}_unpartitioned"
+    try:
+        indexes = db.session.execute(text("""
+            SELECT i.indexname, i.indexdef FROM pg_indexes i
+            WHERE i.tablename = :table
+              AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conname = i.indexname AND c.contype = 'p')
+        """), {'table': table}).all()
+
+        db.session.execute(text(f"ALTER TABLE {table} RENAME TO {legacy}"))
+        db.session.execute(text(f"ALTER TABLE {legacy} RENAME CONSTRAINT {table}_pkey TO {legacy}_pkey"))
+        for name, _ in indexes:
+            db.session.execute(text(f"ALTER INDEX {name} RENAME TO {name[:50]}_unpartitioned"))
+
+        key = ', '.join(c.name for c in model.__table__.primary_key)
+        db.session.execute(text(f"""
+            CREATE TABLE {table} (
+                LIKE {legacy} INCLUDING DEFAULTS INCLUDING GENERATED,
+                CONSTRAINT {table}_pkey PRIMARY KEY ({key})
+            ) PARTITION BY RANGE (snapshot_date)
+        """))
+        # Serial ids keep counting from the old sequence, which moves to the new table
+        sequences = db.session.execute(text("""
+            SELECT a.attname, pg_get_serial_sequence(:legacy, a.attname) FROM pg_attribute a
+            WHERE a.attrelid = to_regclass(:legacy) AND a.attnum > 0 AND NOT a.attisdropped
+              AND pg_get_serial_sequence(:legacy, a.attname) IS NOT NULL
+        """), {'legacy': legacy}).all()
+        for column, sequence in sequences:
+            db.session.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {table}.{column}"))
+        for _, definition in indexes:
+            db.session.execute(text(definition))
+
+        dates = [d for (d,) in db.session.execute(text(f"SELECT DISTINCT snapshot_date FROM {legacy}"))]
+        for snapshot_date in dates:
+            ensure_partition(model, snapshot_date)
+        db.session.execute(text(f"CREATE TABLE {default_partition_name(table)} PARTITION OF {table} DEFAULT"))
+        columns = _insert_columns(table)
+        db.session.execute(text(f"INSERT INTO {table} ({', '.join(columns)}) SELECT {', '.join(columns)} FROM {legacy}"))
+        db.session.execute(text(f"DROP TABLE {legacy}"))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    logger.info(f"Partitioned {table} into {len(dates)} day partitions")
+    return True
+
+def apply_retention(model, keep_days=None, drop=False):
+    """
+    Detaches (or drops) day partitions older than keep_days. The active snapshot's partition is
+    always kept. Detached partitions stay as plain tables until dropped or archived.
+    Returns the names of the partitions removed.
+    """
+    keep_days = int(keep_days or SNAPSHOT_RETENTION_DAYS or 0)
+    table = model.__tablename__
+    if keep_days <= 0 or not is_partitioned(table):
+        return []
+    cutoff = date.today() - timedelta(days=keep_days)
+    active = active_snapshot_date(model)
+    removed = []
+    for name, snapshot_date in list_partitions(table):
+        if snapshot_date >= cutoff or snapshot_date == active:
+            continue
+        db.session.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+        if drop:
+            db.session.execute(text(f"DROP TABLE {name}"))
+        removed.append(name)
+    db.session.commit()
+    if removed:
+        logger.info(f"{'Dropped' if drop else 'Detached'} {len(removed)} partitions of {table} older than {cutoff}")
+    return removed
@@ -0,0 +1,109 @@
+import logging
+import threading
+import time
+import redis
+from redis.client import Pipeline
+from redis.exceptions import ConnectionError, TimeoutError
+
+logger = logging.getLogger(__name__)
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive connection failures. While open, calls fail
+    immediately instead of waiting on socket timeouts; after `cooldown` seconds one call
+    is let through to probe whether Redis is back.
+    """
+    def __init__(self, threshold=5, cooldown=30):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    @property
+    def is_open(self):
+        return self._opened_at is not None
+
+    def before_call(self):
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if self._probing or time.monotonic() - self._opened_at < self.cooldown:
+                raise ConnectionError("Redis circuit breaker is open")
+            self._probing = True
+
+    def record_success(self):
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info("Redis reachable again; closing circuit breaker")
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._opened_at is not None or self._failures >= self.threshold:
+                if self._opened_at is None:
+                    logger.warning(f"Redis failed {self._failures} times in a row; opening circuit breaker")
+                self._opened_at = time.monotonic()
+
+class BreakerPipeline(Pipeline):
+    def __init__(self, breaker, *args, **kwargs):
+        self.breaker = breaker
+        super().__init__(*args, **kwargs)
+
+    def execute(self, raise_on_error=True):
+        self.breaker.before_call()
+        try:
+            result = super().execute(raise_on_error)
+        except (ConnectionError, TimeoutError):
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return result
+
+class ResilientRedis(redis.Redis):
+    """redis.Redis guarded by a circuit breaker so an outage fails fast for every caller."""
+    def __init__(self, *args, breaker=None, **kwargs):
+        self.breaker = breaker or CircuitBreaker()
+        super().__init__(*args, **kwargs)
+
+    def execute_command(self, *args, **options):
+        self.breaker.before_call()
+        try:
+            result = super().execute_command(*args, **options)
+        except (ConnectionError, TimeoutError):
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return result
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        return BreakerPipeline(self.breaker, self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+def normalize_url(url):
+    # redis+unix:///path/redis.sock is accepted as an alias of redis-py's unix:///path/redis.sock
+    if url.startswith('redis+unix://'):
+        return 'unix://' + url[len('redis+unix://'):]
+    return url
+
+def make_redis_client(url, max_connections=50, pool_timeout=2.0, socket_timeout=0.5, connect_timeout=0.5,
+                      breaker_threshold=5, breaker_cooldown=30, decode_responses=True):
+    """
+    Client over a shared BlockingConnectionPool: green threads wait up to pool_timeout for a
+    free connection instead of opening unbounded new ones, and short socket timeouts keep
+    a stalled Redis from holding requests.
+    """
+    pool = redis.BlockingConnectionPool.from_url(
+        normalize_url(url),
+        max_connections=max_connections,
+        timeout=pool_timeout,
+        socket_timeout=socket_timeout,
+        socket_connect_timeout=connect_timeout,
+        health_check_interval=30,
+        decode_responses=decode_responses
+    )
+    return ResilientRedis(connection_pool=pool, breaker=CircuitBreaker(breaker_threshold, breaker_cooldown))
@@ -0,0 +1,140 @@
+import hashlib
+import json
+import logging
+from sqlalchemy import func, literal, literal_column, select, text, union
+from sqlalchemy.dialects import postgresql
+from app.cache import cache_get, cache_set
+from app.extensions import db
+from app.models import (
+    OrderStatusReportSnapshot, ShortStatusReportSnapshot, OrderProvisionSummaryReport,
+    LocationWiseOrderSnapshot, LocationWiseStockSnapshot
+)
+from app.snapshots import active_snapshot_date, snapshot_version
+
+logger = logging.getLogger(__name__)
+
+# Report -> the columns its search box matches and the columns typeahead suggests values from.
+# Each report's 'columns' are concatenated into one search document with a pg_trgm GIN index on
+# it, so a substring search is one index scan whatever the term's position in the value.
+SEARCH_SPECS = {
+    'orderstatus': {
+        'model': OrderStatusReportSnapshot,
+        # Already the '|'-joined hierarchy, stored by the table
+        'columns': ['hierarchy_key'],
+        'suggest': ['division', 'group_name', 'purity', 'classification', 'make_location', 'collection', 'party_name']
+    },
+    'shortstatus': {
+        'model': ShortStatusReportSnapshot,
+        'columns': ['division', 'group_name', 'classification']
+    },
+    'locationwiseorder': {
+        'model': LocationWiseOrderSnapshot,
+        'columns': ['division', 'location']
+    },
+    'provisionstatus': {
+        'model': OrderProvisionSummaryReport,
+        'columns': ['division', 'group_name', 'classification', 'party']
+    },
+    'branchweight': {
+        'model': LocationWiseStockSnapshot,
+        'columns': ['location', 'zone', 'state']
+    }
+}
+
+# Typeahead answers for this long per term; keys carry the load version, so a reload is never stale
+SUGGEST_TTL = 600
+SUGGEST_LIMIT = 10
+SUGGEST_MIN_LENGTH = 2
+# Matching rows scanned per suggestion request, enough to fill the list from any term
+SUGGEST_CANDIDATES = 500
+
+def search_document(report):
+    """
+    SQL expression the report's search matches and its trigram index covers. Separators and
+    blanks are inlined rather than bound so the query text matches the index expression.
+    """
+    spec = SEARCH_SPECS[report]
+    model = spec['model']
+    columns = [getattr(model, name) for name in spec['columns']]
+    if len(columns) == 1:
+        return columns[0]
+    parts = [func.coalesce(c, literal_column("''")) for c in columns]
+    document = parts[0]
+    for part in parts[1:]:
+        document = document.op('||')(literal_column("'|'")).op('||')(part)
+    return document
+
+def search_index_name(report):
+    return f"trgm_{SEARCH_SPECS[report]['model'].__tablename__}_search"
+
+def ensure_search_index(report):
+    """Creates pg_trgm and the report's trigram index; a no-op when they already exist."""
+    table = SEARCH_SPECS[report]['model'].__tablename__
+    document = search_document(report).compile(dialect=postgresql.dialect(), compile_kwargs={'literal_binds': True})
+    # Columns are compiled table-qualified; an index expression takes bare names
+    expression = str(document).replace(f"{table}.", '')
+    db.session.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    db.session.execute(text(
+        f"CREATE INDEX IF NOT EXISTS {search_index_name(report)} ON {table} USING gin (({expression}) gin_trgm_ops)"
+    ))
+
+def like_pattern(term):
+    escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{escaped}%"
+
+def search_filter(report, term):
+    """Filter clause for the report's search box; the term is matched literally, as a substring."""
+    return search_document(report).ilike(like_pattern(term), escape='\\')
+
+def suggest_columns(report):
+    spec = SEARCH_SPECS[report]
+    return spec.get('suggest', spec['columns'])
+
+def build_suggestions(report, term, limit=SUGGEST_LIMIT):
+    """
+    Distinct values of the report's suggest columns containing term in the active snapshot,
+    prefix matches first and then by trigram similarity. Candidate rows come from the search
+    index; only their values are compared per column.
+    """
+    spec = SEARCH_SPECS[report]
+    model = spec['model']
+    names = suggest_columns(report)
+    pattern = like_pattern(term)
+
+    rows = select(*[getattr(model, name) for name in names]).where(search_filter(report, term))
+    if hasattr(model, 'snapshot_date'):
+        rows = rows.where(model.snapshot_date == active_snapshot_date(model))
+    # A CTE, so Postgres fetches the candidates once for all the per-column branches
+    rows = rows.limit(SUGGEST_CANDIDATES).cte('candidates')
+
+    # UNION drops repeats, so the outer query can order by expressions it does not select
+    values = union(*[
+        select(rows.c[name].label('value'), literal(name).label('field'))
+        .where(rows.c[name].ilike(pattern, escape='\\'))
+        for name in names
+    ]).subquery()
+    ranked = (
+        select(values.c.value, values.c.field)
+        .order_by(
+            values.c.value.ilike(pattern[1:], escape='\\').desc(),
+            func.similarity(values.c.value, term).desc(),
+            values.c.value
+        )
+        .limit(limit)
+    )
+    return [{'value': r.value, 'field': r.field} for r in db.session.execute(ranked)]
+
+def suggestions(report, term, limit=SUGGEST_LIMIT):
+    """Typeahead values for term, cached per report load version."""
+    term = term.strip()
+    if len(term) < SUGGEST_MIN_LENGTH:
+        return []
+    model = SEARCH_SPECS[report]['model']
+    digest = hashlib.sha1(f"{term.lower()}:{limit}".encode()).hexdigest()
+    key = f"suggest:{model.__tablename__}:{snapshot_version(model)}:{report}:{digest}"
+    cached = cache_get(key)
+    if cached is not None:
+        return json.loads(cached)
+    result = build_suggestions(report, term, limit)
+    cache_set(key, json.dumps(result), SUGGEST_TTL)
+    return result
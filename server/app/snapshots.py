@@ -0,0 +1,218 @@
+import json
+import logging
+import time
+from datetime import date
+from sqlalchemy import func, select, text
+from app.database import read_primary_until_replayed
+from app.extensions import db, redis_client
+
+logger = logging.getLogger(__name__)
+
+REGISTRY_KEY = 'snapshot_registry'
+
+# table name -> load counter; report caches are namespaced by it so a reload never serves old keys
+VERSIONS_KEY = 'snapshot_versions'
+
+# Keys per SCAN round trip when purging a superseded cache namespace
+PURGE_SCAN_COUNT = 500
+
+# How long a worker trusts its in-memory copy before re-reading the shared registry
+REGISTRY_REFRESH_SECONDS = 5
+
+# How long a probed entry (one publish_snapshot did not write) is trusted before the table is
+# probed again, so loads by tooling that never publishes are still picked up
+PROBE_REFRESH_SECONDS = 60
+
+# table name -> {'snapshot_date': date | None, 'row_count': int, 'lsn': primary WAL position at publish | None,
+#                'probed_at': epoch seconds of the probe that found it | None when published}
+_registry = {}
+_versions = {}
+_loaded_at = 0.0
+
+def _encode(entry):
+    return json.dumps({
+        'snapshot_date': entry['snapshot_date'].isoformat() if entry['snapshot_date'] else None,
+        'row_count': entry['row_count'],
+        'lsn': entry.get('lsn'),
+        'probed_at': entry.get('probed_at')
+    })
+
+def _decode(raw):
+    data = json.loads(raw)
+    return {
+        'snapshot_date': date.fromisoformat(data['snapshot_date']) if data['snapshot_date'] else None,
+        'row_count': data['row_count'],
+        'lsn': data.get('lsn'),
+        # Entries written before probes were stamped cannot be told apart; probe them once more
+        'probed_at': data.get('probed_at', 0)
+    }
+
+def _sync_from_redis():
+    global _loaded_at
+    _loaded_at = time.monotonic()
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.hgetall(REGISTRY_KEY)
+        pipe.hgetall(VERSIONS_KEY)
+        shared, versions = pipe.execute()
+    except Exception as e:
+        logger.warning(f"Snapshot registry unavailable, using local copy: {e}")
+        return
+    _registry.update({table: _decode(raw) for table, raw in shared.items()})
+    _versions.update({table: int(version) for table, version in versions.items()})
+
+def _probe(model):
+    # One query for the newest date and its size, on the primary so a lagging replica never
+    # registers an older date
+    latest = select(func.max(model.snapshot_date)).scalar_subquery()
+    query = select(latest, func.count()).select_from(model).where(model.snapshot_date == latest)
+    snapshot_date, row_count = db.session.execute(query, bind_arguments={'bind': db.engine}).one()
+    return {'snapshot_date': snapshot_date, 'row_count': row_count or 0, 'lsn': current_wal_lsn(),
+            'probed_at': time.time()}
+
+def current_wal_lsn():
+    # The primary's WAL position: everything committed so far is replayed by a replica that reaches it
+    if db.engine.dialect.name != 'postgresql':
+        return None
+    try:
+        with db.engine.connect() as conn:
+            return conn.execute(text("SELECT pg_current_wal_lsn()::text")).scalar()
+    except Exception as e:
+        logger.warning(f"Could not read the primary WAL position: {e}")
+        return None
+
+def publish_snapshot(model, snapshot_date=None, row_count=None):
+    """
+    Records snapshot_date as the active snapshot of model's table once a load has committed.
+    Every worker switches to it on its next registry refresh; readers never see a half-loaded date.
+    """
+    if snapshot_date is None:
+        entry = dict(_probe(model), probed_at=None)
+    else:
+        if row_count is None:
+            row_count = db.session.query(func.count()).select_from(model) \
+                .filter(model.snapshot_date == snapshot_date).scalar()
+        entry = {'snapshot_date': snapshot_date, 'row_count': row_count, 'lsn': current_wal_lsn(), 'probed_at': None}
+    table = model.__tablename__
+    _registry[table] = entry
+    try:
+        redis_client.hset(REGISTRY_KEY, table, _encode(entry))
+    except Exception as e:
+        logger.warning(f"Could not publish snapshot for {table}: {e}")
+    bump_snapshot_version(model)
+    return entry
+
+def cache_namespaces(table, version):
+    # Every report cache layer keys under one of these, so a namespace can be purged as a whole
+    return [f'report:{table}:{version}:', f'fragment:{table}:{version}:', f'barcode_tree:{table}:{version}:',
+            f'filter_catalog:{table}:{version}:']
+
+def _purge(table, version):
+    try:
+        for prefix in cache_namespaces(table, version):
+            batch = []
+            for key in redis_client.scan_iter(match=f'{prefix}*', count=PURGE_SCAN_COUNT):
+                batch.append(key)
+                if len(batch) >= PURGE_SCAN_COUNT:
+                    redis_client.unlink(*batch)
+                    batch = []
+            if batch:
+                redis_client.unlink(*batch)
+    except Exception as e:
+        # Unpurged keys are unreachable under the new version and expire on their own
+        logger.warning(f"Could not purge cache version {version} of {table}: {e}")
+
+def bump_snapshot_version(model):
+    """
+    Moves every report cache of model's table to a new namespace and drops the previous one.
+    Called by publish_snapshot; loads that replace a table without a snapshot date call it directly.
+    """
+    table = model.__tablename__
+    try:
+        version = redis_client.hincrby(VERSIONS_KEY, table, 1)
+    except Exception as e:
+        logger.warning(f"Could not bump cache version for {table}: {e}")
+        version = _versions.get(table, 0) + 1
+    _versions[table] = version
+    _purge(table, version - 1)
+    return version
+
+def snapshot_version(model):
+    if time.monotonic() - _loaded_at > REGISTRY_REFRESH_SECONDS:
+        _sync_from_redis()
+    return _versions.get(model.__tablename__, 0)
+
+def active_snapshot(model):
+    """Returns {'snapshot_date', 'row_count'} of the active snapshot for model's table."""
+    if time.monotonic() - _loaded_at > REGISTRY_REFRESH_SECONDS:
+        _sync_from_redis()
+    entry = _registry.get(model.__tablename__)
+    if entry is None:
+        entry = _probe(model)
+        # An empty table is not registered, so a first load by other tooling is still picked up
+        if entry['row_count']:
+            entry = _register(model, entry)
+    elif _probe_due(model, entry):
+        entry = _reprobe(model, entry)
+    return entry
+
+def _probe_due(model, entry):
+    # Published entries are current until the next publish; probed ones only for PROBE_REFRESH_SECONDS.
+    # The NX key lets one worker per interval run the probe while the others keep the entry they have.
+    if entry.get('probed_at') is None or time.time() - entry['probed_at'] < PROBE_REFRESH_SECONDS:
+        return False
+    table = model.__tablename__
+    try:
+        return bool(redis_client.set(f'snapshot_probe:{table}', 1, nx=True, ex=PROBE_REFRESH_SECONDS))
+    except Exception as e:
+        logger.warning(f"Could not claim the snapshot probe for {table}: {e}")
+        return True
+
+def _reprobe(model, entry):
+    """
+    Re-reads a probed entry from the table. A load by tooling that does not publish shows up as a new
+    date or row count: the entry is replaced and the cache version bumped, as publish_snapshot would.
+    An unchanged table only refreshes probed_at.
+    """
+    table = model.__tablename__
+    probed = _probe(model)
+    changed = (probed['snapshot_date'], probed['row_count']) != (entry['snapshot_date'], entry['row_count'])
+    _registry[table] = probed
+    try:
+        redis_client.hset(REGISTRY_KEY, table, _encode(probed))
+    except Exception as e:
+        logger.warning(f"Could not refresh snapshot for {table}: {e}")
+    if changed:
+        logger.info(f"{table} moved to snapshot {probed['snapshot_date']} outside publish_snapshot")
+        bump_snapshot_version(model)
+    return probed
+
+def _register(model, entry):
+    """
+    Records a probed entry only where the registry has none. Unlike publish_snapshot this never
+    bumps the version or purges caches: a cold worker or an emptied registry is not a new load.
+    If another worker or a loader got there first, its entry wins.
+    """
+    table = model.__tablename__
+    try:
+        if not redis_client.hsetnx(REGISTRY_KEY, table, _encode(entry)):
+            entry = _decode(redis_client.hget(REGISTRY_KEY, table))
+    except Exception as e:
+        logger.warning(f"Could not register snapshot for {table}: {e}")
+    _registry[table] = entry
+    return entry
+
+def read_current_snapshot(model):
+    """
+    Called before a report over model's table is computed for a cache: keeps the request off a
+    replica that has not replayed the load the registry publishes, so the entry stored under
+    the new version never holds a missing or half-applied snapshot.
+    """
+    if hasattr(model, 'snapshot_date'):
+        read_primary_until_replayed(db, active_snapshot(model).get('lsn'))
+
+def active_snapshot_date(model):
+    return active_snapshot(model)['snapshot_date']
+
+def has_snapshot_data(model):
+    return active_snapshot(model)['row_count'] > 0
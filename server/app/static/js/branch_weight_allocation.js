@@ -185,6 +185,7 @@ function onZoneChange(val) {
     urlParams.delete('state');
     urlParams.delete('location');
     urlParams.set('page', 1);
+    urlParams.delete('cursor');
 
     updateUrlAndLoad(urlParams);
     loadFilterOptions(); // Refresh dependent options
@@ -197,6 +198,7 @@ function onStateChange(val) {
 
     urlParams.delete('location');
     urlParams.set('page', 1);
+    urlParams.delete('cursor');
 
     updateUrlAndLoad(urlParams);
     loadFilterOptions(); // Refresh dependent options
@@ -207,6 +209,7 @@ function onLocationChange(val) {
     if (val) urlParams.set('location', val);
     else urlParams.delete('location');
     urlParams.set('page', 1);
+    urlParams.delete('cursor');
     updateUrlAndLoad(urlParams);
 }
 
@@ -216,6 +219,7 @@ function resetDrillDown() {
     urlParams.delete('state');
     urlParams.delete('location');
     urlParams.set('page', 1);
+    urlParams.delete('cursor');
 
     document.getElementById('filter-zone').value = '';
     document.getElementById('filter-state').value = '';
@@ -242,6 +246,7 @@ function applyGlobalFilters() {
     else urlParams.delete('search');
 
     urlParams.set('page', 1);
+    urlParams.delete('cursor');
     updateUrlAndLoad(urlParams);
 }
 
@@ -263,6 +268,7 @@ function resetGlobalFilters() {
     document.getElementById('filter-location').value = '';
 
     urlParams.set('page', 1);
+    urlParams.delete('cursor');
     updateUrlAndLoad(urlParams);
     loadFilterOptions(); // Reload options after reset to ensure all options are available
 }
@@ -292,18 +298,21 @@ function updatePaginationControls(meta) {
     const btnNext = document.getElementById('btn-next');
     if (btnPrev) {
         btnPrev.disabled = !hasPrev;
-        btnPrev.onclick = hasPrev ? () => changePage(parseInt(meta.prevNum)) : null;
+        btnPrev.onclick = hasPrev ? () => changePage(parseInt(meta.prevNum), meta.prevCursor) : null;
     }
     if (btnNext) {
         btnNext.disabled = !hasNext;
-        btnNext.onclick = hasNext ? () => changePage(parseInt(meta.nextNum)) : null;
+        btnNext.onclick = hasNext ? () => changePage(parseInt(meta.nextNum), meta.nextCursor) : null;
     }
 }
 
-function changePage(page) {
+function changePage(page, cursor) {
     if (!page) return;
     const urlParams = new URLSearchParams(window.location.search);
     urlParams.set('page', page);
+    // Seek from the previous page's cursor when the server gave one
+    if (cursor) urlParams.set('cursor', cursor);
+    else urlParams.delete('cursor');
     updateUrlAndLoad(urlParams);
 }
 
@@ -311,6 +320,7 @@ function changePerPage(perPage) {
     const urlParams = new URLSearchParams(window.location.search);
     urlParams.set('per_page', perPage);
     urlParams.set('page', 1);
+    urlParams.delete('cursor');
     updateUrlAndLoad(urlParams);
 }
 
@@ -476,6 +486,13 @@ function toggleModalRow(rowId) {
         icon.style.transform = 'rotate(0deg)';
     }
 
+    // Location rows fetch their barcodes on first expand
+    const row = icon.closest('tr');
+    if (isExpanding && row && row.dataset.leavesUrl && !row.dataset.loaded) {
+        row.dataset.loaded = 'true';
+        loadBarcodeLeaves(row.dataset.leavesUrl, row, rowId);
+    }
+
     // Toggle children visibility
     const children = table.querySelectorAll(`.child-of-${rowId}`);
 
@@ -520,3 +537,52 @@ function toggleModalRow(rowId) {
         }
     });
 }
+
+// Barcode rows for one location node, a page at a time. The server renders the rows; they
+// take the location row's ancestry classes so collapsing any parent hides them again.
+function loadBarcodeLeaves(url, anchorRow, rowId) {
+    const parentClasses = Array.from(anchorRow.classList).filter(c => c.startsWith('child-of-'));
+    parentClasses.push(`child-of-${rowId}`);
+
+    // As wide as the popup's grid: the refill table has one column fewer than the allocated one
+    const columns = anchorRow.closest('table').querySelector('thead tr')?.children.length || anchorRow.children.length;
+    const loading = document.createElement('tr');
+    loading.className = parentClasses.join(' ');
+    loading.innerHTML = `<td colspan="${columns}" class="px-4 py-2 text-center text-[10px] text-gray-400 uppercase tracking-widest">Loading barcodes...</td>`;
+    anchorRow.after(loading);
+
+    fetch(url, {
+        headers: {
+            'Authorization': `Bearer ${localStorage.getItem('access_token')}`
+        }
+    })
+        .then(response => {
+            if (!response.ok) throw new Error('Failed to fetch barcodes');
+            return response.text();
+        })
+        .then(html => {
+            const body = document.createElement('tbody');
+            body.innerHTML = html;
+            const rows = Array.from(body.querySelectorAll('tr'));
+            rows.forEach(r => r.classList.add(...parentClasses));
+
+            // Still collapsed if the user closed the location while the page was in flight
+            const icon = document.getElementById(`icon-${rowId}`);
+            if (icon && icon.textContent === 'expand_more') rows.forEach(r => r.classList.add('hidden'));
+
+            loading.replaceWith(...rows);
+        })
+        .catch(error => {
+            console.error('Error fetching barcodes:', error);
+            loading.querySelector('td').textContent = 'Failed to load barcodes.';
+            delete anchorRow.dataset.loaded;
+        });
+}
+
+function loadMoreBarcodes(button) {
+    const row = button.closest('tr');
+    const rowId = Array.from(row.classList).filter(c => c.startsWith('child-of-')).pop().replace('child-of-', '');
+    const anchor = row.previousElementSibling;
+    row.remove();
+    loadBarcodeLeaves(button.dataset.nextUrl, anchor, rowId);
+}
@@ -197,6 +197,7 @@ function onZoneChange(val) {
     urlParams.delete('state');
     urlParams.delete('location');
     urlParams.set('page', 1);
+    urlParams.delete('cursor');
 
     updateUrlAndLoad(urlParams);
     loadFilterOptions(); // Refresh dependent options
@@ -209,6 +210,7 @@ function onStateChange(val) {
 
     urlParams.delete('location');
     urlParams.set('page', 1);
+    urlParams.delete('cursor');
 
     updateUrlAndLoad(urlParams);
     loadFilterOptions(); // Refresh dependent options
@@ -219,6 +221,7 @@ function onLocationChange(val) {
     if (val) urlParams.set('location', val);
     else urlParams.delete('location');
     urlParams.set('page', 1);
+    urlParams.delete('cursor');
     updateUrlAndLoad(urlParams);
 }
 
@@ -228,6 +231,7 @@ function resetDrillDown() {
     urlParams.delete('state');
     urlParams.delete('location');
     urlParams.set('page', 1);
+    urlParams.delete('cursor');
 
     document.getElementById('filter-zone').value = '';
     document.getElementById('filter-state').value = '';
@@ -254,6 +258,7 @@ function applyGlobalFilters() {
     else urlParams.delete('search');
 
     urlParams.set('page', 1);
+    urlParams.delete('cursor');
     updateUrlAndLoad(urlParams);
 }
 
@@ -275,6 +280,7 @@ function resetGlobalFilters() {
     document.getElementById('filter-location').value = '';
 
     urlParams.set('page', 1);
+    urlParams.delete('cursor');
     updateUrlAndLoad(urlParams);
     loadFilterOptions(); // Reload options after reset to ensure all options are available
 }
@@ -304,18 +310,21 @@ function updatePaginationControls(meta) {
     const btnNext = document.getElementById('btn-next');
     if (btnPrev) {
         btnPrev.disabled = !hasPrev;
-        btnPrev.onclick = hasPrev ? () => changePage(parseInt(meta.prevNum)) : null;
+        btnPrev.onclick = hasPrev ? () => changePage(parseInt(meta.prevNum), meta.prevCursor) : null;
     }
     if (btnNext) {
         btnNext.disabled = !hasNext;
-        btnNext.onclick = hasNext ? () => changePage(parseInt(meta.nextNum)) : null;
+        btnNext.onclick = hasNext ? () => changePage(parseInt(meta.nextNum), meta.nextCursor) : null;
     }
 }
 
-function changePage(page) {
+function changePage(page, cursor) {
     if (!page) return;
     const urlParams = new URLSearchParams(window.location.search);
     urlParams.set('page', page);
+    // Seek from the previous page's cursor when the server gave one
+    if (cursor) urlParams.set('cursor', cursor);
+    else urlParams.delete('cursor');
     updateUrlAndLoad(urlParams);
 }
 
@@ -323,6 +332,7 @@ function changePerPage(perPage) {
     const urlParams = new URLSearchParams(window.location.search);
     urlParams.set('per_page', perPage);
     urlParams.set('page', 1);
+    urlParams.delete('cursor');
     updateUrlAndLoad(urlParams);
 }
 
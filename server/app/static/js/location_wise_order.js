@@ -97,6 +97,7 @@ function applyGlobalFilters() {
     else urlParams.delete('search');
 
     urlParams.set('page', 1);
+    urlParams.delete('cursor');
     const newUrl = `${window.location.pathname}?${urlParams.toString()}`;
     window.history.pushState({ path: newUrl }, '', newUrl);
     loadViewData();
@@ -117,6 +118,7 @@ function resetGlobalFilters() {
     const keys = ['location', 'division', 'group', 'purity', 'classification', 'make', 'collection', 'search', 'make_owner', 'collection_owner', 'classification_owner', 'business_head'];
     keys.forEach(k => urlParams.delete(k));
     urlParams.set('page', 1);
+    urlParams.delete('cursor');
 
     const newUrl = `${window.location.pathname}?${urlParams.toString()}`;
     window.history.pushState({ path: newUrl }, '', newUrl);
@@ -147,13 +149,13 @@ function updatePaginationControls(meta) {
     const btnNext = document.getElementById('btn-next');
     if (btnPrev) {
         btnPrev.disabled = !hasPrev;
-        btnPrev.onclick = hasPrev ? () => changePage(prevNum) : null;
+        btnPrev.onclick = hasPrev ? () => changePage(prevNum, meta.prevCursor) : null;
         btnPrev.classList.toggle('opacity-50', !hasPrev);
         btnPrev.classList.toggle('cursor-not-allowed', !hasPrev);
     }
     if (btnNext) {
         btnNext.disabled = !hasNext;
-        btnNext.onclick = hasNext ? () => changePage(nextNum) : null;
+        btnNext.onclick = hasNext ? () => changePage(nextNum, meta.nextCursor) : null;
         btnNext.classList.toggle('opacity-50', !hasNext);
         btnNext.classList.toggle('cursor-not-allowed', !hasNext);
     }
@@ -161,10 +163,13 @@ function updatePaginationControls(meta) {
     if (select) select.value = perPage;
 }
 
-function changePage(page) {
+function changePage(page, cursor) {
     if (!page) return;
     const urlParams = new URL(window.location.href).searchParams;
     urlParams.set('page', page);
+    // Seek from the previous page's cursor when the server gave one
+    if (cursor) urlParams.set('cursor', cursor);
+    else urlParams.delete('cursor');
     const newUrl = `${window.location.pathname}?${urlParams.toString()}`;
     window.history.pushState({ path: newUrl }, '', newUrl);
     loadViewData();
@@ -175,6 +180,7 @@ function changePerPage(perPage) {
     const urlParams = new URL(window.location.href).searchParams;
     urlParams.set('per_page', perPage);
     urlParams.set('page', 1);
+    urlParams.delete('cursor');
     const newUrl = `${window.location.pathname}?${urlParams.toString()}`;
     window.history.pushState({ path: newUrl }, '', newUrl);
     loadViewData();
@@ -63,9 +63,19 @@ document.addEventListener('DOMContentLoaded', function () {
         }
     }
 
+    // Cursor of the newest notification on screen, from the feed's X-Feed-Latest header
+    let feedLatest = null;
+
     function fetchNotifications() {
         if (!notifList) return;
 
+        // Once the feed is on screen only rows newer than it are pulled
+        const currentWrapper = document.getElementById('notifFadeWrapper');
+        if (feedLatest && currentWrapper) {
+            fetchNewNotifications(currentWrapper);
+            return;
+        }
+
         // Reset to loading spinner
         notifList.innerHTML = `
             <div class="py-12 text-center">
@@ -79,7 +89,10 @@ document.addEventListener('DOMContentLoaded', function () {
                 'Authorization': `Bearer ${localStorage.getItem('access_token')}`
             }
         })
-            .then(response => response.text())
+            .then(response => {
+                feedLatest = response.headers.get('X-Feed-Latest');
+                return response.text();
+            })
             .then(html => {
                 // Capture current height (spinner height)
                 const initialHeight = notifList.offsetHeight;
@@ -128,6 +141,39 @@ document.addEventListener('DOMContentLoaded', function () {
             });
     }
 
+    function fetchNewNotifications(wrapper) {
+        fetch(`/notifications/list?since=${encodeURIComponent(feedLatest)}`, {
+            headers: {
+                'Authorization': `Bearer ${localStorage.getItem('access_token')}`
+            }
+        })
+            .then(response => {
+                feedLatest = response.headers.get('X-Feed-Latest') || feedLatest;
+                // More rows arrived than one page holds; fetch the rest after prepending this one
+                const more = response.headers.get('X-Feed-More') === '1';
+                return response.text().then(html => ({ html, more }));
+            })
+            .then(({ html, more }) => {
+                if (more) setTimeout(() => fetchNewNotifications(wrapper), 0);
+                const fragment = document.createElement('div');
+                fragment.innerHTML = html;
+                // Skip rows already prepended from the socket while the dropdown was open
+                const items = Array.from(fragment.querySelectorAll('[data-notification-id]'))
+                    .filter(el => !wrapper.querySelector(`[data-notification-id="${el.dataset.notificationId}"]`));
+                if (items.length === 0) return;
+
+                const emptyState = wrapper.querySelector('.text-center');
+                if (emptyState && emptyState.querySelector('.material-symbols-outlined')) {
+                    wrapper.innerHTML = '';
+                }
+                items.reverse().forEach(el => wrapper.prepend(el));
+                updateSyncTime();
+            })
+            .catch(error => {
+                console.error('Error fetching new notifications:', error);
+            });
+    }
+
     // SocketIO Event Listeners
     socket.on('connect', function () {
         console.log('Connected to socket server');
@@ -221,7 +267,7 @@ document.addEventListener('DOMContentLoaded', function () {
             : '';
 
         const itemHtml = `
-        <div class="p-3 border-b border-gray-50 dark:border-gray-800 hover:bg-gray-50 dark:hover:bg-gray-800/50 cursor-pointer transition-all duration-500 opacity-0 -translate-y-2 ${bgClass}">
+        <div data-notification-id="${data.id}" class="p-3 border-b border-gray-50 dark:border-gray-800 hover:bg-gray-50 dark:hover:bg-gray-800/50 cursor-pointer transition-all duration-500 opacity-0 -translate-y-2 ${bgClass}">
             <div class="flex gap-3">
                 <div class="shrink-0 mt-0.5">
                     <span class="material-symbols-outlined ${colorClass} text-base">${data.icon}</span>
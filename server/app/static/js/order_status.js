@@ -73,6 +73,7 @@ async function setView(view) {
         // Reset to page 1 when switching views
         const urlParams = new URLSearchParams(window.location.search);
         urlParams.set('page', 1);
+        urlParams.delete('cursor');
         const newUrl = `${window.location.pathname}?${urlParams.toString()}`;
         window.history.pushState({ path: newUrl }, '', newUrl);
 
@@ -186,12 +187,14 @@ function applyGlobalFilters() {
     else urlParams.delete('search');
 
     urlParams.set('page', 1); // Reset to page 1
+    urlParams.delete('cursor');
 
     const newUrl = `${window.location.pathname}?${urlParams.toString()}`;
     window.history.pushState({ path: newUrl }, '', newUrl);
 
     const currentView = localStorage.getItem('orderstatus-view') || 'make';
     loadViewData(currentView);
+    if (globalOptionsLoaded) applyFacetCounts();
 }
 
 function resetGlobalFilters() {
@@ -217,18 +220,21 @@ function resetGlobalFilters() {
     ];
     keysToDelete.forEach(k => urlParams.delete(k));
     urlParams.set('page', 1);
+    urlParams.delete('cursor');
 
     const newUrl = `${window.location.pathname}?${urlParams.toString()}`;
     window.history.pushState({ path: newUrl }, '', newUrl);
 
     const currentView = localStorage.getItem('orderstatus-view') || 'make';
     loadViewData(currentView);
+    if (globalOptionsLoaded) applyFacetCounts();
 }
 
 function setDatePreset(preset) {
     const urlParams = new URL(window.location.href).searchParams;
     urlParams.set('date_range', preset);
     urlParams.set('page', 1);
+    urlParams.delete('cursor');
 
     const newUrl = `${window.location.pathname}?${urlParams.toString()}`;
     window.history.pushState({ path: newUrl }, '', newUrl);
@@ -281,7 +287,7 @@ function updatePaginationControls(meta) {
         btnPrev.disabled = !hasPrev;
         if (hasPrev) {
             btnPrev.classList.remove('opacity-50', 'cursor-not-allowed');
-            btnPrev.onclick = () => changePage(prevNum);
+            btnPrev.onclick = () => changePage(prevNum, meta.prevCursor);
         } else {
             btnPrev.classList.add('opacity-50', 'cursor-not-allowed');
             btnPrev.onclick = null;
@@ -292,7 +298,7 @@ function updatePaginationControls(meta) {
         btnNext.disabled = !hasNext;
         if (hasNext) {
             btnNext.classList.remove('opacity-50', 'cursor-not-allowed');
-            btnNext.onclick = () => changePage(nextNum);
+            btnNext.onclick = () => changePage(nextNum, meta.nextCursor);
         } else {
             btnNext.classList.add('opacity-50', 'cursor-not-allowed');
             btnNext.onclick = null;
@@ -306,10 +312,13 @@ function updatePaginationControls(meta) {
     }
 }
 
-function changePage(page) {
+function changePage(page, cursor) {
     if (!page) return;
     const urlParams = new URL(window.location.href).searchParams;
     urlParams.set('page', page);
+    // Seek from the previous page's cursor when the server gave one
+    if (cursor) urlParams.set('cursor', cursor);
+    else urlParams.delete('cursor');
     const newUrl = `${window.location.pathname}?${urlParams.toString()}`;
     window.history.pushState({ path: newUrl }, '', newUrl);
 
@@ -322,6 +331,7 @@ function changePerPage(perPage) {
     const urlParams = new URL(window.location.href).searchParams;
     urlParams.set('per_page', perPage);
     urlParams.set('page', 1); // Reset to first page
+    urlParams.delete('cursor');
     const newUrl = `${window.location.pathname}?${urlParams.toString()}`;
     window.history.pushState({ path: newUrl }, '', newUrl);
 
@@ -465,6 +475,7 @@ async function loadFilterOptions() {
             }
         }
         globalOptionsLoaded = true;
+        applyFacetCounts();
     } catch (error) {
         console.error('Error loading filter options:', error);
         // Reset to initial state on error
@@ -477,3 +488,51 @@ async function loadFilterOptions() {
         });
     }
 }
+
+// Show row counts next to each option and disable values that would return an empty page
+async function applyFacetCounts() {
+    const filters = {
+        'divisions': 'filter-division',
+        'groups': 'filter-group',
+        'purities': 'filter-purity',
+        'classifications': 'filter-classification',
+        'makes': 'filter-make',
+        'collections': 'filter-collection',
+        'parties': 'filter-party',
+        'make_owners': 'filter-make-owner',
+        'collection_owners': 'filter-collection-owner',
+        'classification_owners': 'filter-classification-owner',
+        'business_heads': 'filter-business-head'
+    };
+
+    try {
+        const urlParams = new URLSearchParams(window.location.search);
+        const response = await fetch(`/api/orderstatus/facets?${urlParams.toString()}`, {
+            headers: {
+                'Authorization': `Bearer ${localStorage.getItem('access_token')}`
+            }
+        });
+        if (!response.ok) throw new Error('Failed to fetch facet counts');
+        const facets = await response.json();
+
+        for (const [key, id] of Object.entries(filters)) {
+            const el = document.getElementById(id);
+            if (!el) continue;
+            // Selected facets are not counted; they keep their plain labels
+            const counts = new Map((facets[key] || []).map(f => [f.value, f.count]));
+            Array.from(el.options).forEach(opt => {
+                if (!opt.value) return;
+                if (!facets[key]) {
+                    opt.textContent = opt.value;
+                    opt.disabled = false;
+                    return;
+                }
+                const count = counts.get(opt.value) || 0;
+                opt.textContent = `${opt.value} (${count})`;
+                opt.disabled = count === 0;
+            });
+        }
+    } catch (error) {
+        console.error('Error loading facet counts:', error);
+    }
+}
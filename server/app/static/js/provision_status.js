@@ -189,6 +189,7 @@ function applyGlobalFilters() {
     else urlParams.delete('search');
 
     urlParams.set('page', 1); // Reset to first page on filter change
+    urlParams.delete('cursor');
 
     // Using AJAX instead of window.location.href
     const newUrl = window.location.pathname + '?' + urlParams.toString();
@@ -212,10 +213,13 @@ function resetGlobalFilters() {
     loadProvisionData();
 }
 
-function changePage(page) {
+function changePage(page, cursor) {
     if (!page) return;
     const urlParams = new URLSearchParams(window.location.search);
     urlParams.set('page', page);
+    // Seek from the previous page's cursor when the server gave one
+    if (cursor) urlParams.set('cursor', cursor);
+    else urlParams.delete('cursor');
     window.history.replaceState({}, '', window.location.pathname + '?' + urlParams.toString());
     loadProvisionData();
 }
@@ -226,6 +230,7 @@ function applyFilters() {
     const perPage = document.getElementById('per-page-select')?.value;
     if (perPage) urlParams.set('per_page', perPage);
     urlParams.set('page', 1);
+    urlParams.delete('cursor');
     window.history.replaceState({}, '', window.location.pathname + '?' + urlParams.toString());
     loadProvisionData();
 }
@@ -0,0 +1,41 @@
+// Typeahead for report search boxes: an input with data-suggest-url gets a datalist of matching values
+document.addEventListener('DOMContentLoaded', function () {
+    document.querySelectorAll('input[data-suggest-url]').forEach(function (input) {
+        const list = document.createElement('datalist');
+        list.id = `${input.id || 'search'}-suggestions`;
+        input.setAttribute('list', list.id);
+        input.after(list);
+
+        let timer;
+        input.addEventListener('input', function () {
+            clearTimeout(timer);
+            const query = input.value.trim();
+            if (query.length < 2) {
+                list.innerHTML = '';
+                return;
+            }
+            timer = setTimeout(async () => {
+                try {
+                    const response = await fetch(`${input.dataset.suggestUrl}?q=${encodeURIComponent(query)}`, {
+                        headers: {
+                            'Authorization': `Bearer ${localStorage.getItem('access_token')}`
+                        }
+                    });
+                    if (!response.ok) return;
+                    const data = await response.json();
+                    // A slower answer for an earlier keystroke must not replace the current list
+                    if (data.query !== input.value.trim()) return;
+                    list.innerHTML = '';
+                    data.suggestions.forEach(s => {
+                        const option = document.createElement('option');
+                        option.value = s.value;
+                        option.label = s.field.replaceAll('_', ' ');
+                        list.appendChild(option);
+                    });
+                } catch (e) {
+                    console.error('Error loading suggestions:', e);
+                }
+            }, 150);
+        });
+    });
+});
@@ -154,6 +154,7 @@ function applyGlobalFilters() {
     }
 
     urlParams.set('page', 1);
+    urlParams.delete('cursor');
     const newUrl = `${window.location.pathname}?${urlParams.toString()}`;
     window.history.pushState({ path: newUrl }, '', newUrl);
 
@@ -175,6 +176,7 @@ function resetGlobalFilters() {
     const urlParams = new URL(window.location.href).searchParams;
     filters.forEach(id => urlParams.delete(id.replace('filter-', '')));
     urlParams.set('page', 1);
+    urlParams.delete('cursor');
 
     const newUrl = `${window.location.pathname}?${urlParams.toString()}`;
     window.history.pushState({ path: newUrl }, '', newUrl);
@@ -187,6 +189,7 @@ function setDatePreset(preset) {
     const urlParams = new URL(window.location.href).searchParams;
     urlParams.set('date_range', preset);
     urlParams.set('page', 1);
+    urlParams.delete('cursor');
 
     const newUrl = `${window.location.pathname}?${urlParams.toString()}`;
     window.history.pushState({ path: newUrl }, '', newUrl);
@@ -225,14 +228,14 @@ function updatePaginationControls(meta) {
 
     if (btnPrev) {
         btnPrev.disabled = !hasPrev;
-        btnPrev.onclick = hasPrev ? () => changePage(prevNum) : null;
+        btnPrev.onclick = hasPrev ? () => changePage(prevNum, meta.prevCursor) : null;
         btnPrev.classList.toggle('opacity-50', !hasPrev);
         btnPrev.classList.toggle('cursor-not-allowed', !hasPrev);
     }
 
     if (btnNext) {
         btnNext.disabled = !hasNext;
-        btnNext.onclick = hasNext ? () => changePage(nextNum) : null;
+        btnNext.onclick = hasNext ? () => changePage(nextNum, meta.nextCursor) : null;
         btnNext.classList.toggle('opacity-50', !hasNext);
         btnNext.classList.toggle('cursor-not-allowed', !hasNext);
     }
@@ -246,6 +249,7 @@ function changePerPage(perPage) {
     const urlParams = new URL(window.location.href).searchParams;
     urlParams.set('per_page', perPage);
     urlParams.set('page', 1);
+    urlParams.delete('cursor');
     const newUrl = `${window.location.pathname}?${urlParams.toString()}`;
     window.history.pushState({ path: newUrl }, '', newUrl);
 
@@ -253,10 +257,13 @@ function changePerPage(perPage) {
     loadViewData(currentView);
 }
 
-function changePage(page) {
+function changePage(page, cursor) {
     if (!page) return;
     const urlParams = new URL(window.location.href).searchParams;
     urlParams.set('page', page);
+    // Seek from the previous page's cursor when the server gave one
+    if (cursor) urlParams.set('cursor', cursor);
+    else urlParams.delete('cursor');
     const newUrl = `${window.location.pathname}?${urlParams.toString()}`;
     window.history.pushState({ path: newUrl }, '', newUrl);
 
@@ -0,0 +1,56 @@
+import multiprocessing
+import os
+
+# Worker model: gevent (green threads, many idle connections per worker), gthread (OS
+# threads) or sync. The gevent worker monkey-patches the stdlib, so redis calls yield to other
+# requests; psycopg2 is a C extension and only does once post_fork installs psycogreen's wait
+# callback. Current gunicorn releases no longer ship an eventlet worker.
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gevent')
+if worker_class == 'gthread':
+    threads = int(os.getenv('GUNICORN_THREADS', 8))
+
+# Flask-SocketIO must use the same concurrency model as the worker it runs in
+os.environ.setdefault('SOCKETIO_ASYNC_MODE', {'gevent': 'gevent'}.get(worker_class, 'threading'))
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+
+# Concurrent requests per green worker; keep workers * worker_connections within the DB pool budget
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 100))
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+# On SIGTERM workers stop accepting and get this long to finish in-flight requests
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+
+# Recycle workers periodically to cap slow memory growth; jitter avoids restarting all at once
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 200))
+
+preload_app = os.getenv('GUNICORN_PRELOAD', '0') == '1'
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+def _release_connections(app):
+    from app.extensions import db, redis_client, redis_bytes_client
+    with app.app_context():
+        db.engine.dispose()
+    redis_client.connection_pool.disconnect()
+    redis_bytes_client.connection_pool.disconnect()
+
+def post_fork(server, worker):
+    # Without this every query blocks the whole gevent hub, serializing its green threads behind it
+    if worker_class == 'gevent':
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
+    # A preloaded app may have opened connections in the master; never share them across forks
+    if preload_app:
+        _release_connections(server.app.wsgi())
+
+def worker_exit(server, worker):
+    app = getattr(worker, 'wsgi', None)
+    if app is not None:
+        _release_connections(app)
@@ -0,0 +1,49 @@
+import argparse
+from app import create_app
+from app.indexes import advise, benchmark, create_indexes, index_specs
+
+def print_benchmarks(before, after=None):
+    for name, run in before.items():
+        print(f"{name} (= {run['value']!r})")
+        print(f"  before: {run['ms']:9.2f} ms {run['buffers']:7,} buffers  {'; '.join(run['scans'])}")
+        if after and name in after:
+            then = after[name]
+            speedup = run['ms'] / then['ms'] if then['ms'] else float('inf')
+            print(f"  after:  {then['ms']:9.2f} ms {then['buffers']:7,} buffers  {'; '.join(then['scans'])}  ({speedup:.1f}x)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Derive, create and benchmark the dashboard's filter indexes.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('advise', help="list missing indexes and unused existing ones")
+    apply = commands.add_parser('apply', help="create the missing indexes, with EXPLAIN before and after")
+    apply.add_argument('--no-benchmark', action='store_true', help="skip the EXPLAIN ANALYZE runs")
+    commands.add_parser('benchmark', help="EXPLAIN ANALYZE every derived index's query shape")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if args.command == 'benchmark':
+            print_benchmarks(benchmark(index_specs()))
+            return
+
+        advice = advise()
+        missing = advice['missing']
+        if args.command == 'advise':
+            print(f"{len(missing)} missing indexes:")
+            for spec in missing:
+                print(f"  {spec.ddl()};")
+            for table, names in advice['unused'].items():
+                print(f"Never scanned on {table}: {', '.join(names)}")
+            return
+
+        if not missing:
+            print("All derived indexes exist.")
+            return
+        before = {} if args.no_benchmark else benchmark(missing)
+        for name in create_indexes(missing):
+            print(f"Created {name}")
+        if before:
+            print_benchmarks(before, benchmark(missing))
+
+if __name__ == "__main__":
+    main()
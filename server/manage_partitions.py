@@ -0,0 +1,41 @@
+import argparse
+from app import create_app
+from app.partitions import (
+    PARTITIONED_MODELS, apply_retention, convert_to_partitioned, ensure_default_partition, list_partitions
+)
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the day partitions of the snapshot tables.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('convert', help="rebuild plain snapshot tables as partitioned ones, "
+                                             "adding a DEFAULT partition where one is missing")
+    commands.add_parser('list', help="show each table's partitions")
+    retention = commands.add_parser('retention', help="detach partitions older than --keep-days")
+    retention.add_argument('--keep-days', type=int, help="defaults to SNAPSHOT_RETENTION_DAYS")
+    retention.add_argument('--drop', action='store_true', help="drop old partitions instead of detaching them")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        for model in PARTITIONED_MODELS:
+            table = model.__tablename__
+            if args.command == 'convert':
+                if convert_to_partitioned(model):
+                    print(f"{table}: converted")
+                elif ensure_default_partition(model):
+                    print(f"{table}: default partition added")
+                else:
+                    print(f"{table}: already partitioned or missing")
+            elif args.command == 'list':
+                partitions = list_partitions(table)
+                print(f"{table}: {len(partitions)} partitions")
+                for name, snapshot_date in partitions:
+                    print(f"  {name} ({snapshot_date})")
+            else:
+                removed = apply_retention(model, args.keep_days, drop=args.drop)
+                print(f"{table}: {'dropped' if args.drop else 'detached'} {len(removed)} partitions")
+                for name in removed:
+                    print(f"  {name}")
+
+if __name__ == "__main__":
+    main()
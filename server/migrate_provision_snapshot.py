@@ -0,0 +1,62 @@
+from sqlalchemy import text
+from app import create_app
+from app.extensions import db
+from app.filter_catalog import refresh_filter_catalog
+from app.models import OrderProvisionSummaryReport
+from app.snapshots import publish_snapshot
+
+TABLE = OrderProvisionSummaryReport.__tablename__
+
+def migrate():
+    """
+    Gives an existing provision table the snapshot_id / snapshot_date of the other snapshots.
+    Its current rows become one snapshot, dated by their last update.
+    """
+    app = create_app()
+    with app.app_context():
+        has_date = db.session.execute(text("""
+            SELECT EXISTS (SELECT 1 FROM information_schema.columns
+                           WHERE table_name = :table AND column_name = 'snapshot_date')
+        """), {'table': TABLE}).scalar()
+        if has_date:
+            print(f"{TABLE} already has snapshot_date, nothing to do.")
+            return
+
+        statements = [
+            f"ALTER TABLE {TABLE} ADD COLUMN snapshot_id BIGSERIAL, ADD COLUMN snapshot_date DATE",
+            f"UPDATE {TABLE} SET snapshot_date = (SELECT COALESCE(max(updated_at)::date, CURRENT_DATE) FROM {TABLE})",
+            f"ALTER TABLE {TABLE} ALTER COLUMN snapshot_date SET NOT NULL",
+            f"ALTER TABLE {TABLE} DROP CONSTRAINT {TABLE}_pkey, ADD PRIMARY KEY (snapshot_id)",
+            f"""
+            CREATE UNIQUE INDEX IF NOT EXISTS ux_order_provision_snapshot
+            ON {TABLE} (snapshot_date, po_number, location, collection, section, purity)
+            NULLS NOT DISTINCT
+            """,
+            "DROP INDEX IF EXISTS idx_order_provision_snapshot_filters",
+            f"""
+            CREATE INDEX idx_order_provision_snapshot_filters
+            ON {TABLE} (
+                snapshot_date,
+                division, group_name, purity, classification,
+                make, collection, section, master_collection
+            )
+            """
+        ]
+        try:
+            for statement in statements:
+                db.session.execute(text(statement))
+            snapshot_date = db.session.execute(text(f"SELECT max(snapshot_date) FROM {TABLE}")).scalar()
+            db.session.commit()
+        except Exception as e:
+            print(f"Error migrating {TABLE}: {e}")
+            db.session.rollback()
+            return
+        print(f"{TABLE} migrated.")
+
+        if snapshot_date is not None:
+            publish_snapshot(OrderProvisionSummaryReport, snapshot_date)
+            refresh_filter_catalog('provisionstatus', snapshot_date)
+            print(f"Snapshot {snapshot_date} published.")
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,23 @@
+import argparse
+from app import create_app
+from app.ingest import INGEST_TARGETS, retype_columns
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert a report table's text-typed numeric columns to their model types, "
+                    "quarantining rows that do not convert.")
+    parser.add_argument('report', nargs='?', default='provisionstatus', choices=sorted(INGEST_TARGETS))
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        converted, quarantined = retype_columns(args.report)
+
+    if not converted:
+        print(f"{args.report}: columns already typed, nothing to do")
+        return
+    print(f"{args.report}: converted {', '.join(converted)}")
+    print(f"{quarantined:,} malformed rows moved to ingest_quarantine")
+
+if __name__ == "__main__":
+    main()
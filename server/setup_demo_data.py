@@ -0,0 +1,218 @@
+from datetime import datetime, timedelta
+from app import create_app
+from app.extensions import db
+from app.models import Order, DashboardStats, Notification
+from app.notification_counter import reconcile_unread
+from app.notification_feed import invalidate_feed
+from app.dashboard.routes.main import invalidate_index_cache
+
+def setup_db():
+    app = create_app()
+    with app.app_context():
+        # Demo data for the landing page; safe to re-run, existing rows are kept
+        if DashboardStats.query.first() is None:
+            print("Seeding dashboard stats...")
+            db.session.add(DashboardStats(
+                active_orders=2840,
+                critical_delay=142,
+                sla_compliance=96.8,
+                avg_response_time="1.4h"
+            ))
+            db.session.commit()
+
+        dummy_orders = [
+            Order(
+                order_id="#ORD-82910",
+                priority="P1 - Urgent",
+                collection_type="Winter Essentials",
+                sub_type="Retail / High Volume",
+                origin="NYC",
+                destination="BER",
+                risk_level=80,
+                status="In Customs",
+                sla_timer="04:22:10"
+            ),
+            Order(
+                order_id="#ORD-82911",
+                priority="P3 - Routine",
+                collection_type="Spring Footwear",
+                sub_type="Apparel / Standard",
+                origin="SFO",
+                destination="LON",
+                risk_level=20,
+                status="Cleared",
+                sla_timer="00:00:00"
+            ),
+            Order(
+                order_id="#ORD-82912",
+                priority="P2 - High",
+                collection_type="Summer Trends",
+                sub_type="Fashion / Fast Moving",
+                origin="PAR",
+                destination="TOK",
+                risk_level=55,
+                status="Logistics",
+                sla_timer="12:45:00"
+            ),
+            Order(
+                order_id="#ORD-82913",
+                priority="P1 - Urgent",
+                collection_type="Tech Gadgets",
+                sub_type="Electronics / Fragile",
+                origin="SHZ",
+                destination="LAX",
+                risk_level=92,
+                status="Manual Review",
+                sla_timer="02:15:30"
+            ),
+            Order(
+                order_id="#ORD-82914",
+                priority="P3 - Routine",
+                collection_type="Home Decor",
+                sub_type="Furniture / Bulk",
+                origin="HAM",
+                destination="SYD",
+                risk_level=15,
+                status="Cleared",
+                sla_timer="00:00:00"
+            )
+        ]
+        existing = {order_id for (order_id,) in db.session.query(Order.order_id).all()}
+        missing = [o for o in dummy_orders if o.order_id not in existing]
+        if missing:
+            print(f"Seeding {len(missing)} demo orders...")
+            db.session.add_all(missing)
+            db.session.commit()
+
+        if Notification.query.count() == 0:
+            print("Seeding demo notifications...")
+            now = datetime.utcnow()
+            dummy_notifications = [
+                # Success notifications
+                Notification(
+                    title="Order Cleared Successfully",
+                    message="Order #ORD-82911 has been cleared and is ready for shipment.",
+                    notification_type="success",
+                    icon="check_circle",
+                    priority="low",
+                    related_order_id="#ORD-82911",
+                    created_at=now - timedelta(minutes=2),
+                    is_read=False
+                ),
+                Notification(
+                    title="SLA Compliance Achieved",
+                    message="All orders in the EMEA region met SLA targets this hour.",
+                    notification_type="success",
+                    icon="verified",
+                    priority="medium",
+                    created_at=now - timedelta(hours=3),
+                    is_read=True
+                ),
+                # Warning notifications
+                Notification(
+                    title="Customs Delay on #ORD-82910",
+                    message="Flagged for manual review in BER. Expected delay: 4-6 hours.",
+                    notification_type="warning",
+                    icon="warning",
+                    priority="high",
+                    related_order_id="#ORD-82910",
+                    created_at=now - timedelta(minutes=5),
+                    is_read=False
+                ),
+                Notification(
+                    title="Approaching SLA Deadline",
+                    message="Order #ORD-82912 has 2 hours remaining before SLA breach.",
+                    notification_type="warning",
+                    icon="schedule",
+                    priority="high",
+                    related_order_id="#ORD-82912",
+                    created_at=now - timedelta(minutes=45),
+                    is_read=False
+                ),
+                Notification(
+                    title="Weather Alert - Tokyo",
+                    message="Severe weather may impact deliveries to TOK region.",
+                    notification_type="warning",
+                    icon="cloud",
+                    priority="medium",
+                    created_at=now - timedelta(hours=2),
+                    is_read=True
+                ),
+                # Error notifications
+                Notification(
+                    title="Manual Review Required",
+                    message="High risk profile detected on #ORD-82913. Immediate action needed.",
+                    notification_type="error",
+                    icon="error",
+                    priority="high",
+                    related_order_id="#ORD-82913",
+                    created_at=now - timedelta(minutes=15),
+                    is_read=False
+                ),
+                Notification(
+                    title="Critical SLA Breach",
+                    message="Order #ORD-82908 has exceeded SLA by 6 hours.",
+                    notification_type="error",
+                    icon="report_problem",
+                    priority="high",
+                    created_at=now - timedelta(hours=1),
+                    is_read=False
+                ),
+                # Info notifications
+                Notification(
+                    title="System Update Completed",
+                    message="Dashboard analytics engine upgraded to v2.4.1.",
+                    notification_type="info",
+                    icon="info",
+                    priority="low",
+                    created_at=now - timedelta(hours=4),
+                    is_read=True
+                ),
+                Notification(
+                    title="Configuration Change",
+                    message="SLA threshold updated from 18h to 24h for bulk orders.",
+                    notification_type="info",
+                    icon="settings",
+                    priority="medium",
+                    created_at=now - timedelta(hours=1),
+                    is_read=True
+                ),
+                Notification(
+                    title="New Team Member Added",
+                    message="Sarah Johnson joined Compliance EMEA team.",
+                    notification_type="info",
+                    icon="person_add",
+                    priority="low",
+                    created_at=now - timedelta(hours=5),
+                    is_read=True
+                ),
+                # Alert notifications
+                Notification(
+                    title="SLA Threshold Peak",
+                    message="APAC region experiencing response time bottleneck. 12 orders affected.",
+                    notification_type="alert",
+                    icon="notifications_active",
+                    priority="high",
+                    created_at=now - timedelta(minutes=30),
+                    is_read=False
+                ),
+                Notification(
+                    title="Unusual Activity Detected",
+                    message="Spike in manual review requests from SHZ origin (3x normal).",
+                    notification_type="alert",
+                    icon="security",
+                    priority="high",
+                    created_at=now - timedelta(hours=2),
+                    is_read=False
+                ),
+            ]
+            db.session.add_all(dummy_notifications)
+            db.session.commit()
+            reconcile_unread()
+            invalidate_feed()
+
+        invalidate_index_cache()
+        print("Demo data ready.")
+
+if __name__ == "__main__":
+    setup_db()
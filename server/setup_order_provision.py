@@ -3,6 +3,10 @@ from datetime import date
 from sqlalchemy import text
 from app import create_app
 from app.extensions import db
+from app.filter_catalog import refresh_filter_catalog
+from app.models import OrderProvisionSummaryReport
+from app.search import ensure_search_index
+from app.snapshots import publish_snapshot
 
 def setup_db():
     app = create_app()
@@ -15,7 +19,9 @@ def setup_db():
             """,
             """
             CREATE TABLE order_provision_summary_report_snapshot (
-                po_number        VARCHAR(100) PRIMARY KEY,
+                snapshot_id      BIGSERIAL PRIMARY KEY,
+                snapshot_date    DATE NOT NULL,
+                po_number        VARCHAR(100) NOT NULL,
                 location         TEXT,
                 party           TEXT,
                 party_type      TEXT,
@@ -27,16 +33,22 @@ def setup_db():
                 purity           TEXT,
                 master_collection TEXT,
                 collection       TEXT,
-                pieces           TEXT,
-                gr_wt            TEXT,
-                total            TEXT,
+                pieces           INTEGER,
+                gr_wt            NUMERIC(14,3),
+                total            NUMERIC(14,3),
                 business_head    TEXT,
                 updated_at       TIMESTAMP NOT NULL DEFAULT NOW()
             );
             """,
             """
+            CREATE UNIQUE INDEX IF NOT EXISTS ux_order_provision_snapshot
+            ON order_provision_summary_report_snapshot (snapshot_date, po_number, location, collection, section, purity)
+            NULLS NOT DISTINCT;
+            """,
+            """
             CREATE INDEX IF NOT EXISTS idx_order_provision_snapshot_filters
             ON order_provision_summary_report_snapshot (
+                snapshot_date,
                 division, group_name, purity, classification,
                 make, collection, section, master_collection
             );
@@ -46,6 +58,7 @@ def setup_db():
         try:
             for statement in ddl_statements:
                 db.session.execute(text(statement))
+            ensure_search_index('provisionstatus')
             db.session.commit()
             print("Table created successfully.")
         except Exception as e:
@@ -68,13 +81,15 @@ def setup_db():
         collections = ['Wedding 2024', 'Summer Breeze', 'Diwali Special', 'Corporate Chic', 'Bridal Saga']
         business_heads = ['Sandeep Shah', 'Amitabh Bachchan', 'Ratan Tata', 'Mukesh Ambani', 'Vikram Seth']
 
+        today = date.today()
+
         sql_insert = text("""
             INSERT INTO order_provision_summary_report_snapshot (
-                po_number, location, party, party_type, division, group_name, 
+                snapshot_date, po_number, location, party, party_type, division, group_name, 
                 classification, section, make, purity, master_collection, 
                 collection, pieces, gr_wt, total, business_head
             ) VALUES (
-                :po, :loc, :pty, :ptyp, :div, :grp, :cls, :sec, :mk, :pur, :mcol, :col, :pcs, :gwt, :tot, :bhead
+                :date, :po, :loc, :pty, :ptyp, :div, :grp, :cls, :sec, :mk, :pur, :mcol, :col, :pcs, :gwt, :tot, :bhead
             )
         """)
 
@@ -92,13 +107,13 @@ def setup_db():
             mcol = random.choice(master_collections)
             col = random.choice(collections)
             
-            pcs = str(random.randint(1, 50))
-            gwt = f"{random.uniform(5.0, 500.0):.3f}"
-            tot = f"{random.randint(10000, 500000)}"
+            pcs = random.randint(1, 50)
+            gwt = round(random.uniform(5.0, 500.0), 3)
+            tot = random.randint(10000, 500000)
             bhead = random.choice(business_heads)
 
             params = {
-                'po': po_num, 'loc': loc, 'pty': pty, 'ptyp': ptyp,
+                'date': today, 'po': po_num, 'loc': loc, 'pty': pty, 'ptyp': ptyp,
                 'div': div, 'grp': grp, 'cls': cls, 'sec': sec,
                 'mk': mk, 'pur': pur, 'mcol': mcol, 'col': col,
                 'pcs': pcs, 'gwt': gwt, 'tot': tot, 'bhead': bhead
@@ -113,5 +128,13 @@ def setup_db():
         db.session.commit()
         print("200 rows seeded successfully.")
 
+        # Cut readers over to the new snapshot only once it is fully loaded
+        publish_snapshot(OrderProvisionSummaryReport, today)
+        print("Snapshot published.")
+
+        # After the publish, so the catalog lands under the new cache version
+        refresh_filter_catalog('provisionstatus', today)
+        print("Filter catalog refreshed.")
+
 if __name__ == "__main__":
     setup_db()
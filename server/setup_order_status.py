@@ -3,6 +3,12 @@ from datetime import date
 from sqlalchemy import text
 from app import create_app
 from app.extensions import db
+from app.rollups import refresh_order_status_rollups
+from app.filter_catalog import refresh_filter_catalog
+from app.models import OrderStatusReportSnapshot
+from app.partitions import ensure_partition
+from app.search import ensure_search_index
+from app.snapshots import publish_snapshot
 
 def setup_db():
     app = create_app()
@@ -16,7 +22,7 @@ def setup_db():
             """,
             """
             CREATE TABLE order_status_report_snapshot (
-                snapshot_id        BIGSERIAL PRIMARY KEY,
+                snapshot_id        BIGSERIAL,
                 snapshot_date      DATE NOT NULL,
                 division           VARCHAR(100),
                 group_name         VARCHAR(100),
@@ -67,8 +73,10 @@ def setup_db():
                     COALESCE(make_location,'') || '|' ||
                     COALESCE(collection,'') || '|' ||
                     COALESCE(party_name,'')
-                ) STORED
-            );
+                ) STORED,
+
+                PRIMARY KEY (snapshot_id, snapshot_date)
+            ) PARTITION BY RANGE (snapshot_date);
             """,
             """
             CREATE UNIQUE INDEX IF NOT EXISTS ux_order_status_snapshot
@@ -88,6 +96,7 @@ def setup_db():
         try:
             for statement in ddl_statements:
                 db.session.execute(text(statement))
+            ensure_search_index('orderstatus')
             db.session.commit()
             print("Table created successfully with new schema.")
         except Exception as e:
@@ -114,6 +123,7 @@ def setup_db():
         
         try:
             db.session.execute(text("TRUNCATE TABLE order_status_report_snapshot RESTART IDENTITY CASCADE"))
+            ensure_partition(OrderStatusReportSnapshot, today)
             db.session.commit()
         except Exception as e:
             print(f"Truncate failed: {e}")
@@ -193,5 +203,17 @@ def setup_db():
         db.session.commit()
         print("200 rows seeded successfully.")
 
+        print("Refreshing Make/Collection rollups...")
+        refresh_order_status_rollups(today)
+        print("Rollups refreshed.")
+
+        # Cut readers over to the new snapshot only once it is fully loaded
+        publish_snapshot(OrderStatusReportSnapshot, today)
+        print("Snapshot published.")
+
+        # After the publish, so the catalog lands under the new cache version
+        refresh_filter_catalog('orderstatus', today)
+        print("Filter catalog refreshed.")
+
 if __name__ == "__main__":
     setup_db()
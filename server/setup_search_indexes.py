@@ -0,0 +1,19 @@
+from app import create_app
+from app.extensions import db
+from app.search import SEARCH_SPECS, ensure_search_index, search_index_name
+
+def setup_indexes():
+    app = create_app()
+    with app.app_context():
+        for report in SEARCH_SPECS:
+            print(f"Creating {search_index_name(report)}...")
+            try:
+                ensure_search_index(report)
+                db.session.commit()
+            except Exception as e:
+                print(f"Error creating search index for {report}: {e}")
+                db.session.rollback()
+        print("Search indexes ready.")
+
+if __name__ == "__main__":
+    setup_indexes()
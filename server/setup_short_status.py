@@ -3,6 +3,11 @@ from datetime import date
 from sqlalchemy import text, Numeric
 from app import create_app
 from app.extensions import db
+from app.filter_catalog import refresh_filter_catalog
+from app.models import ShortStatusReportSnapshot
+from app.partitions import ensure_partition
+from app.search import ensure_search_index
+from app.snapshots import publish_snapshot
 
 def setup_db():
     app = create_app()
@@ -15,7 +20,7 @@ def setup_db():
             """,
             """
             CREATE TABLE short_status_report_snapshot (
-                snapshot_id        BIGSERIAL PRIMARY KEY,
+                snapshot_id        BIGSERIAL,
                 snapshot_date      DATE NOT NULL,
                 division           VARCHAR(100),
                 group_name         VARCHAR(100),
@@ -43,8 +48,10 @@ def setup_db():
                 g_pending_count    INTEGER NOT NULL DEFAULT 0,
 
                 total_count        INTEGER NOT NULL DEFAULT 0,
-                updated_at         TIMESTAMP NOT NULL DEFAULT NOW()
-            );
+                updated_at         TIMESTAMP NOT NULL DEFAULT NOW(),
+
+                PRIMARY KEY (snapshot_id, snapshot_date)
+            ) PARTITION BY RANGE (snapshot_date);
             """,
             """
             CREATE INDEX IF NOT EXISTS idx_short_status_snapshot_filters
@@ -59,6 +66,7 @@ def setup_db():
         try:
             for statement in ddl_statements:
                 db.session.execute(text(statement))
+            ensure_search_index('shortstatus')
             db.session.commit()
             print("Table created successfully.")
         except Exception as e:
@@ -78,7 +86,8 @@ def setup_db():
         types = ['Handmade', 'Machine Cut', 'Casting', 'Laser Engraved']
 
         today = date.today()
-        
+        ensure_partition(ShortStatusReportSnapshot, today)
+
         sql_insert = text("""
             INSERT INTO short_status_report_snapshot (
                 snapshot_date, division, group_name, purity, classification, 
@@ -132,5 +141,13 @@ def setup_db():
         db.session.commit()
         print("200 rows seeded successfully.")
 
+        # Cut readers over to the new snapshot only once it is fully loaded
+        publish_snapshot(ShortStatusReportSnapshot, today)
+        print("Snapshot published.")
+
+        # After the publish, so the catalog lands under the new cache version
+        refresh_filter_catalog('shortstatus', today)
+        print("Filter catalog refreshed.")
+
 if __name__ == "__main__":
     setup_db()